@@ -1,10 +1,13 @@
 
 import os
 import json
+import uuid
 import logging
 import ijson
 import time
+import requests
 import ndex2
+from ndex2.client import Ndex2
 from ndex2.nice_cx_network import NiceCXNetwork
 from ndexutil.exceptions import NDExUtilError
 from ndexutil.exceptions import NDExUtilSaveNetworkError
@@ -279,6 +282,78 @@ class NDExExtraUtils(object):
             res = client.update_cx_network(f, networkid)
             return res
 
+    def upload_cx_stream_chunked(self, client=None, cx_stream=None,
+                                 networkid=None, chunk_size=1048576):
+        """
+        Uploads CX read from `cx_stream` to NDEx as a new network or,
+        if `networkid` is set, updates that network. Unlike
+        :py:meth:`~ndex2.client.Ndex2.save_cx_stream_as_new_network` the
+        size of the CX does not need to be known beforehand. The multipart
+        request is sent with chunked transfer encoding as data is read
+        from `cx_stream` so this works with a pipe whose writer is still
+        generating the network.
+
+        If reading `cx_stream` raises an error, the request is aborted
+        before it completes so NDEx never sees a truncated network
+
+        :param client: NDEx server client connection
+        :type client: :py:class:`~ndex2.client.Ndex2`
+        :param cx_stream: stream opened in binary mode to read CX from
+        :param networkid: UUID of network to update or None to
+                          create a new network
+        :type networkid: str
+        :param chunk_size: number of bytes to read from `cx_stream`
+                           for each chunk sent
+        :type chunk_size: int
+        :raises NDExUtilError: if `client` or `cx_stream` is None
+        :raises HTTPError: if NDEx returns an error status
+        :return: response from NDEx which is the URL of the
+                 network for new networks
+        :rtype: str
+        """
+        if client is None:
+            raise NDExUtilError('NDEx client is None')
+        if cx_stream is None:
+            raise NDExUtilError('cx_stream is None')
+
+        if client.version.startswith('1.'):
+            route = '/network/asCX'
+        else:
+            route = '/network'
+        if networkid is not None:
+            route += '/' + networkid
+        url = client.host + client._get_version_endpoint() + route
+
+        boundary = uuid.uuid4().hex
+        headers = {'Content-Type': 'multipart/form-data; boundary=' +
+                                   boundary,
+                   Ndex2.USER_AGENT_KEY: client._get_user_agent(),
+                   'Connection': 'close'}
+
+        def _get_body():
+            yield ('--' + boundary + '\r\n'
+                   'Content-Disposition: form-data; name="CXNetworkStream";'
+                   ' filename="filename"\r\n'
+                   'Content-Type: application/octet-stream\r\n\r\n').\
+                encode('utf-8')
+            while True:
+                chunk = cx_stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            yield ('\r\n--' + boundary + '--\r\n').encode('utf-8')
+
+        if networkid is None:
+            logger.debug('Streaming new network to: ' + url)
+            response = requests.post(url, data=_get_body(), headers=headers,
+                                     auth=client._get_auth_tuple())
+        else:
+            logger.debug('Streaming update of network to: ' + url)
+            response = requests.put(url, data=_get_body(), headers=headers,
+                                    auth=client._get_auth_tuple())
+        response.raise_for_status()
+        return response.text
+
     def update_network_aspect_on_ndex(self, client=None,
                                       networkid=None,
                                       aspect_name=None,
@@ -7,12 +7,21 @@ import logging
 import json
 import tempfile
 import re
+import glob
+import threading
 from datetime import datetime
 import shutil
 from requests.exceptions import HTTPError
 from tqdm import tqdm
 import ndexutil
 from ndexutil.tsv.streamtsvloader import StreamTSVLoaderFactory
+from ndexutil.tsv import streamtsvloader
+from ndexutil.tsv.nodetable import SQLiteNodeTable
+from ndexutil.tsv import nodetable
+from ndexutil.tsv.edgetable import SQLiteEdgeTable
+from ndexutil.tsv import edgetable
+from ndexutil.tsv.checkpoint import TSVLoaderCheckpoint
+from ndexutil.tsv import compression
 from ndexutil.config import NDExUtilConfig
 from ndexutil.exceptions import NDExUtilError
 from ndex2.nice_cx_network import NiceCXNetwork
@@ -1906,15 +1915,81 @@ class LayoutWrapper(object):
             json.dump(net.to_cx(), f)
 
 
+class _PipedCXStream(object):
+    """
+    Wraps read end of pipe CX is written to by another thread
+    and raises an error instead of signaling end of data if that
+    thread failed. This prevents a partial network from being
+    uploaded to NDEx
+    """
+    def __init__(self, stream, errors):
+        """
+        Constructor
+
+        :param stream: read end of pipe opened in binary mode
+        :param errors: list the writing thread appends any
+                       error to before closing its end of the pipe
+        :type errors: list
+        """
+        self._stream = stream
+        self._errors = errors
+
+    def read(self, size=-1):
+        """
+        Reads up to `size` bytes
+
+        :raises NDExUtilError: if end of data is reached and the
+                               thread writing to the pipe failed
+        :return: data
+        :rtype: bytes
+        """
+        data = self._stream.read(size)
+        if not data and len(self._errors) > 0:
+            raise NDExUtilError('Unable to generate CX: ' +
+                                str(self._errors[0]))
+        return data
+
+
 class TSVLoader(object):
     """
     Runs tsvloader to import data as a network into NDEx
     """
     COMMAND = 'tsvloader'
 
+    MEMORY_NODE_TABLE = 'memory'
+    """
+    Keep node table in memory
+    """
+
+    DISK_NODE_TABLE = 'disk'
+    """
+    Keep node table in SQLite database in temp directory
+    """
+
+    MEMORY_EDGE_TABLE = 'memory'
+    """
+    Keep table of collapsed edges in memory
+    """
+
+    DISK_EDGE_TABLE = 'disk'
+    """
+    Keep table of collapsed edges in SQLite database in temp directory
+    """
+
+    NO_QUOTECHAR = 'none'
+    """
+    Value of --quotechar that disables quoting
+    """
+
+    CHECKPOINT_FILE = 'tsvloader.checkpoint'
+    """
+    Name of checkpoint file written to --checkpointdir
+    """
+
     def __init__(self, theargs, altclient=None,
                  streamtsvfac=StreamTSVLoaderFactory(),
-                 layout_wrapper=LayoutWrapper()):
+                 layout_wrapper=LayoutWrapper(),
+                 ndexextra=NDExExtraUtils()):
         """
         Constructor
         :param theargs: command line arguments from argparse. This method
@@ -1933,6 +2008,7 @@ class TSVLoader(object):
         self._altclient = altclient
         self._tsvfac = streamtsvfac
         self._layout = layout_wrapper
+        self._ndexextra = ndexextra
         self._parse_config()
 
     def _parse_config(self):
@@ -2104,7 +2180,7 @@ class TSVLoader(object):
         :return:
         """
 
-        with open(networkfile, 'rb') as net_stream:
+        with compression.open_input(networkfile, 'rb') as net_stream:
             try:
                 if self._args.u is not None:
                     logger.info('Updating network in NDEx')
@@ -2116,47 +2192,316 @@ class TSVLoader(object):
                 logger.info('Output from saving network to NDEx: ' +
                             client.save_cx_stream_as_new_network(net_stream))
             except HTTPError as he:
-                if '401 Client Error' in str(he):
-                    logger.fatal('Error uploading network. '
-                                 'Invalid username "' + str(self._user) +
-                                 '" and/or password '
-                                 'for server "' + str(self._server) + '"')
-                    return 2
-                else:
-                    logger.exception('Caught exception trying to '
-                                     'upload network: ' + str(he))
-                return 3
+                return self._get_upload_error_code(he)
 
         return 0
 
+    def _get_upload_error_code(self, he):
+        """
+        Logs error raised when uploading network to NDEx
+
+        :param he: error raised by upload
+        :type he: :py:class:`~requests.exceptions.HTTPError`
+        :return: 2 if credentials are invalid otherwise 3
+        :rtype: int
+        """
+        if '401 Client Error' in str(he):
+            logger.fatal('Error uploading network. '
+                         'Invalid username "' + str(self._user) +
+                         '" and/or password '
+                         'for server "' + str(self._server) + '"')
+            return 2
+        logger.exception('Caught exception trying to '
+                         'upload network: ' + str(he))
+        return 3
+
+    def _use_stream_upload(self):
+        """
+        Determines if CX should be uploaded to NDEx while it is
+        generated (--streamupload). This is not possible if
+        --layout, --outputcx, --checkpointdir, or --skipupload is
+        set since all of these need the complete CX file
+
+        :return: True if CX should be streamed to NDEx
+        :rtype: bool
+        """
+        if self._args.streamupload is not True:
+            return False
+        for flag, value in [('--layout', self._args.layout),
+                            ('--outputcx', self._args.outputcx),
+                            ('--checkpointdir', self._args.checkpointdir)]:
+            if value is not None:
+                logger.warning(flag + ' is set, ignoring --streamupload')
+                return False
+        if self._args.skipupload is True:
+            logger.warning('--skipupload is set, ignoring --streamupload')
+            return False
+        return True
+
+    def _stream_network_to_ndex(self, client, tsvloader, net_attribs):
+        """
+        Uploads network to NDEx while it is being generated. The
+        tsv loader runs in a separate thread writing CX into a
+        pipe that is read by a chunked streaming upload in this
+        thread so no copy of the CX is written to disk
+
+        :param client: NDEx client
+        :type client: :py:class:`~ndex2.client.Ndex2`
+        :param tsvloader: loader to generate CX with
+        :type tsvloader: :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+        :param net_attribs: network attributes to pass to tsv loader
+        :type net_attribs: list
+        :raises NDExUtilError: if generation of CX failed, in which
+                               case the upload is aborted
+        :return: 0 upon success, 2 if credentials are invalid or 3
+                 for any other upload error
+        :rtype: int
+        """
+        tsvfiles = self._get_tsvfiles()
+        errors = []
+        read_fd, write_fd = os.pipe()
+
+        def _write_network():
+            cx_out_stream = open(write_fd, 'wb')
+            # node table is created in this thread since SQLite
+            # connections cannot be shared across threads
+            node_table = None
+            edge_table = None
+            try:
+                node_table = self._get_node_table()
+                edge_table = self._get_edge_table()
+                tsvloader.write_cx_network(tsvfiles, cx_out_stream,
+                                           network_attributes=net_attribs,
+                                           batchsize=self._args.batchsize,
+                                           node_table=node_table,
+                                           edge_table=edge_table,
+                                           max_batch_bytes=self._args.maxbatchbytes)
+                self._log_batch_statistics(tsvloader)
+            except Exception as e:
+                # recorded before pipe is closed so the reader
+                # sees the error instead of a normal end of data
+                errors.append(e)
+            finally:
+                try:
+                    cx_out_stream.close()
+                except OSError as oe:
+                    logger.debug('Error closing pipe: ' + str(oe))
+                if node_table is not None:
+                    node_table.close()
+                if edge_table is not None:
+                    edge_table.close()
+
+        writer = threading.Thread(target=_write_network,
+                                  name='tsvloader-writer', daemon=True)
+        writer.start()
+        try:
+            with open(read_fd, 'rb') as cx_in_stream:
+                piped_stream = _PipedCXStream(cx_in_stream, errors)
+                if self._args.u is not None:
+                    logger.info('Streaming update of network in NDEx')
+                else:
+                    logger.info('Streaming new network to NDEx')
+                res = self._ndexextra.upload_cx_stream_chunked(client=client,
+                                                               cx_stream=piped_stream,
+                                                               networkid=self._args.u)
+                logger.info('Output from streaming network to NDEx: ' +
+                            str(res))
+            return 0
+        except HTTPError as he:
+            return self._get_upload_error_code(he)
+        finally:
+            writer.join()
+
+    def _expand_tsvfiles(self):
+        """
+        Gets paths to TSV files from self._args.tsv_file which can
+        be a path or list of paths. Any path with glob wildcards
+        (``*``, ``?`` or ``[``) is replaced by the sorted list of
+        files it matches
+
+        :raises NDExUtilError: if a glob pattern does not match any files
+        :return: paths to TSV files
+        :rtype: list
+        """
+        tsv_files = self._args.tsv_file
+        if isinstance(tsv_files, str):
+            tsv_files = [tsv_files]
+        expanded = []
+        for tsv_file in tsv_files:
+            if re.search(r'[*?[]', tsv_file) is None:
+                expanded.append(tsv_file)
+                continue
+            matches = sorted(glob.glob(tsv_file))
+            if len(matches) == 0:
+                raise NDExUtilError('No files match ' + tsv_file)
+            logger.info(str(len(matches)) + ' files match ' + tsv_file)
+            expanded.extend(matches)
+        return expanded
+
+    def _get_tsvfiles(self):
+        """
+        Gets paths to TSV files to load as one network
+
+        :return: path returned by :py:meth:`_get_tsvfile` if --header or
+                 --uppercaseheader is set otherwise paths from
+                 :py:meth:`_expand_tsvfiles`
+        :rtype: list
+        """
+        if self._args.header is not None or\
+                self._args.uppercaseheader is True:
+            return [self._get_tsvfile()]
+        return self._expand_tsvfiles()
+
+    @staticmethod
+    def _append_lines(tsv_input, out):
+        """
+        Writes lines from `tsv_input` to `out` adding a newline
+        to the last line if it is missing
+
+        :param tsv_input: input text stream
+        :param out: output text stream
+        :return: None
+        """
+        line = ''
+        for line in tsv_input:
+            out.write(line)
+        if line and not line.endswith('\n'):
+            out.write('\n')
+
     def _get_tsvfile(self):
         """
-        Returns path to TSV file stored normally in self._args.tsv_file
-        unless user set --header in which case the contents of
-        header are written to a tmp file and the self._args.tsv_file is
-        appended to this tmp file so the tsv file has a header
-        :return:
+        If user set --header, the contents of header are written to a
+        tmp file and the TSV files from :py:meth:`_expand_tsvfiles` are
+        appended to this tmp file so the tsv file has a header. If user
+        set --uppercaseheader, the TSV files are appended to a tmp file
+        keeping only the header of the first file, upper cased
+
+        :return: path to tmp file or, if neither flag is set, paths
+                 from :py:meth:`_expand_tsvfiles`
+        :rtype: str or list
         """
 
         if self._args.header is not None:
             logger.info('Prepending custom header to tsv file')
             tmptsv = os.path.join(self._tmpdir, 'temp.tsv')
-            with open(os.path.abspath(self._args.tsv_file), 'r') as tsv_input:
-                with open(tmptsv, 'w') as f:
-                    f.write(self._args.header + '\n')
-                    shutil.copyfileobj(tsv_input, f)
+            with open(tmptsv, 'w') as f:
+                f.write(self._args.header + '\n')
+                for tsv_file in self._expand_tsvfiles():
+                    with compression.open_input(os.path.abspath(tsv_file)) as tsv_input:
+                        TSVLoader._append_lines(tsv_input, f)
             return tmptsv
         if self._args.uppercaseheader is True:
             logger.info('Upper casing header line in tsv file')
             tmptsv = os.path.join(self._tmpdir, 'temp.tsv')
-            with open(os.path.abspath(self._args.tsv_file), 'r') as tsv_input:
-                with open(tmptsv, 'w') as f:
-                    f.write(tsv_input.readline().upper())
-                    for line in tsv_input:
-                        f.write(line)
+            with open(tmptsv, 'w') as f:
+                for index, tsv_file in enumerate(self._expand_tsvfiles()):
+                    with compression.open_input(os.path.abspath(tsv_file)) as tsv_input:
+                        header_line = tsv_input.readline()
+                        if index == 0:
+                            f.write(header_line.upper())
+                        TSVLoader._append_lines(tsv_input, f)
             return tmptsv
 
-        return self._args.tsv_file
+        return self._expand_tsvfiles()
+
+    def _get_node_table(self):
+        """
+        Gets node table for tsv loader based on value of
+        --nodetable flag
+
+        :return: node table or None to use default
+                 in memory node table
+        :rtype: :py:class:`~ndexutil.tsv.nodetable.SQLiteNodeTable`
+        """
+        if self._args.nodetable != TSVLoader.DISK_NODE_TABLE:
+            return None
+        logger.info('Using disk based node table keeping ' +
+                    str(self._args.nodetablecachesize) +
+                    ' nodes in memory')
+        return SQLiteNodeTable(os.path.join(self._tmpdir, 'nodetable.sqlite'),
+                               cache_size=self._args.nodetablecachesize)
+
+    def _get_edge_table(self):
+        """
+        Gets edge table used to collapse edges for tsv loader based
+        on value of --edgetable flag
+
+        :return: edge table or None to use default
+                 in memory edge table
+        :rtype: :py:class:`~ndexutil.tsv.edgetable.SQLiteEdgeTable`
+        """
+        if self._args.edgetable != TSVLoader.DISK_EDGE_TABLE:
+            return None
+        logger.info('Using disk based edge table keeping ' +
+                    str(self._args.edgetablecachesize) +
+                    ' edges in memory')
+        return SQLiteEdgeTable(os.path.join(self._tmpdir, 'edgetable.sqlite'),
+                               cache_size=self._args.edgetablecachesize)
+
+    def _log_batch_statistics(self, tsvloader):
+        """
+        Logs statistics of batches written by `tsvloader`
+
+        :param tsvloader: loader that wrote network
+        :type tsvloader: :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+        :return: None
+        """
+        stats = tsvloader.get_batch_statistics()
+        logger.info('Wrote ' + str(stats['batches']) + ' batches of ' +
+                    str(stats['elements']) + ' nodes, edges and attributes ' +
+                    'in ' + str(stats['bytes']) + ' bytes. Largest batch: ' +
+                    str(stats['max_batch_elements']) + ' elements in ' +
+                    str(stats['max_batch_bytes']) + ' bytes')
+
+    def _get_cx_output_compression(self):
+        """
+        Gets compression for CX written by tsv loader from
+        --compressoutput flag. Compression is disabled if
+        --layout is set since layout needs uncompressed CX
+
+        :return: compression type or None
+        :rtype: str
+        """
+        if self._args.compressoutput is None:
+            return None
+        for flag, value in [('--layout', self._args.layout),
+                            ('--checkpointdir', self._args.checkpointdir)]:
+            if value is not None:
+                logger.warning(flag + ' is set, ignoring --compressoutput')
+                return None
+        return self._args.compressoutput
+
+    def _get_checkpoint_file(self):
+        """
+        Gets path to checkpoint file in directory set via --checkpointdir
+        creating the directory if needed
+
+        :return: path to checkpoint file or None if --checkpointdir
+                 is not set
+        :rtype: str
+        """
+        if self._args.checkpointdir is None:
+            return None
+        checkpointdir = os.path.abspath(self._args.checkpointdir)
+        os.makedirs(checkpointdir, exist_ok=True)
+        return os.path.join(checkpointdir, TSVLoader.CHECKPOINT_FILE)
+
+    def _remove_checkpoint(self, checkpoint_file, cxout):
+        """
+        Removes checkpoint and CX written to --checkpointdir
+        once the network has been loaded
+
+        :param checkpoint_file: path to checkpoint file or None
+        :type checkpoint_file: str
+        :param cxout: path to CX file
+        :type cxout: str
+        :return: None
+        """
+        if checkpoint_file is None:
+            return
+        TSVLoaderCheckpoint(checkpoint_file).remove()
+        if os.path.isfile(cxout):
+            os.unlink(cxout)
 
     def _get_streamtsvloader(self, stylenetwork):
         """
@@ -2164,7 +2509,57 @@ class TSVLoader(object):
         :return:
         """
         return self._tsvfac.get_tsv_streamloader(self._args.load_plan,
-                                                 stylenetwork)
+                                                 stylenetwork,
+                                                 node_check=self._args.nodecheck,
+                                                 workers=self._args.workers,
+                                                 encoder=self._args.encoder,
+                                                 background_writer=self._args.backgroundwriter,
+                                                 delimiter=self._get_delimiter(),
+                                                 quotechar=self._get_quotechar())
+
+    def _get_delimiter(self):
+        """
+        Gets delimiter set via --delimiter converting the
+        escape sequence ``\\t`` to a tab
+
+        :return: delimiter character
+        :rtype: str
+        """
+        if self._args.delimiter == '\\t':
+            return '\t'
+        return self._args.delimiter
+
+    def _get_quotechar(self):
+        """
+        Gets quote character set via --quotechar or None
+        if --quotechar is set to ``none``
+
+        :return: quote character
+        :rtype: str
+        """
+        if self._args.quotechar.lower() == TSVLoader.NO_QUOTECHAR:
+            return None
+        return self._args.quotechar
+
+    def _scan_tsv(self):
+        """
+        Scans TSV file(s) with load plan without creating or
+        uploading a network and writes report from
+        :py:meth:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader.scan_tsv`
+        as JSON to standard out
+
+        :return: 0 if all rows scanned match load plan otherwise 1
+        :rtype: int
+        """
+        tsvloader = self._get_streamtsvloader(None)
+        report = tsvloader.scan_tsv(self._get_tsvfiles(),
+                                    max_rows=self._args.scanmaxrows)
+        sys.stdout.write(json.dumps(report, indent=2) + '\n')
+        if report['error_count'] > 0:
+            logger.error(str(report['error_count']) +
+                         ' row(s) do not match load plan')
+            return 1
+        return 0
 
     def run(self):
         """
@@ -2175,6 +2570,16 @@ class TSVLoader(object):
         logger.warning('THIS IS AN UNTESTED ALPHA IMPLEMENTATION '
                        'AND MAY CONTAIN ERRORS')
 
+        if self._args.resume is True and self._args.checkpointdir is None:
+            raise NDExUtilError('--resume requires --checkpointdir')
+
+        if self._args.scanonly is True:
+            self._tmpdir = tempfile.mkdtemp(dir=self._args.tmpdir)
+            try:
+                return self._scan_tsv()
+            finally:
+                shutil.rmtree(self._tmpdir)
+
         client = self._get_client()
         self._tmpdir = tempfile.mkdtemp(dir=self._args.tmpdir)
         try:
@@ -2187,13 +2592,50 @@ class TSVLoader(object):
             # create tsv loader
             tsvloader = self._get_streamtsvloader(stylenetwork)
 
+            if self._use_stream_upload():
+                return self._stream_network_to_ndex(client, tsvloader,
+                                                    net_attribs)
+
             # create input stream and output stream which is fed
-            # to tsv loader to create cx
-            cxout = os.path.join(self._tmpdir, 'tsvloader.cx')
-            with open(self._get_tsvfile(), 'r') as tsv_in_stream:
-                with open(cxout, 'w') as cx_out_stream:
-                    tsvloader.write_cx_network(tsv_in_stream, cx_out_stream,
-                                               network_attributes=net_attribs)
+            # to tsv loader to create cx. The input stream is opened
+            # in binary mode so compressed files are decompressed
+            # CX is written to --checkpointdir, if set, so it is kept
+            # along with the checkpoint if the load fails
+            cx_compression = self._get_cx_output_compression()
+            checkpoint_file = self._get_checkpoint_file()
+            resume = self._args.resume is True
+            if checkpoint_file is not None:
+                cxout = os.path.join(os.path.dirname(checkpoint_file),
+                                     'tsvloader.cx')
+            else:
+                cxout = os.path.join(self._tmpdir, 'tsvloader.cx' +
+                                     compression.COMPRESSION_EXTENSIONS.
+                                     get(cx_compression, ''))
+            node_table = self._get_node_table()
+            edge_table = self._get_edge_table()
+            try:
+                tsvfiles = self._get_tsvfiles()
+                if resume is True and os.path.isfile(cxout):
+                    cx_out_stream = open(cxout, 'r+b')
+                else:
+                    cx_out_stream = compression.open_output(cxout,
+                                                            compression=cx_compression)
+                with cx_out_stream:
+                    tsvloader.write_cx_network(tsvfiles, cx_out_stream,
+                                               network_attributes=net_attribs,
+                                               batchsize=self._args.batchsize,
+                                               node_table=node_table,
+                                               checkpoint_file=checkpoint_file,
+                                               checkpoint_interval=self._args.checkpointinterval,
+                                               resume=resume,
+                                               edge_table=edge_table,
+                                               max_batch_bytes=self._args.maxbatchbytes)
+                self._log_batch_statistics(tsvloader)
+            finally:
+                if node_table is not None:
+                    node_table.close()
+                if edge_table is not None:
+                    edge_table.close()
 
             if self._args.layout is not None:
                 logger.info('Applying ' + str(self._args.layout) +
@@ -2205,15 +2647,22 @@ class TSVLoader(object):
                                           scale=self._args.scale)
             if self._args.outputcx is not None:
                 logger.info('Writing CX to file: ' + self._args.outputcx)
-                shutil.copyfile(cxout, self._args.outputcx)
+                with compression.open_input(cxout, 'rb') as cx_in_stream:
+                    with compression.open_output(self._args.outputcx,
+                                                 compression=compression.
+                                                 get_compression_from_filename(self._args.outputcx)) as f:
+                        shutil.copyfileobj(cx_in_stream, f)
 
             if self._args.skipupload is True:
                 logger.info('--skipupload is set. Skipping upload to NDEx')
-                return 0
-
-            # update or upload network stored in `cxout` file to NDEx
-            # server
-            return self._upload_network(client, cxout)
+                res = 0
+            else:
+                # update or upload network stored in `cxout` file to NDEx
+                # server
+                res = self._upload_network(client, cxout)
+            if res == 0:
+                self._remove_checkpoint(checkpoint_file, cxout)
+            return res
         finally:
             shutil.rmtree(self._tmpdir)
 
@@ -2257,8 +2706,10 @@ class TSVLoader(object):
         {server} = <NDEx server ie public.ndexbio.org>
 
         The forth positional parameter (tsv_file) should be
-        set to edge list file in tab separated format and the
-        fifth or last positional parameter (load_plan) should be
+        set to edge list file in tab separated format, or several
+        files and/or quoted glob patterns of files with the same header
+        that are loaded as one network, and the
+        last positional parameter (load_plan) should be
         set to the load plan. The load plan is a JSON formatted text
         file that maps the columns to nodes, edges, and attributes
         in the network.
@@ -2277,6 +2728,9 @@ class TSVLoader(object):
                          -t dafe07ca-0676-11ea-93e0-525400c25d22 \\
                          --name mynetwork --description 'some text'
 
+        ndexmisctools.py -v tsvloader - - - 'parts/part-*.tsv.gz' \\
+                         loadplan.json
+
         ndexmisctools.py -v --profile foo tsvloader - - public.ndexbio.org \\
                          datafile.tsv loadplan.json \\
                          --header 'col1\tcol2\tcol3' \\
@@ -2314,7 +2768,20 @@ class TSVLoader(object):
                                              'be used')
         parser.add_argument('server', help='NDEx server, if set to - then '
                                            'value from config will be used')
-        parser.add_argument('tsv_file', help='Path to data file')
+        parser.add_argument('tsv_file', nargs='+',
+                            help='Path to data file which '
+                                 'can be compressed with any of '
+                                 'these: ' +
+                                 ', '.join(compression.
+                                           COMPRESSION_TYPES) +
+                                 '. Multiple paths and quoted glob '
+                                 'patterns, ie \'parts/*.tsv.gz\', can be '
+                                 'given to load files that all have the '
+                                 'same header as one network. Files ending '
+                                 'in .parquet, .pq, .arrow, .arrows, .feather '
+                                 'or .ipc are read as Parquet or Arrow, which '
+                                 'requires pyarrow package, and --header and '
+                                 '--uppercaseheader do not apply to them')
         parser.add_argument('load_plan', help='Path to load plan')
         parser.add_argument('-u',
                             help='If set, the UUID of network in NDEx '
@@ -2388,7 +2855,138 @@ class TSVLoader(object):
                                  'Only apples if --layout flag is '
                                  'set to ' + ndexutil.networkx.SPRING_LAYOUT)
         parser.add_argument('--outputcx',
-                            help='If set, CX will be written to this file')
+                            help='If set, CX will be written to this file. '
+                                 'If file name ends with a compression '
+                                 'extension such as .gz the CX is '
+                                 'compressed')
+        parser.add_argument('--nodecheck',
+                            choices=streamtsvloader.NODE_CHECK_MODES,
+                            default=streamtsvloader.NODE_CHECK_FULL,
+                            help='How repeated nodes are checked for '
+                                 'consistency. ' +
+                                 streamtsvloader.NODE_CHECK_FULL +
+                                 ' keeps every node and its attributes in '
+                                 'memory, ' +
+                                 streamtsvloader.NODE_CHECK_FINGERPRINT +
+                                 ' keeps only a hash of each node and ' +
+                                 streamtsvloader.NODE_CHECK_NONE +
+                                 ' skips the check using first occurrence '
+                                 'of node (only use for trusted inputs)')
+        parser.add_argument('--nodetable',
+                            choices=[TSVLoader.MEMORY_NODE_TABLE,
+                                     TSVLoader.DISK_NODE_TABLE],
+                            default=TSVLoader.MEMORY_NODE_TABLE,
+                            help='Where to keep table of nodes added to '
+                                 'network. ' + TSVLoader.DISK_NODE_TABLE +
+                                 ' stores the table in a SQLite database '
+                                 'under --tmpdir for networks whose nodes '
+                                 'do not fit in memory')
+        parser.add_argument('--nodetablecachesize', type=int,
+                            default=nodetable.DEFAULT_CACHE_SIZE,
+                            help='Number of nodes kept in memory when '
+                                 '--nodetable is set to ' +
+                                 TSVLoader.DISK_NODE_TABLE +
+                                 ' (default ' +
+                                 str(nodetable.DEFAULT_CACHE_SIZE) + ')')
+        parser.add_argument('--edgetable',
+                            choices=[TSVLoader.MEMORY_EDGE_TABLE,
+                                     TSVLoader.DISK_EDGE_TABLE],
+                            default=TSVLoader.MEMORY_EDGE_TABLE,
+                            help='Where to keep table of edges when '
+                                 '"collapse_edges" is set in "edge_plan" '
+                                 'of load plan. ' + TSVLoader.DISK_EDGE_TABLE +
+                                 ' stores the table in a SQLite database '
+                                 'under --tmpdir for networks whose edges '
+                                 'do not fit in memory')
+        parser.add_argument('--edgetablecachesize', type=int,
+                            default=edgetable.DEFAULT_CACHE_SIZE,
+                            help='Number of edges kept in memory when '
+                                 '--edgetable is set to ' +
+                                 TSVLoader.DISK_EDGE_TABLE +
+                                 ' (default ' +
+                                 str(edgetable.DEFAULT_CACHE_SIZE) + ')')
+        parser.add_argument('--delimiter', default='\t',
+                            help='Character separating values in tsv_file, '
+                                 'such as , for CSV files. \\t can be used '
+                                 'for tab (default tab)')
+        parser.add_argument('--quotechar', default='"',
+                            help='Character used to quote values in tsv_file '
+                                 'that contain the delimiter or line breaks. '
+                                 'Set to ' + TSVLoader.NO_QUOTECHAR +
+                                 ' if values are never quoted (default ")')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes used to parse rows '
+                                 'of tsv_file. If greater then 1, rows are '
+                                 'parsed in parallel while nodes and edges '
+                                 'are still added in order of the file')
+        parser.add_argument('--encoder', choices=streamtsvloader.ENCODERS,
+                            default=streamtsvloader.JSON_ENCODER,
+                            help='JSON encoder used to write CX. ' +
+                                 streamtsvloader.ORJSON_ENCODER +
+                                 ' is faster but requires orjson package. ' +
+                                 streamtsvloader.AUTO_ENCODER + ' uses ' +
+                                 streamtsvloader.ORJSON_ENCODER +
+                                 ' if it is installed')
+        parser.add_argument('--backgroundwriter', action='store_true',
+                            help='If set, CX is serialized and written by a '
+                                 'separate thread while the next batch of '
+                                 'rows is processed')
+        parser.add_argument('--compressoutput',
+                            choices=compression.COMPRESSION_TYPES,
+                            help='If set, CX written to --tmpdir before '
+                                 'upload is compressed with this type to '
+                                 'save disk space. Ignored if --layout '
+                                 'is set')
+        parser.add_argument('--streamupload', action='store_true',
+                            help='If set, CX is uploaded to NDEx while it '
+                                 'is generated instead of first being '
+                                 'written to --tmpdir. Ignored if --layout, '
+                                 '--outputcx, --checkpointdir, or '
+                                 '--skipupload is set')
+        parser.add_argument('--checkpointdir',
+                            help='If set, CX is written to this directory '
+                                 'instead of --tmpdir along with a checkpoint '
+                                 'of the load that is saved every '
+                                 '--checkpointinterval batches of rows. If '
+                                 'the load fails, rerun the same '
+                                 'command with --resume to continue from '
+                                 'the last checkpoint. Files are removed '
+                                 'once network is loaded. Disables '
+                                 '--compressoutput and --streamupload')
+        parser.add_argument('--resume', action='store_true',
+                            help='If set, continue load from checkpoint '
+                                 'in --checkpointdir. Input file and load '
+                                 'plan must be the same as the failed run. '
+                                 'If there is no checkpoint the load starts '
+                                 'from the beginning')
+        parser.add_argument('--checkpointinterval', type=int, default=10,
+                            help='Number of batches of rows written '
+                                 'between checkpoints when --checkpointdir '
+                                 'is set')
+        parser.add_argument('--batchsize', type=int, default=20000,
+                            help='Number of rows processed before nodes '
+                                 'and edges are written out')
+        parser.add_argument('--maxbatchbytes', type=int,
+                            help='If set, --batchsize is ignored and nodes '
+                                 'and edges are written out once their '
+                                 'estimated size in CX reaches this many '
+                                 'bytes, so each batch writes about the '
+                                 'same amount of output however many '
+                                 'attributes rows have. This is not a '
+                                 'memory limit, nodes and edges held in '
+                                 'memory take several times more')
+        parser.add_argument('--scanonly', action='store_true',
+                            help='If set, only scan TSV file(s) with load '
+                                 'plan and write a JSON report of rows '
+                                 'that do not match the plan along with '
+                                 'estimated number of nodes, edges, and '
+                                 'size of CX to standard out. Nothing is '
+                                 'uploaded to NDEx. Exit code is 1 if any '
+                                 'row does not match the plan')
+        parser.add_argument('--scanmaxrows', type=int,
+                            help='If set, --scanonly stops after scanning '
+                                 'this many rows. Estimates in the report '
+                                 'are then for the rows scanned only')
         return parser
 
 
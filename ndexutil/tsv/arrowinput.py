@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+import os
+import logging
+from ndexutil.exceptions import NDExUtilError
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    PYARROW_LOADED = True
+except ImportError as ie:
+    PYARROW_LOADED = False
+    logger.debug('Unable to load pyarrow. Parquet and Arrow inputs '
+                 'are not supported : ' + str(ie))
+
+
+PARQUET_FORMAT = 'parquet'
+"""
+`Apache Parquet <https://parquet.apache.org>`__ file
+"""
+
+ARROW_FORMAT = 'arrow'
+"""
+`Apache Arrow <https://arrow.apache.org>`__ IPC file or stream,
+also known as Feather version 2
+"""
+
+INPUT_FORMATS = [PARQUET_FORMAT, ARROW_FORMAT]
+"""
+Supported values for ``input_format`` of :py:class:`ArrowInput`
+"""
+
+ROWS_PER_BATCH = 65536
+"""
+Default maximum number of rows converted to Python values at a time
+"""
+
+# file extension => input format
+_EXTENSIONS = {'.parquet': PARQUET_FORMAT,
+               '.pq': PARQUET_FORMAT,
+               '.arrow': ARROW_FORMAT,
+               '.arrows': ARROW_FORMAT,
+               '.feather': ARROW_FORMAT,
+               '.ipc': ARROW_FORMAT}
+
+# data types in loading plan values of arrow types can be passed as
+# without converting them to strings first
+_INTEGER_DATA_TYPES = {'long', 'integer', 'double', 'float'}
+_FLOATING_DATA_TYPES = {'double', 'float'}
+_BOOLEAN_DATA_TYPES = {'boolean'}
+
+
+def get_input_format(tsv_input):
+    """
+    Gets format of `tsv_input` from the extension of its path
+
+    :param tsv_input: path to file or stream with a ``name``
+    :return: :py:const:`PARQUET_FORMAT`, :py:const:`ARROW_FORMAT`
+             or None if `tsv_input` does not have the extension
+             of either format
+    :rtype: str
+    """
+    name = tsv_input if isinstance(tsv_input, str) else getattr(tsv_input, 'name', None)
+    if not isinstance(name, str):
+        return None
+    return _EXTENSIONS.get(os.path.splitext(name)[1].lower())
+
+
+def _keeps_type(arrow_type, data_types):
+    """
+    Checks if values of `arrow_type` can be passed as Python values
+    of that type to columns of the loading plan with `data_types`
+
+    :param arrow_type: type of column in input
+    :type arrow_type: :py:class:`pyarrow.DataType`
+    :param data_types: data types in loading plan
+    :type data_types: set
+    :return: True if values do not need to be converted to str
+    :rtype: bool
+    """
+    if not data_types:
+        return False
+    if pyarrow.types.is_list(arrow_type) or pyarrow.types.is_large_list(arrow_type):
+        value_type = arrow_type.value_type
+        if not all(d.startswith('list_of_') for d in data_types):
+            return False
+        scalar_types = {d[len('list_of_'):] for d in data_types}
+        return scalar_types == {'string'} or\
+            _keeps_type(value_type, scalar_types - {'string'})
+    if pyarrow.types.is_boolean(arrow_type):
+        return data_types <= _BOOLEAN_DATA_TYPES
+    if pyarrow.types.is_integer(arrow_type):
+        return data_types <= _INTEGER_DATA_TYPES
+    if pyarrow.types.is_floating(arrow_type):
+        return data_types <= _FLOATING_DATA_TYPES
+    return False
+
+
+def _to_string_array(array, column_name):
+    """
+    Converts `array` to strings unless it already holds strings
+
+    :param array: values of column
+    :type array: :py:class:`pyarrow.Array`
+    :param column_name: name of column for error message
+    :type column_name: str
+    :raises NDExUtilError: if values cannot be converted
+    :return: strings
+    :rtype: :py:class:`pyarrow.Array`
+    """
+    if pyarrow.types.is_string(array.type) or\
+            pyarrow.types.is_large_string(array.type):
+        return array
+    try:
+        return pyarrow.compute.cast(array, pyarrow.string())
+    except pyarrow.ArrowNotImplementedError as e:
+        raise NDExUtilError('Values of column ' + str(column_name) + ' of type ' +
+                            str(array.type) + ' cannot be converted to '
+                            'strings: ' + str(e))
+
+
+class ArrowInput(object):
+    """
+    Input for :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+    that reads a `Apache Parquet <https://parquet.apache.org>`__ file or
+    `Apache Arrow <https://arrow.apache.org>`__ IPC file or stream in
+    record batches instead of parsing lines of text. Only the columns
+    used by the loading plan are read and values are converted column
+    by column.
+
+    Requires `pyarrow <https://pypi.org/project/pyarrow>`__
+    """
+
+    def __init__(self, source, input_format=None, batch_size=ROWS_PER_BATCH):
+        """
+        Constructor
+
+        :param source: path to file or seekable binary stream
+        :type source: str
+        :param input_format: :py:const:`PARQUET_FORMAT` or :py:const:`ARROW_FORMAT`.
+                             If ``None`` format is determined from extension of
+                             `source` via :py:func:`get_input_format`
+        :type input_format: str
+        :param batch_size: maximum number of rows converted to Python
+                           values at a time
+        :type batch_size: int
+        :raises NDExUtilError: if pyarrow is not installed, format is not
+                               supported or `batch_size` is less then 1
+        """
+        if PYARROW_LOADED is False:
+            raise NDExUtilError('pyarrow is not installed')
+        if input_format is None:
+            input_format = get_input_format(source)
+        if input_format not in INPUT_FORMATS:
+            raise NDExUtilError('Unsupported input_format ' + str(input_format) +
+                                ' for ' + str(source))
+        if batch_size is None or batch_size < 1:
+            raise NDExUtilError('batch_size must be 1 or larger')
+        self._source = source
+        self._input_format = input_format
+        self._batch_size = batch_size
+        self._schema = None
+
+    def get_name(self):
+        """
+        Gets name of input for messages
+
+        :return: path or name of stream
+        :rtype: str
+        """
+        if isinstance(self._source, str):
+            return self._source
+        return str(getattr(self._source, 'name', self._source))
+
+    def _rewind(self):
+        """
+        Moves stream passed in as source back to the start so it
+        can be opened again
+
+        :return: None
+        """
+        if not isinstance(self._source, str) and hasattr(self._source, 'seek'):
+            self._source.seek(0)
+
+    def _open_ipc(self):
+        """
+        Opens source as Arrow IPC file falling back to IPC stream
+
+        :return: reader
+        """
+        self._rewind()
+        try:
+            return pyarrow.ipc.open_file(self._source)
+        except pyarrow.ArrowInvalid:
+            self._rewind()
+            return pyarrow.ipc.open_stream(self._source)
+
+    def get_schema(self):
+        """
+        Gets schema of input reading it on first call
+
+        :raises NDExUtilError: if input has duplicate column names
+        :return: schema
+        :rtype: :py:class:`pyarrow.Schema`
+        """
+        if self._schema is None:
+            if self._input_format == PARQUET_FORMAT:
+                self._rewind()
+                schema = pyarrow.parquet.read_schema(self._source)
+            else:
+                schema = self._open_ipc().schema
+            if len(set(schema.names)) != len(schema.names):
+                raise NDExUtilError('Column names of ' + self.get_name() +
+                                    ' are not unique: ' + str(schema.names))
+            self._schema = schema
+        return self._schema
+
+    def get_column_names(self):
+        """
+        Gets names of columns in input
+
+        :return: column names
+        :rtype: list
+        """
+        return self.get_schema().names
+
+    def _read_batches(self, column_names):
+        """
+        Generator of record batches of input with just `column_names`
+        and at most ``batch_size`` rows
+
+        :param column_names: columns to read
+        :type column_names: list
+        :return: record batches
+        :rtype: :py:class:`pyarrow.RecordBatch`
+        """
+        if self._input_format == PARQUET_FORMAT:
+            self._rewind()
+            parquet_file = pyarrow.parquet.ParquetFile(self._source)
+            try:
+                yield from parquet_file.iter_batches(batch_size=self._batch_size,
+                                                     columns=column_names)
+            finally:
+                parquet_file.close()
+            return
+
+        reader = self._open_ipc()
+        if isinstance(reader, pyarrow.ipc.RecordBatchFileReader):
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        else:
+            batches = reader
+        for batch in batches:
+            batch = batch.select(column_names)
+            # batches in IPC files are written by the producer so
+            # split them to bound the memory used by Python values
+            for offset in range(0, batch.num_rows, self._batch_size):
+                yield batch.slice(offset, self._batch_size)
+
+    def read_rows(self, column_names=None, data_types=None):
+        """
+        Generator of rows of input as tuples of Python values. Columns
+        are converted column by column. Values of a column are strings,
+        or None for missing values, unless its type fits the loading plan
+        data types of the column in `data_types` in which case the values
+        are passed as the Python value of that type, skipping conversion
+        to and from strings. Integer columns fit ``long``, ``integer``,
+        ``double`` and ``float``, floating point columns fit ``double``
+        and ``float``, boolean columns fit ``boolean`` and list columns
+        fit ``list_of_`` data types whose values fit
+
+        :param column_names: columns to read in order. If ``None``
+                             all columns are read
+        :type column_names: list
+        :param data_types: column name => set of data types from loading
+                           plan for columns whose values can be passed
+                           without converting them to strings
+        :type data_types: dict
+        :raises NDExUtilError: if a column cannot be converted to strings
+        :return: rows
+        :rtype: tuple
+        """
+        schema = self.get_schema()
+        if column_names is None:
+            column_names = schema.names
+        if data_types is None:
+            data_types = {}
+        keep_types = [_keeps_type(schema.field(name).type, data_types.get(name))
+                      for name in column_names]
+        for batch in self._read_batches(column_names):
+            if not column_names:
+                yield from [()] * batch.num_rows
+                continue
+            columns = []
+            for index, name in enumerate(column_names):
+                array = batch.column(name)
+                if keep_types[index] is False:
+                    array = _to_string_array(array, name)
+                columns.append(array.to_pylist())
+            yield from zip(*columns)
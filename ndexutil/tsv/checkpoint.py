@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import json
+import pickle
+import logging
+from ndexutil.exceptions import NDExUtilError
+
+logger = logging.getLogger(__name__)
+
+
+def _fsync(stream):
+    """
+    Forces data written to `stream` to disk if `stream` is
+    backed by a file
+
+    :param stream: stream that has been flushed
+    :return: None
+    """
+    try:
+        os.fsync(stream.fileno())
+    except (AttributeError, OSError, io.UnsupportedOperation) as e:
+        logger.debug('Unable to fsync stream: ' + str(e))
+
+
+class TSVLoaderCheckpoint(object):
+    """
+    Checkpoint of :py:meth:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader.write_cx_network`
+    saved at batch boundaries so an interrupted load can be resumed
+    from the last batch written.
+
+    A checkpoint consists of a JSON file, `checkpoint_file`, holding
+    the counters and offsets of the load and an append only log,
+    `checkpoint_file` with ``.nodes`` suffix, holding the entries
+    added to the node table. Only entries added since the previous
+    checkpoint are appended to the log so saving a checkpoint does not
+    get slower as the node table grows
+    """
+
+    VERSION = 1
+    """
+    Version of checkpoint format
+    """
+
+    NODE_LOG_SUFFIX = '.nodes'
+    """
+    Suffix appended to checkpoint file to get path to node table log
+    """
+
+    def __init__(self, checkpoint_file):
+        """
+        Constructor
+
+        :param checkpoint_file: path to checkpoint file
+        :type checkpoint_file: str
+        :raises NDExUtilError: if `checkpoint_file` is None
+        """
+        if checkpoint_file is None:
+            raise NDExUtilError('checkpoint_file is None')
+        self._checkpoint_file = checkpoint_file
+        self._node_log_file = checkpoint_file + TSVLoaderCheckpoint.NODE_LOG_SUFFIX
+        self._node_log = None
+
+    def get_checkpoint_file(self):
+        """
+        Gets path to checkpoint file
+
+        :return: path to checkpoint file
+        :rtype: str
+        """
+        return self._checkpoint_file
+
+    def get_node_log_file(self):
+        """
+        Gets path to node table log
+
+        :return: path to node table log
+        :rtype: str
+        """
+        return self._node_log_file
+
+    def load(self):
+        """
+        Loads last saved checkpoint
+
+        :raises NDExUtilError: if checkpoint was saved in an unsupported
+                               format or its node table log is missing
+        :return: state of load as passed to :py:meth:`save` plus
+                 ``output_offset`` and ``node_log_size`` or None if
+                 there is no checkpoint
+        :rtype: dict
+        """
+        if not os.path.isfile(self._checkpoint_file):
+            return None
+        with open(self._checkpoint_file, 'r') as f:
+            state = json.load(f)
+        if state.get('version') != TSVLoaderCheckpoint.VERSION:
+            raise NDExUtilError('Unsupported checkpoint version ' +
+                                str(state.get('version')) + ' in ' +
+                                self._checkpoint_file)
+        if not os.path.isfile(self._node_log_file):
+            raise NDExUtilError('Node table log ' + self._node_log_file +
+                                ' for checkpoint is missing')
+        return state
+
+    def restore_node_table(self, node_table, state):
+        """
+        Adds entries in node table log saved up to checkpoint
+        `state` to `node_table`. Any entries logged after the checkpoint
+        are removed from the log
+
+        :param node_table: empty node table to add entries to
+        :param state: checkpoint returned by :py:meth:`load`
+        :type state: dict
+        :return: number of entries added
+        :rtype: int
+        """
+        node_log_size = state['node_log_size']
+        count = 0
+        with open(self._node_log_file, 'r+b') as f:
+            while f.tell() < node_log_size:
+                for key, value in pickle.load(f):
+                    node_table[key] = value
+                    count += 1
+            f.truncate(node_log_size)
+        return count
+
+    def start(self, resume=False):
+        """
+        Opens node table log for saving checkpoints
+
+        :param resume: If True entries are appended to existing log
+                       otherwise a new log is started and any checkpoint
+                       file from an earlier load is deleted so it cannot
+                       be resumed against the new log
+        :type resume: bool
+        :return: None
+        """
+        if not resume and os.path.isfile(self._checkpoint_file):
+            os.unlink(self._checkpoint_file)
+        self._node_log = open(self._node_log_file, 'ab' if resume else 'wb')
+
+    def save(self, state, node_entries, output_stream):
+        """
+        Saves checkpoint. The node table entries are appended to the log
+        and both the log and `output_stream` are flushed to disk before
+        the checkpoint file is atomically replaced so a checkpoint never
+        refers to data that was not saved
+
+        :param state: state of load, must be serializable to JSON
+        :type state: dict
+        :param node_entries: (key, value) tuples added to node table
+                             since previous checkpoint
+        :type node_entries: list
+        :param output_stream: seekable stream CX is written to
+        :return: None
+        """
+        if node_entries:
+            pickle.dump(node_entries, self._node_log, pickle.HIGHEST_PROTOCOL)
+        self._node_log.flush()
+        _fsync(self._node_log)
+        output_stream.flush()
+        _fsync(output_stream)
+
+        checkpoint = dict(state)
+        checkpoint['version'] = TSVLoaderCheckpoint.VERSION
+        checkpoint['node_log_size'] = self._node_log.tell()
+        checkpoint['output_offset'] = output_stream.tell()
+
+        tmp_file = self._checkpoint_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            _fsync(f)
+        os.replace(tmp_file, self._checkpoint_file)
+
+    def close(self):
+        """
+        Closes node table log
+
+        :return: None
+        """
+        if self._node_log is not None:
+            self._node_log.close()
+            self._node_log = None
+
+    def remove(self):
+        """
+        Closes and deletes checkpoint file and node table log
+
+        :return: None
+        """
+        self.close()
+        for f in [self._checkpoint_file, self._node_log_file]:
+            if os.path.isfile(f):
+                os.unlink(f)
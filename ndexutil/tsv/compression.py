@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+import io
+import bz2
+import gzip
+import lzma
+import logging
+from ndexutil.exceptions import NDExUtilError
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+
+    ZSTANDARD_LOADED = True
+except ImportError as ie:
+    ZSTANDARD_LOADED = False
+    logger.debug('Unable to load zstandard. Reading and writing '
+                 'zstd compressed files will not work : ' + str(ie))
+
+
+GZIP = 'gzip'
+"""
+gzip compression
+"""
+
+BZIP2 = 'bz2'
+"""
+bzip2 compression
+"""
+
+XZ = 'xz'
+"""
+xz compression
+"""
+
+ZSTD = 'zstd'
+"""
+Zstandard compression, requires
+`zstandard <https://pypi.org/project/zstandard>`__ package
+"""
+
+COMPRESSION_TYPES = [GZIP, BZIP2, XZ, ZSTD]
+"""
+Supported compression types
+"""
+
+COMPRESSION_EXTENSIONS = {GZIP: '.gz',
+                          BZIP2: '.bz2',
+                          XZ: '.xz',
+                          ZSTD: '.zst'}
+"""
+File extension added for each compression type
+"""
+
+_EXTENSIONS = {'.gz': GZIP, '.gzip': GZIP,
+               '.bz2': BZIP2,
+               '.xz': XZ,
+               '.zst': ZSTD, '.zstd': ZSTD}
+
+_MAGIC_NUMBERS = [(b'\x1f\x8b', GZIP),
+                  (b'BZh', BZIP2),
+                  (b'\xfd7zXZ\x00', XZ),
+                  (b'\x28\xb5\x2f\xfd', ZSTD)]
+
+_MAX_MAGIC_LENGTH = 6
+
+
+def get_compression_from_filename(filename):
+    """
+    Gets compression type from extension of `filename`
+
+    :param filename: path to file
+    :type filename: str
+    :return: compression type from :py:const:`COMPRESSION_TYPES` or
+             None if extension does not denote compression
+    :rtype: str
+    """
+    if filename is None:
+        return None
+    for ext, compression in _EXTENSIONS.items():
+        if filename.lower().endswith(ext):
+            return compression
+    return None
+
+
+def get_compression_from_header(data):
+    """
+    Gets compression type by looking at magic number at start of `data`
+
+    :param data: first bytes of file
+    :type data: bytes
+    :return: compression type from :py:const:`COMPRESSION_TYPES` or None if
+             `data` does not start with a known magic number
+    :rtype: str
+    """
+    for magic, compression in _MAGIC_NUMBERS:
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def _check_compression(compression):
+    """
+    Verifies `compression` is supported
+
+    :raises NDExUtilError: if `compression` is not supported or requires
+                           a package that is not installed
+    :return: None
+    """
+    if compression not in COMPRESSION_TYPES:
+        raise NDExUtilError('Unsupported compression ' + str(compression) +
+                            '. Must be one of ' + str(COMPRESSION_TYPES))
+    if compression == ZSTD and ZSTANDARD_LOADED is False:
+        raise NDExUtilError('zstandard package is required for ' +
+                            ZSTD + ' compression')
+
+
+class _NonClosingBufferedReader(io.BufferedReader):
+    """
+    Buffered reader that leaves the stream it wraps open when
+    it is closed or garbage collected
+    """
+    def close(self):
+        pass
+
+
+def get_decompressed_stream(binary_stream):
+    """
+    Wraps `binary_stream` with a stream that decompresses the data
+    if it starts with the magic number of a supported compression type,
+    otherwise data is passed through as is
+
+    :param binary_stream: stream opened in binary mode
+    :raises NDExUtilError: if data is zstd compressed and zstandard package
+                           is not installed
+    :return: binary stream of decompressed data
+    """
+    if not hasattr(binary_stream, 'peek'):
+        binary_stream = _NonClosingBufferedReader(binary_stream)
+    compression = get_compression_from_header(binary_stream.
+                                              peek(_MAX_MAGIC_LENGTH)
+                                              [:_MAX_MAGIC_LENGTH])
+    if compression is None:
+        return binary_stream
+    _check_compression(compression)
+    logger.debug('Decompressing ' + compression + ' input')
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=binary_stream, mode='rb')
+    if compression == BZIP2:
+        return bz2.BZ2File(binary_stream, mode='rb')
+    if compression == XZ:
+        return lzma.LZMAFile(binary_stream, mode='rb')
+    return io.BufferedReader(zstandard.ZstdDecompressor().
+                             stream_reader(binary_stream,
+                                           read_across_frames=True,
+                                           closefd=False))
+
+
+def get_decompressed_text_stream(binary_stream, encoding='utf-8'):
+    """
+    Same as :py:func:`get_decompressed_stream` but returns a
+    text stream
+
+    :param binary_stream: stream opened in binary mode
+    :param encoding: encoding of text
+    :type encoding: str
+    :return: text stream of decompressed data
+    :rtype: :py:class:`io.TextIOWrapper`
+    """
+    return io.TextIOWrapper(get_decompressed_stream(binary_stream),
+                            encoding=encoding)
+
+
+def open_input(filename, mode='rt', encoding='utf-8'):
+    """
+    Opens `filename` for reading transparently decompressing it if
+    it is compressed. Compression is detected by looking at the first
+    bytes of the file so the extension does not matter
+
+    :param filename: path to file
+    :type filename: str
+    :param mode: ``rt`` for text or ``rb`` for binary
+    :type mode: str
+    :param encoding: encoding of text, ignored if `mode` is ``rb``
+    :type encoding: str
+    :raises NDExUtilError: if `mode` is not ``rt`` or ``rb`` or file is
+                           zstd compressed and zstandard package is
+                           not installed
+    :return: stream
+    """
+    if mode not in ['rt', 'rb']:
+        raise NDExUtilError('mode must be rt or rb')
+    if mode == 'rb':
+        encoding = None
+    with open(filename, 'rb') as f:
+        compression = get_compression_from_header(f.read(_MAX_MAGIC_LENGTH))
+    if compression is None:
+        return open(filename, mode, encoding=encoding)
+    _check_compression(compression)
+    if compression == GZIP:
+        return gzip.open(filename, mode, encoding=encoding)
+    if compression == BZIP2:
+        return bz2.open(filename, mode, encoding=encoding)
+    if compression == XZ:
+        return lzma.open(filename, mode, encoding=encoding)
+    stream = io.BufferedReader(zstandard.ZstdDecompressor().
+                               stream_reader(open(filename, 'rb'),
+                                             read_across_frames=True,
+                                             closefd=True))
+    if mode == 'rb':
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding)
+
+
+def open_output(filename, compression=None):
+    """
+    Opens `filename` for writing in binary mode compressing
+    the data written if `compression` is set
+
+    :param filename: path to file
+    :type filename: str
+    :param compression: compression type from :py:const:`COMPRESSION_TYPES`
+                        or None for no compression
+    :type compression: str
+    :raises NDExUtilError: if `compression` is not supported
+    :return: binary stream
+    """
+    if compression is None:
+        return open(filename, 'wb')
+    _check_compression(compression)
+    if compression == GZIP:
+        return gzip.open(filename, 'wb', compresslevel=6)
+    if compression == BZIP2:
+        return bz2.open(filename, 'wb')
+    if compression == XZ:
+        return lzma.open(filename, 'wb')
+    return zstandard.open(filename, 'wb')
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import sqlite3
+import logging
+from collections import OrderedDict
+from ndexutil.exceptions import NDExUtilError
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SIZE = 100000
+"""
+Default maximum number of edges :py:class:`SQLiteEdgeTable`
+keeps in memory
+"""
+
+
+def _get_seen(values):
+    """
+    Gets set of the hashable entries of `values`
+
+    :param values: merged values
+    :type values: list
+    :return: hashable entries
+    :rtype: set
+    """
+    seen = set()
+    for value in values:
+        try:
+            seen.add(value)
+        except TypeError:
+            pass
+    return seen
+
+
+def _add_value(values, seen, value):
+    """
+    Appends `value` to `values` unless it is already in there. Hashable
+    values are looked up in `seen`, which holds the hashable entries of
+    `values`, and only unhashable values are looked up in `values`
+
+    :param values: merged values, updated in place
+    :type values: list
+    :param seen: hashable entries of `values`, updated in place
+    :type seen: set
+    :return: None
+    """
+    try:
+        if value in seen:
+            return
+        seen.add(value)
+    except TypeError:
+        if value in values:
+            return
+    values.append(value)
+
+
+def merge_edge_attributes(merged_attributes, attributes, seen_values=None):
+    """
+    Merges `attributes` of an edge into `merged_attributes` of an
+    edge collapsed with it. Every merged attribute is a ``list_of_``
+    attribute holding the distinct values, in order of first
+    occurrence, of that attribute in all the rows collapsed so the
+    type of an attribute is the same for every edge
+
+    :param merged_attributes: attributes keyed by attribute name,
+                              updated in place
+    :type merged_attributes: dict
+    :param attributes: attributes to merge keyed by attribute name
+    :type attributes: dict
+    :param seen_values: attribute name => set of the hashable values
+                        of the merged attribute, updated in place. Pass
+                        the same dict for every merge into
+                        `merged_attributes` so merging does not get slower
+                        as values are added. If ``None`` the sets are
+                        created from `merged_attributes` for this merge
+    :type seen_values: dict
+    :return: None
+    """
+    if seen_values is None:
+        seen_values = {}
+    for name, attribute in attributes.items():
+        merged = merged_attributes.get(name)
+        if merged is None:
+            data_type = attribute.get('d') or 'string'
+            if not data_type.startswith('list_of_'):
+                data_type = 'list_of_' + data_type
+            merged = {'n': attribute['n'], 'v': [], 'd': data_type}
+            merged_attributes[name] = merged
+            seen = set()
+            seen_values[name] = seen
+        else:
+            seen = seen_values.get(name)
+            if seen is None:
+                seen = _get_seen(merged['v'])
+                seen_values[name] = seen
+        if (attribute.get('d') or '').startswith('list_of_'):
+            for value in attribute['v']:
+                _add_value(merged['v'], seen, value)
+        else:
+            _add_value(merged['v'], seen, attribute['v'])
+
+
+class InMemoryEdgeTable(object):
+    """
+    Edge table used by :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+    to collapse edges with the same source, target and interaction
+    that keeps every edge in memory. This is the default and fastest
+    edge table, but memory grows with the number of distinct edges.
+
+    Edge tables must support :py:meth:`add`, ``len(table)``, iterating
+    over the edges in the order they were first added and ``close()``
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # (source, target, interaction) => position of edge in self._edges
+        self._index = {}
+        self._edges = []
+        # values seen of merged attributes for each edge in self._edges
+        self._seen_values = []
+
+    def add(self, source, target, interaction, attributes):
+        """
+        Adds edge or merges `attributes` into edge with the same
+        `source`, `target` and `interaction` via :py:func:`merge_edge_attributes`
+
+        :param source: id of source node
+        :type source: int
+        :param target: id of target node
+        :type target: int
+        :param interaction: interaction of edge
+        :type interaction: str
+        :param attributes: attributes of edge keyed by attribute name
+        :type attributes: dict
+        :return: True if edge is new, False if it was merged
+        :rtype: bool
+        """
+        key = (source, target, interaction)
+        position = self._index.get(key)
+        if position is not None:
+            merge_edge_attributes(self._edges[position][3], attributes,
+                                  self._seen_values[position])
+            return False
+        self._index[key] = len(self._edges)
+        merged_attributes = {}
+        seen_values = {}
+        merge_edge_attributes(merged_attributes, attributes, seen_values)
+        self._edges.append((source, target, interaction, merged_attributes))
+        self._seen_values.append(seen_values)
+        return True
+
+    def __len__(self):
+        """
+        Gets number of distinct edges
+
+        :return: number of edges
+        :rtype: int
+        """
+        return len(self._edges)
+
+    def __iter__(self):
+        """
+        Iterates over edges in the order they were first added
+
+        :return: (source, target, interaction, merged attributes)
+        :rtype: tuple
+        """
+        return iter(self._edges)
+
+    def close(self):
+        """
+        Releases the edges
+
+        :return: None
+        """
+        self._index.clear()
+        self._edges = []
+        self._seen_values = []
+
+
+class SQLiteEdgeTable(object):
+    """
+    Edge table used by :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+    to collapse edges that stores edges in a SQLite database on disk
+    and keeps only a bounded number of recently used edges in memory.
+    Use this when the distinct edges of a network do not fit in memory.
+
+    Edges are stored via :py:mod:`pickle`
+    """
+
+    def __init__(self, dbfile, cache_size=DEFAULT_CACHE_SIZE, flush_size=10000):
+        """
+        Constructor
+
+        :param dbfile: path to SQLite database file to create. Should
+                       not exist and is deleted by :py:meth:`close`
+        :type dbfile: str
+        :param cache_size: maximum number of edges kept in memory
+        :type cache_size: int
+        :param flush_size: number of changed edges evicted from memory
+                           that are buffered before they are written
+                           to database
+        :type flush_size: int
+        :raises NDExUtilError: if `dbfile` already exists or `cache_size`
+                               or `flush_size` is less then 1
+        """
+        if dbfile is None:
+            raise NDExUtilError('dbfile is None')
+        if os.path.exists(dbfile):
+            raise NDExUtilError(dbfile + ' already exists')
+        if cache_size is None or cache_size < 1:
+            raise NDExUtilError('cache_size must be 1 or larger')
+        if flush_size is None or flush_size < 1:
+            raise NDExUtilError('flush_size must be 1 or larger')
+        self._dbfile = dbfile
+        self._cache_size = cache_size
+        self._flush_size = flush_size
+        # key => [position, edge, changed since written to database,
+        #         values seen of merged attributes of edge]
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._count = 0
+        self._conn = sqlite3.connect(dbfile)
+        self._conn.execute('PRAGMA journal_mode = OFF')
+        self._conn.execute('PRAGMA synchronous = OFF')
+        self._conn.execute('CREATE TABLE edgetable '
+                           '(position INTEGER PRIMARY KEY, '
+                           'key TEXT UNIQUE, value BLOB)')
+
+    @staticmethod
+    def _get_key(source, target, interaction):
+        return str(source) + '\t' + str(target) + '\t' + interaction
+
+    def add(self, source, target, interaction, attributes):
+        """
+        Adds edge or merges `attributes` into edge with the same
+        `source`, `target` and `interaction` via :py:func:`merge_edge_attributes`
+
+        :param source: id of source node
+        :type source: int
+        :param target: id of target node
+        :type target: int
+        :param interaction: interaction of edge
+        :type interaction: str
+        :param attributes: attributes of edge keyed by attribute name
+        :type attributes: dict
+        :return: True if edge is new, False if it was merged
+        :rtype: bool
+        """
+        key = SQLiteEdgeTable._get_key(source, target, interaction)
+        entry = self._get_entry(key)
+        if entry is not None:
+            merge_edge_attributes(entry[1][3], attributes, entry[3])
+            entry[2] = True
+            return False
+        merged_attributes = {}
+        seen_values = {}
+        merge_edge_attributes(merged_attributes, attributes, seen_values)
+        self._add_to_cache(key, [self._count,
+                                 (source, target, interaction, merged_attributes),
+                                 True, seen_values])
+        self._count += 1
+        return True
+
+    def _get_entry(self, key):
+        """
+        Gets cache entry for `key` loading it from database if needed
+
+        :return: [position, edge, changed, seen values] or None if not found
+        :rtype: list
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            return entry
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            row = self._conn.execute('SELECT position, value FROM edgetable '
+                                     'WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            edge, seen_values = pickle.loads(row[1])
+            entry = [row[0], edge, False, seen_values]
+        self._add_to_cache(key, entry)
+        return entry
+
+    def _add_to_cache(self, key, entry):
+        """
+        Adds entry to in memory cache evicting the least recently used
+        entry if the cache is full. Evicted entries that changed are
+        buffered to be written to database
+
+        :return: None
+        """
+        self._cache[key] = entry
+        if len(self._cache) > self._cache_size:
+            old_key, old_entry = self._cache.popitem(last=False)
+            if old_entry[2] is True:
+                self._pending[old_key] = old_entry
+                if len(self._pending) >= self._flush_size:
+                    self._write_entries(self._pending)
+                    self._pending.clear()
+
+    def _write_entries(self, entries):
+        """
+        Writes changed `entries` to database
+
+        :param entries: key => [position, edge, changed, seen values]
+        :type entries: dict
+        :return: None
+        """
+        self._conn.executemany('INSERT OR REPLACE INTO edgetable '
+                               '(position, key, value) VALUES (?, ?, ?)',
+                               [(entry[0], key,
+                                 pickle.dumps((entry[1], entry[3]),
+                                              pickle.HIGHEST_PROTOCOL))
+                                for key, entry in entries.items()
+                                if entry[2] is True])
+        self._conn.commit()
+        for entry in entries.values():
+            entry[2] = False
+
+    def flush(self):
+        """
+        Writes all changed edges to database
+
+        :return: None
+        """
+        self._write_entries(self._pending)
+        self._pending.clear()
+        self._write_entries(self._cache)
+
+    def __len__(self):
+        """
+        Gets number of distinct edges
+
+        :return: number of edges
+        :rtype: int
+        """
+        return self._count
+
+    def __iter__(self):
+        """
+        Writes all changed edges to database and iterates over edges
+        in the order they were first added
+
+        :return: (source, target, interaction, merged attributes)
+        :rtype: tuple
+        """
+        self.flush()
+        cursor = self._conn.execute('SELECT value FROM edgetable '
+                                    'ORDER BY position')
+        for row in cursor:
+            yield pickle.loads(row[0])[0]
+
+    def close(self):
+        """
+        Closes database and removes the database file
+
+        :return: None
+        """
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+        self._cache.clear()
+        self._pending.clear()
+        if os.path.isfile(self._dbfile):
+            os.unlink(self._dbfile)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import logging
+import tempfile
+from requests.exceptions import HTTPError
+
+logger = logging.getLogger(__name__)
+
+
+NETWORKS_PER_PAGE = 500
+"""
+Number of network summaries requested from NDEx at a time
+"""
+
+CACHE_FILE = '.ndexutils_networks.json'
+"""
+Name of cache file in user's home directory used by
+:py:class:`NetworkNameCache` if no other file is given
+"""
+
+
+class NetworkNameCache(object):
+    """
+    Maps names of networks of a user on NDEx to their UUIDs.
+
+    The map is built lazily, on the first lookup, from network summaries
+    requested :py:const:`NETWORKS_PER_PAGE` at a time and is saved in
+    `cache_file`, shared by all servers and users, so later runs start
+    from the saved map.
+
+    A name found in the map is checked against the summary of its
+    network on NDEx. A name that is not found refreshes the map and a
+    name whose network was deleted or renamed rebuilds it. Assuming
+    NDEx returns summaries most recently modified first, a refresh
+    stops at the first page that ends with a network not modified
+    since the last complete refresh so only networks that changed
+    are requested. Once summaries turn out not to be in that order all
+    pages are requested on every refresh.
+
+    If several networks have the same name, the most recently modified
+    one is used
+    """
+
+    VERSION = 1
+    """
+    Version of cache file format
+    """
+
+    def __init__(self, ndex, server, username, cache_file=None):
+        """
+        Constructor
+
+        :param ndex: client to request network summaries with
+        :type ndex: :py:class:`~ndex2.client.Ndex2`
+        :param server: NDEx server, used with `username` to find
+                       networks of user in `cache_file`
+        :type server: str
+        :param username: user whose networks are looked up
+        :type username: str
+        :param cache_file: path to cache file. If ``None``
+                           :py:const:`CACHE_FILE` in user's home
+                           directory is used
+        :type cache_file: str
+        """
+        self._ndex = ndex
+        self._username = username
+        self._key = str(server) + ' ' + str(username)
+        if cache_file is None:
+            cache_file = os.path.join(os.path.expanduser('~'), CACHE_FILE)
+        self._cache_file = cache_file
+        self._synced = None
+        self._ordered = True
+        self._networks = None
+
+    def get_cache_file(self):
+        """
+        Gets path to cache file
+
+        :return: path to cache file
+        :rtype: str
+        """
+        return self._cache_file
+
+    def _load(self):
+        """
+        Loads networks of user from cache file unless already loaded.
+        A missing or unreadable cache file is treated as empty
+
+        :return: None
+        """
+        if self._networks is not None:
+            return
+        self._networks = {}
+        if not os.path.isfile(self._cache_file):
+            return
+        try:
+            with open(self._cache_file, 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning('Ignoring unreadable network cache ' +
+                           self._cache_file + ': ' + str(e))
+            return
+        if cache.get('version') != NetworkNameCache.VERSION:
+            logger.info('Ignoring network cache ' + self._cache_file +
+                        ' with unsupported version ' + str(cache.get('version')))
+            return
+        account = cache.get('accounts', {}).get(self._key)
+        if account is not None:
+            self._synced = account.get('synced')
+            self._ordered = account.get('ordered', True)
+            self._networks = account.get('networks', {})
+
+    def _save(self):
+        """
+        Replaces networks of user in cache file keeping those of other
+        users. Failures are logged since lookups work without the file
+
+        :return: None
+        """
+        cache = None
+        if os.path.isfile(self._cache_file):
+            try:
+                with open(self._cache_file, 'r') as f:
+                    cache = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.debug('Replacing unreadable network cache: ' + str(e))
+        if cache is None or cache.get('version') != NetworkNameCache.VERSION:
+            cache = {'version': NetworkNameCache.VERSION, 'accounts': {}}
+        cache.setdefault('accounts', {})[self._key] = {'synced': self._synced,
+                                                       'ordered': self._ordered,
+                                                       'networks': self._networks}
+        # unique temp file so concurrent saves do not write to the same file
+        tmp_file = None
+        try:
+            fd, tmp_file = tempfile.mkstemp(prefix=os.path.basename(self._cache_file),
+                                            suffix='.tmp',
+                                            dir=os.path.dirname(os.path.abspath(self._cache_file)))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, self._cache_file)
+        except OSError as e:
+            logger.warning('Unable to save network cache ' +
+                           self._cache_file + ': ' + str(e))
+            if tmp_file is not None and os.path.isfile(tmp_file):
+                os.unlink(tmp_file)
+
+    def _add(self, summary):
+        """
+        Adds network in `summary` to map unless a more recently
+        modified network has the same name
+
+        :param summary: network summary from NDEx
+        :type summary: dict
+        :return: name of network in upper case or None if network
+                 has no name
+        :rtype: str
+        """
+        if summary.get('name') is None:
+            return None
+        key = summary['name'].upper()
+        modification_time = summary.get('modificationTime') or 0
+        entry = self._networks.get(key)
+        if entry is None or entry[1] <= modification_time or\
+                entry[0] == summary.get('externalId'):
+            self._networks[key] = [summary.get('externalId'), modification_time]
+        return key
+
+    def refresh(self, name=None):
+        """
+        Requests network summaries changed since last complete refresh,
+        or all of them if there was none, and saves them to cache file
+
+        :param name: if set, stops once a network with this name,
+                     ignoring case, is found
+        :type name: str
+        :return: None
+        """
+        self._load()
+        key = name.upper() if name is not None else None
+        newest = self._synced
+        previous = None
+        complete = False
+        offset = 0
+        while True:
+            summaries = self._ndex.get_user_network_summaries(self._username,
+                                                              offset=offset,
+                                                              limit=NETWORKS_PER_PAGE)
+            summaries = summaries or []
+            found = False
+            for summary in summaries:
+                added = self._add(summary)
+                if key is not None and added == key:
+                    found = True
+                modification_time = summary.get('modificationTime') or 0
+                if previous is not None and modification_time > previous:
+                    self._ordered = False
+                previous = modification_time
+                if newest is None or modification_time > newest:
+                    newest = modification_time
+            if len(summaries) < NETWORKS_PER_PAGE:
+                complete = True
+                break
+            if self._ordered and self._synced is not None and previous < self._synced:
+                complete = True
+                break
+            if found:
+                break
+            offset += NETWORKS_PER_PAGE
+        logger.debug('Requested ' + str(offset + len(summaries)) +
+                     ' network summaries of ' + str(self._username))
+        if complete:
+            self._synced = newest
+        self._save()
+
+    def _is_current(self, key, uuid):
+        """
+        Checks if network `uuid` still exists on NDEx and is named `key`
+
+        :return: True if network has name `key` ignoring case
+        :rtype: bool
+        """
+        try:
+            summary = self._ndex.get_network_summary(uuid)
+        except HTTPError as he:
+            logger.debug('Unable to get summary of network ' + str(uuid) +
+                         ': ' + str(he))
+            return False
+        return bool(summary) and isinstance(summary.get('name'), str) and\
+            summary['name'].upper() == key
+
+    def get_network_uuid(self, name):
+        """
+        Gets UUID of network of user named `name`, ignoring case
+
+        :param name: name of network
+        :type name: str
+        :return: UUID of network or None if user has no such network
+        :rtype: str
+        """
+        if name is None:
+            return None
+        self._load()
+        key = name.upper()
+        entry = self._networks.get(key)
+        if entry is not None:
+            if self._is_current(key, entry[0]):
+                return entry[0]
+            # an older network with the same name may have been
+            # replaced in the map so request all summaries
+            del self._networks[key]
+            self._synced = None
+        self.refresh(name)
+        entry = self._networks.get(key)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def get_mapping(self):
+        """
+        Rebuilds map from summaries of all networks of user, dropping
+        networks that were deleted or renamed, and gets it
+
+        :return: name of network in upper case => UUID
+        :rtype: dict
+        """
+        self._load()
+        self._networks = {}
+        self._synced = None
+        self.refresh()
+        return {key: entry[0] for key, entry in self._networks.items()}
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import sqlite3
+import logging
+from collections import OrderedDict
+from ndexutil.exceptions import NDExUtilError
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_SIZE = 100000
+"""
+Default maximum number of nodes :py:class:`SQLiteNodeTable`
+keeps in memory
+"""
+
+
+class InMemoryNodeTable(dict):
+    """
+    Node table used by :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+    that keeps every entry in memory. This is the default and
+    fastest node table, but memory grows with the number of nodes.
+
+    Node tables map the external id of a node to the value stored
+    by the loader and must support ``get(key)``, ``table[key] = value``,
+    ``len(table)`` and ``close()``
+    """
+
+    def close(self):
+        """
+        Does nothing since there is nothing to release
+
+        :return: None
+        """
+        pass
+
+
+class SQLiteNodeTable(object):
+    """
+    Node table used by :py:class:`~ndexutil.tsv.streamtsvloader.StreamTSVLoader`
+    that stores entries in a SQLite database on disk and keeps only
+    a bounded number of recently used entries in memory. Use this
+    when the nodes of a network do not fit in memory.
+
+    Values are stored via :py:mod:`pickle`
+    """
+
+    def __init__(self, dbfile, cache_size=DEFAULT_CACHE_SIZE, flush_size=10000):
+        """
+        Constructor
+
+        :param dbfile: path to SQLite database file to create. Should
+                       not exist and is deleted by :py:meth:`close`
+        :type dbfile: str
+        :param cache_size: maximum number of entries kept in memory
+        :type cache_size: int
+        :param flush_size: number of new entries buffered in memory
+                           before they are written to database
+        :type flush_size: int
+        :raises NDExUtilError: if `dbfile` already exists or `cache_size`
+                               or `flush_size` is less then 1
+        """
+        if dbfile is None:
+            raise NDExUtilError('dbfile is None')
+        if os.path.exists(dbfile):
+            raise NDExUtilError(dbfile + ' already exists')
+        if cache_size is None or cache_size < 1:
+            raise NDExUtilError('cache_size must be 1 or larger')
+        if flush_size is None or flush_size < 1:
+            raise NDExUtilError('flush_size must be 1 or larger')
+        self._dbfile = dbfile
+        self._cache_size = cache_size
+        self._flush_size = flush_size
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._count = 0
+        self._conn = sqlite3.connect(dbfile)
+        self._conn.execute('PRAGMA journal_mode = OFF')
+        self._conn.execute('PRAGMA synchronous = OFF')
+        self._conn.execute('CREATE TABLE nodetable '
+                           '(key TEXT PRIMARY KEY, value BLOB)')
+
+    def get(self, key, default=None):
+        """
+        Gets value for `key`
+
+        :param key: external id of node
+        :type key: str
+        :param default: value to return if `key` is not in table
+        :return: value or `default` if not found
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+            return value
+        value = self._pending.get(key)
+        if value is None:
+            row = self._conn.execute('SELECT value FROM nodetable '
+                                     'WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return default
+            value = pickle.loads(row[0])
+        self._add_to_cache(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        """
+        Adds `key` with `value` to the table. Entries are expected to be
+        added only once
+
+        :param key: external id of node
+        :type key: str
+        :param value: value to store, must not be None
+        :return: None
+        """
+        self._pending[key] = value
+        self._count += 1
+        self._add_to_cache(key, value)
+        if len(self._pending) >= self._flush_size:
+            self.flush()
+
+    def __len__(self):
+        """
+        Gets number of entries in table
+
+        :return: number of entries
+        :rtype: int
+        """
+        return self._count
+
+    def _add_to_cache(self, key, value):
+        """
+        Adds entry to in memory cache evicting the least recently used
+        entry if the cache is full
+
+        :return: None
+        """
+        self._cache[key] = value
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def flush(self):
+        """
+        Writes buffered entries to database
+
+        :return: None
+        """
+        if not self._pending:
+            return
+        self._conn.executemany('INSERT OR REPLACE INTO nodetable '
+                               '(key, value) VALUES (?, ?)',
+                               [(key, pickle.dumps(value,
+                                                   pickle.HIGHEST_PROTOCOL))
+                                for key, value in self._pending.items()])
+        self._conn.commit()
+        self._pending.clear()
+
+    def close(self):
+        """
+        Closes database and removes the database file
+
+        :return: None
+        """
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+        self._cache.clear()
+        self._pending.clear()
+        if os.path.isfile(self._dbfile):
+            os.unlink(self._dbfile)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+import re
+import operator
+from ndexutil.exceptions import NDExUtilError
+
+_COMPARISONS = {'==': operator.eq, '!=': operator.ne,
+                '<': operator.lt, '<=': operator.le,
+                '>': operator.gt, '>=': operator.ge}
+
+
+def _compile_condition(condition):
+    """
+    Compiles a condition from ``row_filter`` of loading plan into
+    a function that creates the test for a row once the position of
+    the column is known. Comparisons with a number convert the value
+    in the column to float and rows whose value is missing or not a
+    number never pass them. All other conditions compare the value
+    as a string with missing values treated as empty strings
+
+    :param condition: condition with ``column_name``, ``operator``
+                      and ``value``
+    :type condition: dict
+    :raises NDExUtilError: if operator is not supported or `value`
+                           does not fit operator
+    :return: (column name, function taking position of column in row
+             that returns a function taking a row that returns True
+             if row passes the condition)
+    :rtype: tuple
+    """
+    column_name = condition.get('column_name')
+    op = condition.get('operator')
+    value = condition.get('value')
+    if op in ('in', 'not_in'):
+        if not isinstance(value, list):
+            raise NDExUtilError('Value of ' + op + ' condition on column ' +
+                                str(column_name) + ' must be a list')
+        values = frozenset(str(v) for v in value)
+        expected = op == 'in'
+
+        def make_test(index):
+            return lambda row: ((row[index] or '') in values) is expected
+    elif op in ('matches', 'not_matches'):
+        try:
+            search = re.compile(value).search
+        except (TypeError, re.error) as e:
+            raise NDExUtilError('Invalid regular expression for ' + op +
+                                ' condition on column ' + str(column_name) +
+                                ': ' + str(e))
+        expected = op == 'matches'
+
+        def make_test(index):
+            return lambda row: (search(row[index] or '') is not None) is expected
+    elif op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            def make_test(index):
+                def test(row):
+                    try:
+                        return compare(float(row[index]), value)
+                    except (TypeError, ValueError):
+                        return False
+                return test
+        elif op in ('==', '!=') and isinstance(value, str):
+            def make_test(index):
+                return lambda row: compare(row[index] or '', value)
+        else:
+            raise NDExUtilError('Value of ' + op + ' condition on column ' +
+                                str(column_name) + ' must be a number')
+    else:
+        raise NDExUtilError('Unsupported row_filter operator ' + str(op))
+    return column_name, make_test
+
+
+def get_row_filter(plan):
+    """
+    Compiles ``row_filter`` of loading `plan`
+
+    :param plan: loading plan
+    :type plan: dict
+    :raises NDExUtilError: if a condition is invalid
+    :return: compiled row filter or None if `plan` has no conditions
+    :rtype: :py:class:`RowFilter`
+    """
+    row_filter = plan.get('row_filter')
+    if not row_filter:
+        return None
+    return RowFilter(row_filter)
+
+
+class RowFilter(object):
+    """
+    ``row_filter`` from loading plan compiled once into one test per
+    condition so rows can be dropped before any node or edge is
+    created from them. A row is kept only if it passes every test.
+
+    Rows are lists of str or None. :py:meth:`bind` must be called
+    with the position of the columns in the rows before
+    :py:meth:`accept` is used
+    """
+
+    def __init__(self, row_filter):
+        """
+        Constructor
+
+        :param row_filter: ``row_filter`` from loading plan
+        :type row_filter: list
+        :raises NDExUtilError: if a condition is invalid
+        """
+        self._conditions = [_compile_condition(c) for c in row_filter]
+        self._tests = []
+
+    def bind(self, column_indexes):
+        """
+        Creates the tests for the position of the columns used by this filter
+
+        :param column_indexes: column name to position in row
+        :type column_indexes: dict
+        :return: None
+        """
+        self._tests = [make_test(column_indexes.get(column_name))
+                       for column_name, make_test in self._conditions]
+
+    def get_column_names(self):
+        """
+        Gets names of columns used by this filter
+
+        :return: column names
+        :rtype: list
+        """
+        return [column_name for column_name, make_test in self._conditions]
+
+    def accept(self, row):
+        """
+        Checks if `row` passes every condition
+
+        :param row: current row
+        :type row: list
+        :return: True if row should be loaded
+        :rtype: bool
+        """
+        for test in self._tests:
+            if not test(row):
+                return False
+        return True
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import math
+import hashlib
+from ndexutil.exceptions import NDExUtilError
+
+
+class HyperLogLog(object):
+    """
+    Estimates number of distinct values added using a
+    `HyperLogLog <https://en.wikipedia.org/wiki/HyperLogLog>`__
+    sketch. Memory used is 2 ^ `precision` bytes no matter how
+    many values are added and the standard error of the estimate
+    is about 1.04 / sqrt(2 ^ `precision`), 0.8% for the default
+    precision of 14
+    """
+
+    def __init__(self, precision=14):
+        """
+        Constructor
+
+        :param precision: number of bits of hash used to pick register
+        :type precision: int
+        :raises NDExUtilError: if `precision` is not between 4 and 18
+        """
+        if precision is None or precision < 4 or precision > 18:
+            raise NDExUtilError('precision must be between 4 and 18')
+        self._precision = precision
+        self._num_registers = 1 << precision
+        self._registers = bytearray(self._num_registers)
+        self._rank_bits = 64 - precision
+        self._rank_mask = (1 << self._rank_bits) - 1
+        if self._num_registers == 16:
+            self._alpha = 0.673
+        elif self._num_registers == 32:
+            self._alpha = 0.697
+        elif self._num_registers == 64:
+            self._alpha = 0.709
+        else:
+            self._alpha = 0.7213 / (1 + 1.079 / self._num_registers)
+
+    def add(self, value):
+        """
+        Adds `value` to sketch
+
+        :param value: value, converted to str before hashing
+        :return: None
+        """
+        x = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'),
+                                           digest_size=8).digest(), 'big')
+        index = x >> self._rank_bits
+        rank = self._rank_bits - (x & self._rank_mask).bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def merge(self, other):
+        """
+        Merges `other` into this sketch so it estimates the number
+        of distinct values added to either sketch
+
+        :param other: sketch with same precision
+        :type other: :py:class:`HyperLogLog`
+        :raises NDExUtilError: if precision of `other` differs
+        :return: None
+        """
+        if other._precision != self._precision:
+            raise NDExUtilError('Cannot merge sketches with different '
+                                'precision')
+        self._registers = bytearray(max(a, b) for a, b in
+                                    zip(self._registers, other._registers))
+
+    def count(self):
+        """
+        Estimates number of distinct values added
+
+        :return: estimated number of distinct values
+        :rtype: int
+        """
+        m = self._num_registers
+        estimate = self._alpha * m * m / sum(2.0 ** -r for r in self._registers)
+        if estimate <= 2.5 * m:
+            # small range correction
+            num_zero = self._registers.count(0)
+            if num_zero > 0:
+                estimate = m * math.log(m / num_zero)
+        return int(round(estimate))
@@ -1,32 +1,246 @@
 
+import io
 import json
 import csv
+import itertools
+import hashlib
+import contextlib
+import multiprocessing
+import queue
+import threading
+from collections import deque
 from os import path
 import jsonschema
 import logging
+import sys
 from ndexutil.exceptions import NDExUtilError
+from ndexutil.tsv.nodetable import InMemoryNodeTable
+from ndexutil.tsv.edgetable import InMemoryEdgeTable
+from ndexutil.tsv.compression import get_decompressed_text_stream
+from ndexutil.tsv.compression import open_input
+from ndexutil.tsv.checkpoint import TSVLoaderCheckpoint
+from ndexutil.tsv.sketch import HyperLogLog
+from ndexutil.tsv.rowfilter import get_row_filter
+from ndexutil.tsv.arrowinput import ArrowInput
+from ndexutil.tsv.arrowinput import get_input_format
 
 version = "0.1"
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+
+    ORJSON_LOADED = True
+except ImportError as ie:
+    ORJSON_LOADED = False
+    logger.debug('Unable to load orjson. Only the json encoder '
+                 'from the standard library is available : ' + str(ie))
+
+
+NODE_CHECK_FULL = 'full'
+"""
+Node table keeps name, represents and attributes of every node
+and repeated nodes must match them exactly
+"""
+
+NODE_CHECK_FINGERPRINT = 'fingerprint'
+"""
+Node table keeps only node id and a compact hash of name, represents
+and attributes. Repeated nodes must match the hash
+"""
+
+NODE_CHECK_NONE = 'none'
+"""
+Node table keeps only node id and the first occurrence of a node wins.
+Only use this for trusted inputs
+"""
+
+NODE_CHECK_MODES = [NODE_CHECK_FULL, NODE_CHECK_FINGERPRINT, NODE_CHECK_NONE]
+"""
+Supported values for ``node_check`` parameter
+of :py:class:`StreamTSVLoader`
+"""
+
+CX_FORMAT = 'cx'
+"""
+Write `CX <https://home.ndexbio.org/data-model>`__ version 1 with
+separate ``nodeAttributes`` and ``edgeAttributes`` aspects
+"""
+
+CX2_FORMAT = 'cx2'
+"""
+Write `CX2 <https://cytoscape.org/cx/cx2/specification/cytoscape-exchange-format-specification-(version-2)>`__
+with attribute values inline in nodes and edges
+"""
+
+OUTPUT_FORMATS = [CX_FORMAT, CX2_FORMAT]
+"""
+Supported values for ``output_format`` parameter
+of :py:class:`StreamTSVLoader`
+"""
+
+# data types of loading plan that CX2 does not have mapped to
+# the CX2 data type their values are written as
+_CX2_DATA_TYPES = {'float': 'double',
+                   'list_of_float': 'list_of_double'}
+
+# attributes of nodes and edges CX2 uses for the name and represents
+# of nodes and the interaction of edges
+_CX2_NODE_NAME = 'name'
+_CX2_NODE_REPRESENTS = 'represents'
+_CX2_EDGE_INTERACTION = 'interaction'
+
+
+JSON_ENCODER = 'json'
+"""
+Encode CX with :py:mod:`json` from the standard library
+"""
+
+ORJSON_ENCODER = 'orjson'
+"""
+Encode CX with `orjson <https://pypi.org/project/orjson>`__ which
+must be installed
+"""
+
+AUTO_ENCODER = 'auto'
+"""
+Encode CX with orjson if it is installed otherwise fall back
+to :py:mod:`json`
+"""
+
+ENCODERS = [JSON_ENCODER, ORJSON_ENCODER, AUTO_ENCODER]
+"""
+Supported values for :py:func:`get_fragment_encoder`
+"""
+
+
+class JSONFragmentEncoder(object):
+    """
+    Encodes CX fragments as str using :py:mod:`json` from the
+    standard library
+    """
+
+    def encode(self, fragment):
+        """
+        Encodes `fragment`
+
+        :param fragment: fragment to encode
+        :type fragment: list or dict
+        :return: JSON
+        :rtype: str
+        """
+        return json.dumps(fragment)
+
+
+class OrjsonFragmentEncoder(object):
+    """
+    Encodes CX fragments as bytes using
+    `orjson <https://pypi.org/project/orjson>`__ which is much faster
+    then :py:mod:`json`. The output is compact JSON encoded as UTF-8,
+    NaN and Infinity are written as ``null`` and integers must fit in
+    64 bits
+    """
+
+    def __init__(self):
+        """
+        Constructor
+
+        :raises NDExUtilError: if orjson is not installed
+        """
+        if ORJSON_LOADED is False:
+            raise NDExUtilError('orjson is not installed')
+
+    def encode(self, fragment):
+        """
+        Encodes `fragment`
+
+        :param fragment: fragment to encode
+        :type fragment: list or dict
+        :return: JSON
+        :rtype: bytes
+        """
+        return orjson.dumps(fragment)
+
+
+def get_fragment_encoder(name=JSON_ENCODER):
+    """
+    Gets encoder for :py:class:`CXStreamWriter`
+
+    :param name: one of :py:const:`JSON_ENCODER`, :py:const:`ORJSON_ENCODER`
+                 or :py:const:`AUTO_ENCODER`
+    :type name: str
+    :raises NDExUtilError: if `name` is not supported or orjson was requested
+                           and is not installed
+    :return: encoder
+    :rtype: :py:class:`JSONFragmentEncoder` or :py:class:`OrjsonFragmentEncoder`
+    """
+    if name == JSON_ENCODER:
+        return JSONFragmentEncoder()
+    if name == ORJSON_ENCODER:
+        return OrjsonFragmentEncoder()
+    if name == AUTO_ENCODER:
+        if ORJSON_LOADED:
+            return OrjsonFragmentEncoder()
+        return JSONFragmentEncoder()
+    raise NDExUtilError('Unsupported encoder ' + str(name) +
+                        '. Must be one of ' + str(ENCODERS))
+
+
+def _is_binary_stream(f):
+    """
+    Checks if `f` is a binary stream
+
+    :param f: stream
+    :return: True if `f` expects bytes, False otherwise
+    :rtype: bool
+    """
+    if f is None or isinstance(f, io.TextIOBase):
+        return False
+    if isinstance(f, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return 'b' in str(getattr(f, 'mode', ''))
+
 
 class CXStreamWriter:
     """Writes CX data to stream
     """
 
-    def __init__(self, f):
+    def __init__(self, f, encoder=None):
         """
         Constructor
 
-        :param f: Output stream
+        :param f: Output stream, can be a text or binary stream
+        :param encoder: Encoder used to convert each fragment to JSON,
+                        if ``None`` :py:class:`JSONFragmentEncoder` is used
+        :type encoder: :py:class:`JSONFragmentEncoder`
         """
         self._outputstream = f
+        self._binary = _is_binary_stream(f)
+        if encoder is None:
+            encoder = JSONFragmentEncoder()
+        self._encoder = encoder
         #  0 -- begining of a stream
         #  1 -- after premetadata, outside a fragment
         #  2 -- after postmetadata
         self._state = 0  # beginning of a stream
 
+    def _write(self, *parts):
+        """
+        Writes `parts` to output stream with a single write call,
+        converting between str and bytes as needed by the stream
+
+        :param parts: str or bytes to write
+        :return: number of characters, or bytes for binary streams, written
+        :rtype: int
+        """
+        if self._binary:
+            data = b''.join(p.encode('utf-8') if type(p) is str else p for p in parts)
+        else:
+            data = ''.join(p.decode('utf-8') if type(p) is bytes else p for p in parts)
+        self._outputstream.write(data)
+        return len(data)
+
     def write_pre_metadata(self, metadata):
         """
         Writes the pre meta data aspect
@@ -42,14 +256,28 @@ class CXStreamWriter:
             raise NDExUtilError("Output stream is None")
         if self._state != 0:
             raise NDExUtilError("PreMetadata has already been written, you can only write it once.")
-        self._outputstream.write('[')
-        json.dump({"numberVerification": [{"longNumber": 281474976710655}]}, self._outputstream)
-        self._outputstream.write(',')
-        json.dump({"metaData": metadata}, self._outputstream)
-        self._outputstream.write(',\n')
+        self._write('[',
+                    self._encoder.encode({"numberVerification": [{"longNumber": 281474976710655}]}),
+                    ',',
+                    self._encoder.encode({"metaData": metadata}),
+                    ',\n')
         self._outputstream.flush()
         self._state = 1  # premetadata has been written.
 
+    def resume(self):
+        """
+        Lets aspect fragments be written to an output stream that already
+        contains the pre meta data and possibly some fragments written by
+        an earlier writer, such as when resuming from a checkpoint
+
+        :raises NdexUtilError: if write_pre_metadata or write_post_metadata
+                               has already been called
+        :return: None
+        """
+        if self._state != 0:
+            raise NDExUtilError("Writer has already been used, it can only be resumed before writing.")
+        self._state = 1
+
     def write_aspect_fragment(self, fragment):
         """
         Writes aspect fragment.
@@ -57,16 +285,17 @@ class CXStreamWriter:
         'list_of_boolean', 'list_of_long' or 'list_of_integer'
         the values in the list need to be quoted
 
-        :param fragment: Fragment as list or dict to convert to JSON via :py:func:`json.dump`
+        :param fragment: Fragment as list or dict to convert to JSON via encoder
+                         passed into constructor
         :type fragment: list or dict
         :raises NdexUtilError: if write_pre_metadata has not been called first
-        :return: None
+        :return: number of characters, or bytes for binary streams, written
+        :rtype: int
         """
         if self._state != 1:
             raise NDExUtilError("Data aspects can only be written between PreMetadata and PostMetadata.")
 
-        json.dump(fragment, self._outputstream)
-        self._outputstream.write(',')
+        return self._write(self._encoder.encode(fragment), ',')
 
     def write_post_metadata(self, metadata):
         """
@@ -78,14 +307,1100 @@ class CXStreamWriter:
         """
         if self._state != 1:
             raise NDExUtilError("Post metadata aspect can only be written after PreMetadata and data aspects.")
-        json.dump({"metaData": metadata}, self._outputstream)
-        self._outputstream.write(',')
-        json.dump({"status": [{"error": "", "success": True}]}, self._outputstream)
-        self._outputstream.write(']')
+        self._write(self._encoder.encode({"metaData": metadata}),
+                    ',',
+                    self._encoder.encode({"status": [{"error": "", "success": True}]}),
+                    ']')
+        self._outputstream.flush()
+        self._state = 2
+
+
+class CX2StreamWriter(CXStreamWriter):
+    """Writes CX2 data to stream. Aspects can be written in
+    several fragments so ``hasFragments`` is set in the descriptor
+    """
+
+    def write_pre_metadata(self, metadata):
+        """
+        Writes the CX2 descriptor and meta data aspect
+
+        :param metadata: one or more dicts containing metadata
+        :type metadata: list
+        :raises NdexUtilError: if write_aspect_fragment or
+                               write_post_metadata has already been called or
+                               if output stream set in constructor is None
+        :return: None
+        """
+        if self._outputstream is None:
+            raise NDExUtilError("Output stream is None")
+        if self._state != 0:
+            raise NDExUtilError("PreMetadata has already been written, you can only write it once.")
+        self._write('[',
+                    self._encoder.encode({"CXVersion": "2.0", "hasFragments": True}),
+                    ',',
+                    self._encoder.encode({"metaData": metadata}),
+                    ',\n')
+        self._outputstream.flush()
+        self._state = 1  # premetadata has been written.
+
+    def write_post_metadata(self, metadata=None):
+        """
+        Writes the status aspect that ends CX2. CX2 has no post meta
+        data so `metadata` is ignored. Once this is called this object
+        can no longer be used cause all methods will raise an error.
+
+        :param metadata: ignored
+        :return:
+        """
+        if self._state != 1:
+            raise NDExUtilError("Post metadata aspect can only be written after PreMetadata and data aspects.")
+        self._write(self._encoder.encode({"status": [{"error": "", "success": True}]}),
+                    ']')
         self._outputstream.flush()
         self._state = 2
 
 
+def _to_boolean(data):
+    if type(data) is str:
+        return data.lower() == 'true'
+    return bool(data)
+
+
+def _to_list_of_boolean(data):
+    # Assumption: if the first element is a string then so are the rest...
+    if type(data[0]) is str:
+        return [s.lower() == 'true' for s in data]
+    return [bool(s) for s in data]
+
+
+def _to_list_of_float(data):
+    return [float(s) for s in data]
+
+
+def _to_list_of_int(data):
+    return [int(s) for s in data]
+
+
+def _to_list_of_str(data):
+    return [str(s) for s in data]
+
+
+ROWS_PER_CHUNK = 1000
+"""
+Number of lines parsed at a time when rows are processed in
+one process
+"""
+
+INITIAL_BYTES_PER_ELEMENT = 80
+"""
+Estimated size in CX of a node, edge or attribute used to size
+batches when ``max_batch_bytes`` is passed to
+:py:meth:`StreamTSVLoader.write_cx_network` until the first batch
+has been written
+"""
+
+INTERN_MAX_VALUES = 4096
+"""
+Number of distinct values of a column, or predicates, after which
+values are no longer interned unless ``intern`` is set for
+the column in the loading plan
+"""
+
+
+# scalar data types whose values can be converted column wise
+# by mapping the converter over the raw values
+_NUMERIC_DATA_TYPES = {'double', 'float', 'long', 'integer'}
+
+# maps data_type in loading plan to function converting
+# a value (or list of values for list_of types) to that type
+_DATA_TYPE_CONVERTERS = {
+    'boolean': _to_boolean,
+    'double': float,
+    'float': float,
+    'long': int,
+    'integer': int,
+    'string': str,
+    'list_of_boolean': _to_list_of_boolean,
+    'list_of_double': _to_list_of_float,
+    'list_of_float': _to_list_of_float,
+    'list_of_long': _to_list_of_int,
+    'list_of_integer': _to_list_of_int,
+    'list_of_string': _to_list_of_str
+}
+
+
+class _CompiledAttributeColumn(object):
+    """
+    Entry of ``property_columns`` in a loading plan normalized
+    once so the attribute for a row can be built without
+    re-interpreting the plan
+    """
+    def __init__(self, column_raw):
+        """
+        Constructor
+
+        :param column_raw: entry of ``property_columns`` in loading plan
+                           either a str in format ``name`` or
+                           ``name::data_type`` or a dict
+        :type column_raw: str or dict
+        :raises NDExUtilError: if data type is not supported
+        """
+        intern = None
+        if isinstance(column_raw, dict):
+            self.column_name = column_raw.get('column_name')
+            self.attribute_name = column_raw.get('attribute_name')
+            self.data_type = column_raw.get('data_type')
+            self.delimiter = column_raw.get('delimiter')
+            value_prefix = column_raw.get('value_prefix')
+            self.default_value = column_raw.get('default_value')
+            intern = column_raw.get('intern')
+        else:
+            column_split = column_raw.split('::')
+            self.column_name = column_split[0]
+            self.attribute_name = column_split[0]
+            self.data_type = column_split[1] if len(column_split) > 1 else None
+            self.delimiter = None
+            value_prefix = None
+            self.default_value = None
+
+        if not self.data_type:
+            if self.delimiter:
+                # if there is a delimiter, set the default datatype to list of strings
+                self.data_type = 'list_of_string'
+            else:
+                # set the default datatype to string
+                self.data_type = 'string'
+
+        if not self.attribute_name:
+            self.attribute_name = self.column_name
+        if not self.column_name:
+            # this allows us to add arbitrary attributes to all
+            # source or target nodes
+            self.column_name = None
+
+        self._converter = _DATA_TYPE_CONVERTERS.get(self.data_type)
+        if self._converter is None:
+            raise NDExUtilError('Unsupported data_type ' + str(self.data_type) +
+                                ' for column ' + str(self.column_name))
+        self._is_list = 'list_of' in self.data_type
+        self.value_prefix = (value_prefix + ':') if value_prefix else None
+        self.column_index = None
+
+        # attributes keyed by raw value so repeated values share one
+        # attribute, None once interning is off for this column. Unless
+        # set in the plan, interning is turned off when the column turns
+        # out to have more then INTERN_MAX_VALUES distinct values
+        self._intern_max_values = None if intern is True else INTERN_MAX_VALUES
+        self._interned = None if intern is False else {}
+
+        # True if values can be converted column wise by get_attributes()
+        self._column_wise = (self.data_type in _NUMERIC_DATA_TYPES and
+                             not self.delimiter and not self.value_prefix and
+                             not self.default_value)
+
+    def bind(self, column_indexes):
+        """
+        Resolves position of this column in the rows to be parsed
+
+        :param column_indexes: column name to position in row
+        :type column_indexes: dict
+        :return: None
+        """
+        if self.column_name is None:
+            self.column_index = None
+        else:
+            self.column_index = column_indexes.get(self.column_name)
+
+    def convert(self, value):
+        """
+        Converts raw `value` from TSV to data type of this column
+        applying delimiter and value prefix if set
+
+        :param value: raw value
+        :type value: str
+        :return: converted value
+        """
+        if self.delimiter:
+            value = self._converter([entry.strip() for entry in
+                                     value.split(self.delimiter)])
+            if self.value_prefix:
+                value = [self.value_prefix + str(v) for v in value]
+            return value
+
+        if type(value) is str:
+            if '[' in value or ']' in value:
+                value = value.replace('[', '').replace(']', '')
+            if self._is_list:
+                value = value.split(',')
+        value = self._converter(value)
+        if self.value_prefix:
+            value = self.value_prefix + str(value)
+        return value
+
+    def get_attribute(self, row):
+        """
+        Builds attribute for this column from `row`
+
+        :param row: current row to be parsed
+        :type row: list
+        :return: attribute as dict in format {'n': NAME, 'v': VALUE, 'd': TYPE}
+                 with 'd' omitted for string attributes or None if there
+                 is no value for this column in `row`. Attributes may be
+                 shared between rows and must not be modified
+        :rtype: dict
+        """
+        if self.column_index is None:
+            value = self.default_value
+        else:
+            value = row[self.column_index]
+            if value is None:
+                value = self.default_value
+
+        if not value and value != 0:
+            # missing, but 0 or False from typed inputs are values
+            return None
+
+        interned = self._interned
+        if interned is not None:
+            # list values from typed inputs are interned by their entries
+            key = tuple(value) if type(value) is list else value
+            tmp_attr = interned.get(key)
+            if tmp_attr is not None:
+                return tmp_attr
+
+        tmp_attr = {'n': self.attribute_name, 'v': self.convert(value)}
+        if self.data_type != 'string':
+            tmp_attr['d'] = self.data_type
+
+        if interned is not None:
+            if self._intern_max_values is not None and\
+                    len(interned) >= self._intern_max_values:
+                logger.debug('Column ' + str(self.column_name) + ' has more then ' +
+                             str(self._intern_max_values) +
+                             ' distinct values, no longer interning values')
+                self._interned = None
+            else:
+                interned[key] = tmp_attr
+        return tmp_attr
+
+    def get_attributes(self, rows):
+        """
+        Builds attribute for this column for each of `rows`. Once
+        values are no longer interned, numeric columns are converted
+        column wise by mapping the converter over the values which
+        is much faster then calling :py:meth:`get_attribute` for each
+        row. If a value needs more then that, such as removing
+        brackets, :py:meth:`get_attribute` is used for every row
+
+        :param rows: rows to be parsed
+        :type rows: list
+        :raises Exception: if a value cannot be converted
+        :return: attribute or None for each row, same as
+                 :py:meth:`get_attribute`
+        :rtype: list
+        """
+        if self._column_wise is False or self._interned is not None or\
+                self.column_index is None:
+            return [self.get_attribute(row) for row in rows]
+
+        index = self.column_index
+        converter = self._converter
+        try:
+            values = [converter(row[index]) if row[index] or row[index] == 0 else None
+                      for row in rows]
+        except (TypeError, ValueError):
+            return [self.get_attribute(row) for row in rows]
+        attribute_name = self.attribute_name
+        data_type = self.data_type
+        return [None if value is None else
+                {'n': attribute_name, 'v': value, 'd': data_type}
+                for value in values]
+
+
+def _bind_columns(columns, column_indexes):
+    for column in columns:
+        column.bind(column_indexes)
+
+
+def _create_attr_obj(columns, row):
+    """
+    Create attribute object
+
+    :param columns: compiled property columns of node or edge plan
+    :type columns: list
+    :param row: current row to be parsed
+    :type row: list
+    :return: attributes keyed by attribute name
+    :rtype: dict
+    """
+    attr = {}
+    for column in columns:
+        tmp_attr = column.get_attribute(row)
+        if tmp_attr is not None:
+            attr[column.attribute_name] = tmp_attr
+    return attr
+
+
+def _create_attr_objs(columns, rows):
+    """
+    Creates attribute object for each of `rows` converting
+    the values column by column
+
+    :param columns: compiled property columns of node or edge plan
+    :type columns: list
+    :param rows: rows to be parsed
+    :type rows: list
+    :return: attributes keyed by attribute name for each row
+    :rtype: list
+    """
+    attrs = [{} for _ in rows]
+    for column in columns:
+        attribute_name = column.attribute_name
+        for attr, tmp_attr in zip(attrs, column.get_attributes(rows)):
+            if tmp_attr is not None:
+                attr[attribute_name] = tmp_attr
+    return attrs
+
+
+def _compile_property_columns(node_or_edge_plan):
+    """
+    Compiles ``property_columns`` of node or edge plan
+
+    :return: compiled columns
+    :rtype: list
+    """
+    return [_CompiledAttributeColumn(c) for c in
+            node_or_edge_plan.get('property_columns') or []]
+
+
+class _CompiledNodePlan(object):
+    """
+    Source or target plan from loading plan resolved once
+    """
+    def __init__(self, node_plan):
+        """
+        Constructor
+
+        :param node_plan: ``source_plan`` or ``target_plan`` from
+                          loading plan
+        :type node_plan: dict
+        :raises NDExUtilError: if ``rep_prefix`` is set without ``rep_column``
+        """
+        self.rep_column = node_plan.get('rep_column') or None
+        self.node_name_column = node_plan.get('node_name_column')
+        self.use_name_as_id = self.rep_column is None
+        if self.use_name_as_id and node_plan.get('rep_prefix'):
+            raise NDExUtilError('rep_column needs to be defined if '
+                                'rep_prefix is defined in your loading plan.')
+        rep_prefix = node_plan.get('rep_prefix')
+        self.rep_prefix = (rep_prefix + ':') if rep_prefix else None
+        self.columns = _compile_property_columns(node_plan)
+        self.rep_index = None
+        self.node_name_index = None
+
+    def bind(self, column_indexes):
+        """
+        Resolves position of the columns used by this plan
+
+        :param column_indexes: column name to position in row
+        :type column_indexes: dict
+        :return: None
+        """
+        self.rep_index = column_indexes.get(self.rep_column)
+        self.node_name_index = column_indexes.get(self.node_name_column)
+        _bind_columns(self.columns, column_indexes)
+
+    def get_column_names(self):
+        """
+        Gets names of columns used by this plan
+
+        :return: column names
+        :rtype: list
+        """
+        return [self.rep_column, self.node_name_column] +\
+            [c.column_name for c in self.columns]
+
+    def parse(self, row):
+        """
+        Extracts node from `row`
+
+        :param row: current row to be parsed
+        :type row: list
+        :raises RuntimeError: if id of node is missing
+        :return: (external id, name, represents, attributes)
+        :rtype: tuple
+        """
+        nodename = None
+        if self.node_name_index is not None:
+            nodename = row[self.node_name_index]
+
+        if self.use_name_as_id:
+            ext_id = nodename
+        else:
+            ext_id = row[self.rep_index]
+
+        if not ext_id:
+            raise RuntimeError("Id value is missing.")
+
+        node_attr = _create_attr_obj(self.columns, row)
+
+        if self.use_name_as_id:
+            represent = None
+        elif self.rep_prefix:
+            represent = self.rep_prefix + ext_id
+        else:
+            represent = ext_id
+        return ext_id, nodename, represent, node_attr
+
+
+class _CompiledEdgePlan(object):
+    """
+    Edge plan from loading plan resolved once
+    """
+    def __init__(self, edge_plan):
+        """
+        Constructor
+
+        :param edge_plan: ``edge_plan`` from loading plan
+        :type edge_plan: dict
+        """
+        self.predicate_id_column = edge_plan.get('predicate_id_column') or None
+        self.default_predicate = edge_plan.get('default_predicate') or None
+        predicate_prefix = edge_plan.get('predicate_prefix')
+        self.predicate_prefix = (predicate_prefix + ':') if predicate_prefix else None
+        self.collapse_edges = edge_plan.get('collapse_edges') is True
+        self.columns = _compile_property_columns(edge_plan)
+        self.predicate_index = None
+        # raw predicate => predicate so edges share one str per predicate,
+        # None once there are more then INTERN_MAX_VALUES predicates
+        self._interned = {}
+
+    def bind(self, column_indexes):
+        """
+        Resolves position of the columns used by this plan
+
+        :param column_indexes: column name to position in row
+        :type column_indexes: dict
+        :return: None
+        """
+        self.predicate_index = column_indexes.get(self.predicate_id_column)
+        _bind_columns(self.columns, column_indexes)
+
+    def get_column_names(self):
+        """
+        Gets names of columns used by this plan
+
+        :return: column names
+        :rtype: list
+        """
+        return [self.predicate_id_column] + [c.column_name for c in self.columns]
+
+    def parse(self, row):
+        """
+        Extracts edge from `row`
+
+        :param row: current row to be parsed
+        :type row: list
+        :raises RuntimeError: if predicate is missing
+        :return: (predicate, attributes)
+        :rtype: tuple
+        """
+        return self._parse_predicate(row), _create_attr_obj(self.columns, row)
+
+    def parse_rows(self, rows):
+        """
+        Extracts edges from `rows` converting attributes column by
+        column via :py:func:`_create_attr_objs`
+
+        :param rows: rows to be parsed
+        :type rows: list
+        :raises Exception: if any row cannot be parsed. Use
+                           :py:meth:`parse` to find which one
+        :return: (predicate, attributes) for each row
+        :rtype: list
+        """
+        predicates = [self._parse_predicate(row) for row in rows]
+        return list(zip(predicates, _create_attr_objs(self.columns, rows)))
+
+    def _parse_predicate(self, row):
+        """
+        Gets predicate of edge in `row`
+
+        :param row: current row to be parsed
+        :type row: list
+        :raises RuntimeError: if predicate is missing
+        :return: predicate
+        :rtype: str
+        """
+        predicate_str = None
+        if self.predicate_index is not None:
+            predicate_str = row[self.predicate_index]
+
+        if not predicate_str:
+            predicate_str = self.default_predicate
+
+        if not predicate_str:
+            raise RuntimeError("Value for predicate string is not found in this row.")
+
+        interned = self._interned
+        if interned is not None:
+            raw_predicate = predicate_str
+            predicate_str = interned.get(raw_predicate)
+            if predicate_str is None:
+                predicate_str = self._get_predicate(raw_predicate)
+                if len(interned) >= INTERN_MAX_VALUES:
+                    self._interned = None
+                else:
+                    interned[raw_predicate] = predicate_str
+        else:
+            predicate_str = self._get_predicate(predicate_str)
+        return predicate_str
+
+    def _get_predicate(self, predicate_str):
+        if self.predicate_prefix:
+            return self.predicate_prefix + predicate_str
+        return predicate_str
+
+
+def _read_tsv_rows(tsv_file_descriptor, num_columns, delimiter='\t',
+                   quotechar='"', columns=None):
+    """
+    Generator that reads rows from `tsv_file_descriptor` as lists
+    instead of building a dict per row like :py:class:`csv.DictReader`.
+    Lines without a quote character are split directly, the rest are
+    handed to :py:func:`csv.reader` so quoted values, including those
+    spanning multiple lines, are parsed the same way as before.
+    Empty lines are skipped and short rows are padded with None to
+    `num_columns`
+
+    :param tsv_file_descriptor: input stream positioned after the header
+    :param num_columns: number of columns in header
+    :type num_columns: int
+    :param delimiter: character separating values
+    :type delimiter: str
+    :param quotechar: character used to quote values or None if values
+                      are never quoted
+    :type quotechar: str
+    :param columns: If set, only values at these sorted positions are kept
+                    in each row. Lines are not split past the last position
+    :type columns: list
+    :return: rows
+    :rtype: list
+    """
+    lines = iter(tsv_file_descriptor)
+    maxsplit = -1
+    if columns is not None:
+        num_columns = columns[-1] + 1
+        maxsplit = num_columns
+    padding = [None] * num_columns
+    for line in lines:
+        if quotechar is not None and quotechar in line:
+            row = next(csv.reader(itertools.chain((line,), lines),
+                                  dialect='excel', delimiter=delimiter,
+                                  quotechar=quotechar), None)
+        else:
+            row = line.rstrip('\r\n').split(delimiter, maxsplit)
+            if len(row) == 1 and not row[0]:
+                continue
+        if not row:
+            continue
+        if len(row) < num_columns:
+            row.extend(padding[len(row):])
+        if columns is not None:
+            row = [row[i] for i in columns]
+        yield row
+
+
+class _LineCounter(object):
+    """
+    Wraps lines of input stream keeping count of the lines
+    read so far
+    """
+    def __init__(self, lines, count=0):
+        """
+        Constructor
+
+        :param lines: input stream or other iterable of lines
+        :param count: number of lines already read
+        :type count: int
+        """
+        self._lines = lines
+        self.count = count
+
+    def __iter__(self):
+        for line in self._lines:
+            self.count += 1
+            yield line
+
+
+def _split_header(header_line, delimiter='\t', quotechar='"'):
+    """
+    Splits `header_line` into column names
+
+    :param header_line: first line of input
+    :type header_line: str
+    :param delimiter: character separating column names
+    :type delimiter: str
+    :param quotechar: character used to quote column names or None
+    :type quotechar: str
+    :return: column names
+    :rtype: list
+    """
+    if quotechar is not None and quotechar in header_line:
+        names = next(csv.reader([header_line], dialect='excel',
+                                delimiter=delimiter, quotechar=quotechar), [''])
+    else:
+        names = header_line.split(delimiter)
+    return [h.strip() for h in names]
+
+
+def _read_header(tsv_file_descriptor, delimiter='\t', quotechar='"'):
+    """
+    Reads header line from `tsv_file_descriptor`
+
+    :param tsv_file_descriptor: input stream
+    :param delimiter: character separating column names
+    :type delimiter: str
+    :param quotechar: character used to quote column names or None
+    :type quotechar: str
+    :return: column names
+    :rtype: list
+    """
+    return _split_header(tsv_file_descriptor.readline(), delimiter=delimiter,
+                         quotechar=quotechar)
+
+
+@contextlib.contextmanager
+def _open_tsv_input(tsv_input):
+    """
+    Context manager that gives text stream to read TSV input from.
+    Paths are opened with :py:func:`~ndexutil.tsv.compression.open_input`
+    and closed on exit. Binary streams are wrapped to decompress them,
+    if needed, and the wrapper is detached on exit so the caller's
+    stream is left open
+
+    :param tsv_input: path to TSV file, text stream or binary stream
+    :return: text stream
+    """
+    if isinstance(tsv_input, str):
+        with open_input(tsv_input) as tsv_stream:
+            yield tsv_stream
+        return
+    if not _is_binary_stream(tsv_input):
+        yield tsv_input
+        return
+    text_stream = get_decompressed_text_stream(tsv_input)
+    try:
+        yield text_stream
+    finally:
+        text_stream.detach()
+
+
+def _get_tsv_input_name(tsv_input):
+    """
+    Gets name of TSV input for messages
+
+    :param tsv_input: path to TSV file or stream
+    :return: path or name of stream
+    :rtype: str
+    """
+    if isinstance(tsv_input, str):
+        return tsv_input
+    return str(getattr(tsv_input, 'name', tsv_input))
+
+
+def _read_tsv_inputs(tsv_file_descriptor, tsv_inputs, header, delimiter='\t',
+                     quotechar='"'):
+    """
+    Generator of lines of `tsv_file_descriptor` followed by the
+    lines after the header of each of `tsv_inputs`. Each input is
+    opened once the previous one has been read. Empty inputs are
+    skipped
+
+    :param tsv_file_descriptor: first input positioned after the header
+    :param tsv_inputs: paths to TSV files or streams
+    :type tsv_inputs: list
+    :param header: header of first input
+    :type header: list
+    :param delimiter: character separating column names
+    :type delimiter: str
+    :param quotechar: character used to quote column names or None
+    :type quotechar: str
+    :raises NDExUtilError: if header of an input does not match `header`
+    :return: lines
+    :rtype: str
+    """
+    yield from tsv_file_descriptor
+    for tsv_input in tsv_inputs:
+        with _open_tsv_input(tsv_input) as tsv_stream:
+            header_line = tsv_stream.readline()
+            if not header_line:
+                logger.info('Skipping empty input ' + _get_tsv_input_name(tsv_input))
+                continue
+            input_header = _split_header(header_line, delimiter=delimiter,
+                                         quotechar=quotechar)
+            if input_header != header:
+                raise NDExUtilError('Header ' + str(input_header) + ' of ' +
+                                    _get_tsv_input_name(tsv_input) +
+                                    ' does not match header ' + str(header) +
+                                    ' of first input')
+            logger.debug('Reading ' + _get_tsv_input_name(tsv_input))
+            yield from tsv_stream
+
+
+def _read_arrow_inputs(arrow_inputs, header, column_names, data_types):
+    """
+    Generator of rows of each of `arrow_inputs` in order via
+    :py:meth:`~ndexutil.tsv.arrowinput.ArrowInput.read_rows`
+
+    :param arrow_inputs: inputs
+    :type arrow_inputs: list
+    :param header: column names of first input
+    :type header: list
+    :param column_names: columns to read
+    :type column_names: list
+    :param data_types: passed to :py:meth:`~ndexutil.tsv.arrowinput.ArrowInput.read_rows`
+    :type data_types: dict
+    :raises NDExUtilError: if columns of an input do not match `header`
+    :return: rows
+    :rtype: tuple
+    """
+    for arrow_input in arrow_inputs:
+        input_header = arrow_input.get_column_names()
+        if input_header != header:
+            raise NDExUtilError('Header ' + str(input_header) + ' of ' +
+                                arrow_input.get_name() +
+                                ' does not match header ' + str(header) +
+                                ' of first input')
+        logger.debug('Reading ' + arrow_input.get_name())
+        yield from arrow_input.read_rows(column_names, data_types)
+
+
+def _ends_in_quoted_value(line, in_quotes, delimiter='\t', quotechar='"'):
+    """
+    Checks if `line` ends inside a quoted value the way :py:func:`csv.reader`
+    with the ``excel`` dialect parses it. A quote character only starts a
+    quoted value if it is the first character of a value, elsewhere it is
+    kept as is. Within a quoted value two quote characters are a quote
+    character and one ends the quoted value
+
+    :param line: line of input
+    :type line: str
+    :param in_quotes: True if `line` starts inside a quoted value
+    :type in_quotes: bool
+    :param delimiter: character separating values
+    :type delimiter: str
+    :param quotechar: character used to quote values
+    :type quotechar: str
+    :return: True if `line` ends inside a quoted value
+    :rtype: bool
+    """
+    value_start = not in_quotes
+    index = 0
+    length = len(line)
+    while index < length:
+        char = line[index]
+        if in_quotes:
+            if char == quotechar:
+                if index + 1 < length and line[index + 1] == quotechar:
+                    index += 1
+                else:
+                    in_quotes = False
+        elif char == delimiter:
+            value_start = True
+            index += 1
+            continue
+        elif char == quotechar and value_start:
+            in_quotes = True
+        value_start = False
+        index += 1
+    return in_quotes
+
+
+def _read_tsv_chunks(tsv_file_descriptor, chunk_size, delimiter='\t',
+                     quotechar='"'):
+    """
+    Generator that groups lines from `tsv_file_descriptor` into
+    chunks of about `chunk_size` lines. A chunk only ends outside of
+    quoted values, as parsed by :py:func:`_ends_in_quoted_value`, so
+    quoted values spanning multiple lines are never split across
+    chunks while quote characters within unquoted values do not
+    keep a chunk from ending.
+
+    :param tsv_file_descriptor: input stream positioned after the header
+    :param chunk_size: number of lines per chunk
+    :type chunk_size: int
+    :param delimiter: character separating values
+    :type delimiter: str
+    :param quotechar: character used to quote values or None if values
+                      are never quoted
+    :type quotechar: str
+    :return: lines in chunk
+    :rtype: list
+    """
+    chunk = []
+    in_quotes = False
+    for line in tsv_file_descriptor:
+        chunk.append(line)
+        if quotechar is not None and (in_quotes or quotechar in line):
+            in_quotes = _ends_in_quoted_value(line, in_quotes, delimiter=delimiter,
+                                              quotechar=quotechar)
+        if not in_quotes and len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _skip_lines(tsv_file_descriptor, num_lines):
+    """
+    Reads and discards `num_lines` lines from `tsv_file_descriptor`
+
+    :param tsv_file_descriptor: input stream
+    :param num_lines: number of lines to skip
+    :type num_lines: int
+    :return: None
+    """
+    next(itertools.islice(tsv_file_descriptor, num_lines, num_lines), None)
+
+
+# compiled plans used by worker processes, set by _init_parse_worker()
+_worker_plans = None
+
+
+def _bind_plans(header, plans, delimiter='\t', quotechar='"'):
+    """
+    Binds compiled `plans` to the columns of `header` they use. Rows
+    are projected to just those columns, in order of the header, so
+    the plans are bound to positions in the projected rows. If a column
+    name appears more then once the last one is used
+
+    :param header: column names
+    :type header: list
+    :param plans: compiled source, target and edge plans and row
+                  filter. None entries are ignored
+    :type plans: list
+    :param delimiter: character separating values
+    :type delimiter: str
+    :param quotechar: character used to quote values or None
+    :type quotechar: str
+    :return: keyword arguments for :py:func:`_read_tsv_rows` to read
+             rows for the bound plans
+    :rtype: dict
+    """
+    column_indexes = {name: index for index, name in enumerate(header)}
+    plans = [plan for plan in plans if plan is not None]
+    used_names = set()
+    for plan in plans:
+        used_names.update(plan.get_column_names())
+    columns = sorted(column_indexes[name] for name in used_names
+                     if name in column_indexes)
+    if columns == list(range(len(header))):
+        # every column is used, nothing to project
+        columns = None
+    else:
+        column_indexes = {header[index]: position
+                          for position, index in enumerate(columns)}
+    for plan in plans:
+        plan.bind(column_indexes)
+    return {'num_columns': len(header), 'delimiter': delimiter,
+            'quotechar': quotechar, 'columns': columns}
+
+
+def _init_parse_worker(plan, header, delimiter='\t', quotechar='"',
+                       rows_input=False):
+    """
+    Initializes worker process used by :py:class:`StreamTSVLoader`
+    to parse rows in parallel by compiling `plan` and binding
+    it to `header`
+
+    :param plan: loading plan
+    :type plan: dict
+    :param header: column names
+    :type header: list
+    :param delimiter: character separating values
+    :type delimiter: str
+    :param quotechar: character used to quote values or None
+    :type quotechar: str
+    :param rows_input: True if chunks hold rows read by
+                       :py:class:`~ndexutil.tsv.arrowinput.ArrowInput`
+                       instead of lines
+    :type rows_input: bool
+    :return: None
+    """
+    global _worker_plans
+    plans = (_CompiledNodePlan(plan.get('source_plan')),
+             _CompiledNodePlan(plan.get('target_plan')),
+             _CompiledEdgePlan(plan.get('edge_plan')),
+             get_row_filter(plan))
+    row_options = _bind_plans(header, plans, delimiter=delimiter,
+                              quotechar=quotechar)
+    if rows_input is True:
+        row_options = None
+    _worker_plans = (row_options,) + plans
+
+
+def _parse_chunk(lines):
+    """
+    Parses rows in `lines` in worker process via :py:func:`_parse_lines`
+
+    :param lines: lines from TSV file
+    :type lines: list
+    :return: result of :py:func:`_parse_lines`
+    :rtype: tuple
+    """
+    return _parse_lines(lines, *_worker_plans)
+
+
+def _parse_lines(lines, row_options, source_plan, target_plan, edge_plan,
+                 row_filter=None):
+    """
+    Parses rows in `lines` into nodes and edges without assigning
+    any ids. Rows not accepted by `row_filter` are dropped before
+    they are parsed. Edges are parsed for all rows at once so their
+    attributes are converted column wise. If that fails the rows are
+    parsed one at a time to find the first row with an error
+
+    :param lines: lines from TSV file
+    :type lines: list
+    :param row_options: keyword arguments for :py:func:`_read_tsv_rows`
+                        from :py:func:`_bind_plans` or None if `lines`
+                        are rows that have already been read
+    :type row_options: dict
+    :param source_plan: compiled source plan
+    :type source_plan: :py:class:`_CompiledNodePlan`
+    :param target_plan: compiled target plan
+    :type target_plan: :py:class:`_CompiledNodePlan`
+    :param edge_plan: compiled edge plan
+    :type edge_plan: :py:class:`_CompiledEdgePlan`
+    :param row_filter: compiled row filter or None to keep every row
+    :type row_filter: :py:class:`~ndexutil.tsv.rowfilter.RowFilter`
+    :return: (parsed rows, exception raised parsing row after last
+             parsed row or None). Each parsed row also has the number
+             of lines of the chunk read up to the end of the row.
+             Source, target and edge are None for dropped rows
+    :rtype: tuple
+    """
+    rows = []
+    line_counts = []
+    read_error = None
+    line_counter = _LineCounter(lines)
+    if row_options is None:
+        row_reader = line_counter
+    else:
+        row_reader = _read_tsv_rows(line_counter, **row_options)
+    try:
+        for row in row_reader:
+            if row_filter is not None and not row_filter.accept(row):
+                # keep a placeholder so dropped rows are still counted
+                row = None
+            rows.append(row)
+            line_counts.append(line_counter.count)
+    except Exception as e:
+        read_error = e
+
+    kept_rows = rows
+    if row_filter is not None:
+        kept_rows = [row for row in rows if row is not None]
+    try:
+        edges = iter(edge_plan.parse_rows(kept_rows))
+    except Exception:
+        edges = None
+
+    parsed_rows = []
+    try:
+        for index, row in enumerate(rows):
+            if row is None:
+                parsed_rows.append((None, None, None, line_counts[index]))
+                continue
+            parsed_rows.append((source_plan.parse(row),
+                                target_plan.parse(row),
+                                edge_plan.parse(row) if edges is None else next(edges),
+                                line_counts[index]))
+    except Exception as e:
+        return parsed_rows, e
+    return parsed_rows, read_error
+
+
+class _BackgroundBatchWriter(object):
+    """
+    Writes batches of nodes and edges in a separate thread so
+    rows can be processed while the previous batch is serialized
+    and written. Only one batch is handed over at a time so at most
+    two batches, the one being written and the one being filled,
+    are held in memory.
+    """
+    def __init__(self, write_batch):
+        """
+        Constructor
+
+        :param write_batch: function taking list of new nodes, list of
+                            new edges and checkpoint state that writes them
+        :type write_batch: function
+        """
+        self._write_batch = write_batch
+        self._queue = queue.Queue(maxsize=1)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """
+        Writes batches from queue until None is received. Once a write
+        fails the remaining batches are skipped and the error is kept
+        so it can be raised in the calling thread
+
+        :return: None
+        """
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                if self._error is None:
+                    self._write_batch(*batch)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, new_nodes, new_edges, checkpoint_state=None):
+        """
+        Hands batch to writer thread blocking until the previous
+        batch has been written
+
+        :param new_nodes: nodes to write, caller must not modify this list
+        :type new_nodes: list
+        :param new_edges: edges to write, caller must not modify this list
+        :type new_edges: list
+        :param checkpoint_state: checkpoint to save once batch is written
+        :type checkpoint_state: dict
+        :raises Exception: if writing a previous batch failed
+        :return: None
+        """
+        self._queue.join()
+        self._raise_error()
+        self._queue.put((new_nodes, new_edges, checkpoint_state))
+
+    def close(self, raise_error=True):
+        """
+        Waits for all batches to be written and stops the thread
+
+        :param raise_error: if True raise error from writing any batch
+        :type raise_error: bool
+        :raises Exception: if writing a batch failed and `raise_error` is True
+        :return: None
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if raise_error:
+            self._raise_error()
+
+
 class StreamTSVLoaderFactory(object):
     """
     Creates :py:class:`~StreamTSVLoader` objects
@@ -96,7 +1411,7 @@ class StreamTSVLoaderFactory(object):
         """
         pass
 
-    def get_tsv_streamloader(self, loading_plan_file, style_cx):
+    def get_tsv_streamloader(self, loading_plan_file, style_cx, **kwargs):
         """
         Creates :py:class:`~StreamTSVLoader` object
 
@@ -105,10 +1420,12 @@ class StreamTSVLoaderFactory(object):
         :param style_cx: object containing a style 'cyVisualProperties' as
                          an opaque aspect
         :type style_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`
+        :param kwargs: passed as keyword arguments to
+                       :py:class:`~StreamTSVLoader` constructor
         :return: object to load TSV stream
         :rtype: :py:class:`~StreamTSVLoader`
         """
-        return StreamTSVLoader(loading_plan_file, style_cx)
+        return StreamTSVLoader(loading_plan_file, style_cx, **kwargs)
 
 
 class StreamTSVLoader(object):
@@ -116,14 +1433,90 @@ class StreamTSVLoader(object):
     Stream based TSV Loader
     """
 
-    def __init__(self, loading_plan_file, style_cx):
+    def __init__(self, loading_plan_file, style_cx,
+                 node_check=NODE_CHECK_FULL, workers=1,
+                 worker_chunksize=10000, encoder=JSON_ENCODER,
+                 background_writer=False, delimiter='\t', quotechar='"',
+                 output_format=CX_FORMAT):
         """
         Constructor that loads and validates the loading_plan_file as well as extracts
         the style from the style_cx object
         :param loading_plan_file: Path to loading plan file
         :param style_cx: :py:class:`~ndex2.nice_cx_network.NiceCXNetwork` object containing a style 'cyVisualProperties' as
-                         an opaque aspect
+                         an opaque aspect. If `output_format` is :py:const:`CX2_FORMAT`
+                         a :py:class:`~ndex2.cx2.CX2Network` with visual properties instead
+        :param node_check: How repeated nodes are checked for consistency.
+                           :py:const:`NODE_CHECK_FULL` stores every node with
+                           its attributes, :py:const:`NODE_CHECK_FINGERPRINT`
+                           stores only id and hash of node and
+                           :py:const:`NODE_CHECK_NONE` stores only id and skips
+                           the check
+        :type node_check: str
+        :param workers: Number of worker processes used to parse and convert
+                        rows. If greater then 1, chunks of the TSV file are parsed
+                        by the workers while this process still assigns ids and
+                        writes the CX so the output is identical to parsing
+                        in one process
+        :type workers: int
+        :param worker_chunksize: Number of lines sent to a worker at a time.
+                                 Only used if `workers` is greater then 1
+        :type worker_chunksize: int
+        :param encoder: Name of encoder passed to :py:func:`get_fragment_encoder` used
+                        to convert CX to JSON. The output stream passed to
+                        :py:meth:`write_cx_network` can be binary or text
+        :type encoder: str
+        :param background_writer: If True, full batches are serialized and written
+                                  by a separate thread while the next batch is
+                                  being built. Memory is bounded to two batches
+        :type background_writer: bool
+        :param delimiter: Character separating values in input, such as ``,``
+                          for CSV or ``|`` for pipe delimited files
+        :type delimiter: str
+        :param quotechar: Character used to quote values containing the delimiter,
+                          quote character or line breaks in input. Quoted values
+                          follow the rules of the ``excel`` dialect of :py:mod:`csv`.
+                          Set to ``None`` if values are never quoted so quote
+                          characters are kept as part of the values
+        :type quotechar: str
+        :param output_format: :py:const:`CX_FORMAT` to write CX or :py:const:`CX2_FORMAT`
+                              to write CX2, which is much smaller since attribute values
+                              are written inline in nodes and edges. The types of the
+                              attributes are declared in ``attributeDeclarations`` built
+                              from the loading plan
+        :type output_format: str
+        :raises NDExUtilError: if `node_check`, `encoder`, `delimiter`, `quotechar` or
+                               `output_format` is not supported, loading plan is
+                               invalid or cannot be written as CX2
         """
+        if node_check not in NODE_CHECK_MODES:
+            raise NDExUtilError('Unsupported node_check ' + str(node_check) +
+                                '. Must be one of ' + str(NODE_CHECK_MODES))
+        self._node_check = node_check
+        self._workers = workers if workers is not None else 1
+        if worker_chunksize is None or worker_chunksize < 1:
+            raise NDExUtilError('worker_chunksize must be 1 or larger')
+        self._worker_chunksize = worker_chunksize
+        self._encoder = get_fragment_encoder(encoder)
+        self._background_writer = background_writer
+        if delimiter is None or len(delimiter) != 1 or delimiter in '\r\n':
+            raise NDExUtilError('delimiter must be a single character other '
+                                'then a line break')
+        if quotechar is not None and (len(quotechar) != 1 or
+                                      quotechar in '\r\n' + delimiter):
+            raise NDExUtilError('quotechar must be None or a single character '
+                                'other then a line break or the delimiter')
+        self._delimiter = delimiter
+        self._quotechar = quotechar
+        if output_format not in OUTPUT_FORMATS:
+            raise NDExUtilError('Unsupported output_format ' + str(output_format) +
+                                '. Must be one of ' + str(OUTPUT_FORMATS))
+        self._output_format = output_format
+        # True while reading rows from Parquet or Arrow inputs
+        self._rows_input = False
+        # batch sizing, reset by each call to write_cx_network
+        self._max_batch_bytes = None
+        self._bytes_per_element = INITIAL_BYTES_PER_ELEMENT
+        self._batch_statistics = StreamTSVLoader._get_empty_batch_statistics()
 
         # fullpath of the loading plan json file
         # style CX object (niceCX object)
@@ -131,7 +1524,9 @@ class StreamTSVLoader(object):
         # _sytle_cx is a niceCx object which has the style we are going to use in this loader.
         # read and validate the plan
         # open the schema first
-        if style_cx:
+        if style_cx and output_format == CX2_FORMAT:
+            self._visual_properties_aspect = StreamTSVLoader._get_cx2_style(style_cx)
+        elif style_cx:
             cy_visual_properties = style_cx.get_opaque_aspect("cyVisualProperties")
             if not cy_visual_properties:
                 raise NDExUtilError("cyVisualProperties aspect is missing in style template CX.")
@@ -160,8 +1555,84 @@ class StreamTSVLoader(object):
             logger.exception(e1)
             raise NDExUtilError("Malformed TSV loading plan: " + str(e1.absolute_path) + ' : ' + str(e1))
 
+        # compile the plan once so rows can be processed without
+        # re-interpreting it
+        self._source_plan = _CompiledNodePlan(self._plan.get('source_plan'))
+        self._target_plan = _CompiledNodePlan(self._plan.get('target_plan'))
+        self._edge_plan = _CompiledEdgePlan(self._plan.get('edge_plan'))
+        self._row_filter = get_row_filter(self._plan)
+        self._cx2_attribute_declarations = None
+        if output_format == CX2_FORMAT:
+            self._cx2_attribute_declarations = self._get_cx2_attribute_declarations()
+
+    @staticmethod
+    def _get_cx2_style(style_cx):
+        """
+        Gets aspects with style from `style_cx` to write to CX2
+
+        :param style_cx: network with style
+        :type style_cx: :py:class:`~ndex2.cx2.CX2Network`
+        :raises NDExUtilError: if `style_cx` has no CX2 visual properties
+        :return: ``visualProperties`` and, if set in `style_cx`,
+                 ``visualEditorProperties`` aspects
+        :rtype: list
+        """
+        get_visual_properties = getattr(style_cx, 'get_visual_properties', None)
+        if get_visual_properties is None or not get_visual_properties():
+            raise NDExUtilError('Style template for CX2 output must be a '
+                                'CX2Network with visualProperties')
+        style_aspects = [{'visualProperties': [get_visual_properties()]}]
+        editor_properties = style_cx.get_opaque_aspect('visualEditorProperties')
+        if editor_properties:
+            style_aspects.append({'visualEditorProperties': editor_properties})
+        return style_aspects
+
+    def _get_cx2_attribute_declarations(self):
+        """
+        Builds ``attributeDeclarations`` of nodes and edges for CX2 from
+        the loading plan. Attributes of collapsed edges are declared as
+        ``list_of_`` types
+
+        :raises NDExUtilError: if an attribute is declared with different
+                               data types or uses a name CX2 reserves for
+                               node name, represents or edge interaction
+        :return: declarations keyed by ``nodes`` and ``edges``
+        :rtype: dict
+        """
+        node_declarations = {}
+        for node_plan in (self._source_plan, self._target_plan):
+            if node_plan.node_name_column:
+                node_declarations[_CX2_NODE_NAME] = {'d': 'string'}
+            if not node_plan.use_name_as_id:
+                node_declarations[_CX2_NODE_REPRESENTS] = {'d': 'string'}
+        edge_declarations = {_CX2_EDGE_INTERACTION: {'d': 'string'}}
+        for aspect, declarations, plans, reserved, list_values in\
+                [('nodes', node_declarations, (self._source_plan, self._target_plan),
+                  (_CX2_NODE_NAME, _CX2_NODE_REPRESENTS), False),
+                 ('edges', edge_declarations, (self._edge_plan,),
+                  (_CX2_EDGE_INTERACTION,), self._edge_plan.collapse_edges)]:
+            for plan in plans:
+                for column in plan.columns:
+                    name = column.attribute_name
+                    if name in reserved:
+                        raise NDExUtilError('Attribute ' + str(name) + ' of ' + aspect +
+                                            ' is reserved in CX2')
+                    data_type = _CX2_DATA_TYPES.get(column.data_type, column.data_type)
+                    if list_values and not data_type.startswith('list_of_'):
+                        data_type = 'list_of_' + data_type
+                    declared = declarations.get(name)
+                    if declared is not None and declared['d'] != data_type:
+                        raise NDExUtilError('Attribute ' + str(name) + ' of ' + aspect +
+                                            ' has data types ' + declared['d'] +
+                                            ' and ' + data_type)
+                    declarations[name] = {'d': data_type}
+        return {'nodes': node_declarations, 'edges': edge_declarations}
+
     def write_cx_network(self, tsv_file_discriptor, output_file_descriptor,
-                         network_attributes = None, batchsize=20000):
+                         network_attributes = None, batchsize=20000,
+                         node_table=None, checkpoint_file=None,
+                         checkpoint_interval=10, resume=False,
+                         edge_table=None, max_batch_bytes=None):
         """
         Both input and output descriptor as objects NOT file names.
         this function is not thread safe
@@ -173,40 +1644,477 @@ class StreamTSVLoader(object):
         instead of any value in the load plan and a warning level message will
         be emitted to the logger.
 
-        :param tsv_file_discriptor: input stream/descriptor that supports read and readline calls
-        :type tsv_file_discriptor: stream
-        :param output_file_descriptor: output stream/descriptor that supports write calls
+        :param tsv_file_discriptor: input stream/descriptor that supports read and readline calls.
+                                    If opened in binary mode, data compressed with any
+                                    type in :py:const:`~ndexutil.tsv.compression.COMPRESSION_TYPES`
+                                    is detected and decompressed and text is
+                                    assumed to be UTF-8. Can also be a list of streams
+                                    and/or paths to TSV files, all with the same header,
+                                    that are loaded in order as one network. Files are
+                                    opened one at a time as they are reached
+        :type tsv_file_discriptor: stream or list
+        :param output_file_descriptor: output stream/descriptor that supports write calls.
+                                       Can be a text or binary stream such as one from
+                                       :py:func:`~ndexutil.tsv.compression.open_output`
+                                       to write compressed CX
         :type output_file_descriptor: stream
         :param network_attributes: should be a list of dicts() following CX spec for
                                    network attributes so each dict() should look like
                                    this: {'n': '<NAME>', 'v': '<VALUE>', 'd': '<TYPE>'}
                                    where 'd':... is assumed to 'string' if omitted
         :type network_attributes: list
-        :param batchsize: Number of rows to process before writing to 'output_file_descriptor'
+        :param batchsize: Number of rows to process before writing to 'output_file_descriptor'.
+                          Ignored if `max_batch_bytes` is set
         :type batchsize: int
+        :param node_table: Table used to track nodes already added to the network.
+                           If ``None`` a new :py:class:`~ndexutil.tsv.nodetable.InMemoryNodeTable`
+                           is used. Pass a :py:class:`~ndexutil.tsv.nodetable.SQLiteNodeTable`
+                           for networks whose nodes do not fit in memory. Caller is
+                           responsible for closing the table
+        :type node_table: :py:class:`~ndexutil.tsv.nodetable.InMemoryNodeTable`
+        :param checkpoint_file: If set, a :py:class:`~ndexutil.tsv.checkpoint.TSVLoaderCheckpoint`
+                                is saved to this path every `checkpoint_interval` batches
+                                and once the network is complete. The output stream must then
+                                be an uncompressed file opened for update, ie ``r+b``, if
+                                `resume` is True
+        :type checkpoint_file: str
+        :param checkpoint_interval: Number of batches written between checkpoints
+        :type checkpoint_interval: int
+        :param resume: If True and `checkpoint_file` exists, the output is truncated to
+                       the last checkpoint and loading continues from there, producing
+                       the same CX as an uninterrupted run. Input must be the same, and
+                       `node_table` empty, as when the checkpoint was saved
+        :type resume: bool
+        :param edge_table: Table used to collapse edges if ``collapse_edges`` is set
+                           in ``edge_plan`` of loading plan. Rows with the same source,
+                           target and interaction become one edge whose attributes
+                           are ``list_of_`` attributes with the distinct values of
+                           all the rows. Edges are written once all rows have been read.
+                           If ``None`` a new :py:class:`~ndexutil.tsv.edgetable.InMemoryEdgeTable`
+                           is used. Pass a :py:class:`~ndexutil.tsv.edgetable.SQLiteEdgeTable`
+                           for networks whose edges do not fit in memory. Caller is
+                           responsible for closing the table. Ignored if edges are not
+                           collapsed
+        :type edge_table: :py:class:`~ndexutil.tsv.edgetable.InMemoryEdgeTable`
+        :param max_batch_bytes: If set, batches are sized by their estimated size
+                                in CX instead of `batchsize` and are written once
+                                they reach about this many bytes of output. The
+                                size is estimated from the average size in CX of
+                                the nodes, edges and attributes already written,
+                                so batches write about the same amount of output
+                                no matter how many attributes rows have. This is
+                                a target for the size of the output of each
+                                batch, not a limit on memory: the nodes and edges
+                                buffered in memory take several times this many
+                                bytes. See :py:meth:`get_batch_statistics`
+        :type max_batch_bytes: int
+        :raises NDExUtilError: if `resume` is True and checkpoint does not match input,
+                               `checkpoint_file` is set and edges are collapsed or
+                               `max_batch_bytes` is less then 1
         :return:
         """
         # initialize the environment
         self.batchsize = batchsize
+        if max_batch_bytes is not None and max_batch_bytes < 1:
+            raise NDExUtilError('max_batch_bytes must be 1 or larger')
+        self._max_batch_bytes = max_batch_bytes
+        self._bytes_per_element = INITIAL_BYTES_PER_ELEMENT
+        self._batch_statistics = StreamTSVLoader._get_empty_batch_statistics()
+
+        if self._edge_plan.collapse_edges and checkpoint_file is not None:
+            raise NDExUtilError('checkpoint_file is not supported when '
+                                'collapse_edges is set in edge_plan')
+
+        with self._open_tsv_inputs(tsv_file_discriptor) as (tsv_lines, header):
+            self._write_cx_network(tsv_lines, header, output_file_descriptor,
+                                   network_attributes, node_table, checkpoint_file,
+                                   checkpoint_interval, resume, edge_table)
+
+    @staticmethod
+    def _get_empty_batch_statistics():
+        """
+        Gets statistics of no batches written
+
+        :return: statistics with every count set to 0
+        :rtype: dict
+        """
+        return {'batches': 0, 'elements': 0, 'bytes': 0,
+                'max_batch_elements': 0, 'max_batch_bytes': 0}
+
+    def get_batch_statistics(self):
+        """
+        Gets statistics of the batches written by the last call
+        to :py:meth:`write_cx_network`, or no batches if it has not
+        been called. Elements are nodes, edges and their attributes
+
+        :return: number of ``batches``, ``elements`` and ``bytes`` written,
+                 largest batch as ``max_batch_elements`` and ``max_batch_bytes``,
+                 ``mean_batch_bytes`` and the observed ``bytes_per_element``
+                 used to size batches when ``max_batch_bytes`` is set. Bytes
+                 are characters if output is a text stream
+        :rtype: dict
+        """
+        stats = dict(self._batch_statistics)
+        batches = stats['batches']
+        stats['mean_batch_bytes'] = stats['bytes'] / batches if batches > 0 else 0.0
+        stats['bytes_per_element'] = self._bytes_per_element
+        return stats
+
+    @contextlib.contextmanager
+    def _open_tsv_inputs(self, tsv_file_discriptor):
+        """
+        Context manager that opens TSV inputs passed to :py:meth:`write_cx_network`,
+        reads the header, checks it against the plan and binds the plan to it
+
+        :param tsv_file_discriptor: stream, or list of streams and/or paths
+        :raises NDExUtilError: if no inputs are passed in or TSV inputs are
+                               mixed with Parquet or Arrow inputs
+        :return: (lines of all inputs after the header, or rows if inputs
+                 are Parquet or Arrow, header)
+        :rtype: tuple
+        """
+        if isinstance(tsv_file_discriptor, (list, tuple)):
+            tsv_inputs = list(tsv_file_discriptor)
+        else:
+            tsv_inputs = [tsv_file_discriptor]
+        if len(tsv_inputs) == 0:
+            raise NDExUtilError('No TSV input passed in')
+
+        arrow_inputs = [StreamTSVLoader._get_arrow_input(i) for i in tsv_inputs]
+        self._rows_input = arrow_inputs[0] is not None
+        if self._rows_input:
+            if None in arrow_inputs:
+                raise NDExUtilError('TSV inputs cannot be mixed with '
+                                    'Parquet or Arrow inputs')
+            header = arrow_inputs[0].get_column_names()
+            self._check_header_vs_plan(header)
+            self._bind_plan(header)
+            column_names = header
+            if self._row_options['columns'] is not None:
+                column_names = [header[i] for i in self._row_options['columns']]
+            rows = _read_arrow_inputs(arrow_inputs, header, column_names,
+                                      self._get_typed_data_types())
+            try:
+                yield rows, header
+            finally:
+                rows.close()
+            return
+
+        with contextlib.ExitStack() as input_stack:
+            tsv_lines = input_stack.enter_context(_open_tsv_input(tsv_inputs[0]))
+            header = _read_header(tsv_lines, delimiter=self._delimiter,
+                                  quotechar=self._quotechar)
+            self._check_header_vs_plan(header)
+            self._bind_plan(header)
+            if len(tsv_inputs) > 1:
+                # lines of the other inputs follow the lines of the first one
+                tsv_lines = _read_tsv_inputs(tsv_lines, tsv_inputs[1:], header,
+                                             delimiter=self._delimiter,
+                                             quotechar=self._quotechar)
+                input_stack.callback(tsv_lines.close)
+            yield tsv_lines, header
+
+    @staticmethod
+    def _get_arrow_input(tsv_input):
+        """
+        Gets `tsv_input` as :py:class:`~ndexutil.tsv.arrowinput.ArrowInput`
+        if it is one or has the extension of a Parquet or Arrow file
+
+        :param tsv_input: path or stream
+        :return: input or None if `tsv_input` is TSV
+        :rtype: :py:class:`~ndexutil.tsv.arrowinput.ArrowInput`
+        """
+        if isinstance(tsv_input, ArrowInput):
+            return tsv_input
+        if get_input_format(tsv_input) is None:
+            return None
+        return ArrowInput(tsv_input)
+
+    def _get_typed_data_types(self):
+        """
+        Gets data types of property columns whose values can be passed
+        to the compiled plan as typed values by
+        :py:class:`~ndexutil.tsv.arrowinput.ArrowInput`. Columns with a
+        delimiter, or also used for node ids, names, predicates or the
+        row filter, need strings and are left out
+
+        :return: column name => set of data types
+        :rtype: dict
+        """
+        string_columns = set(self._edge_plan.get_column_names()[:1])
+        for node_plan in (self._source_plan, self._target_plan):
+            string_columns.update(node_plan.get_column_names()[:2])
+        if self._row_filter is not None:
+            string_columns.update(self._row_filter.get_column_names())
+        data_types = {}
+        for plan in (self._source_plan, self._target_plan, self._edge_plan):
+            for column in plan.columns:
+                if column.column_name is None:
+                    continue
+                if column.delimiter or column.data_type == 'string':
+                    string_columns.add(column.column_name)
+                else:
+                    data_types.setdefault(column.column_name, set()).add(column.data_type)
+        return {name: types for name, types in data_types.items()
+                if name not in string_columns}
+
+    def scan_tsv(self, tsv_file_discriptor, max_rows=None, max_errors=10,
+                 sample_size=1000):
+        """
+        Scans TSV input without writing CX to find rows with values that
+        do not match the loading plan and to estimate the size of the network.
+        Only the columns used by the plan are parsed and values are converted
+        to their ``data_type`` the same way as :py:meth:`write_cx_network`.
+        Distinct nodes are counted with a :py:class:`~ndexutil.tsv.sketch.HyperLogLog`
+        sketch so memory use does not grow with the number of nodes. Repeated
+        nodes are not checked for consistency. If ``collapse_edges`` is set in
+        ``edge_plan``, distinct edges are counted the same way and the number
+        of edge attributes is scaled by the ratio of distinct edges to rows
+
+        :param tsv_file_discriptor: same as for :py:meth:`write_cx_network`
+        :param max_rows: Stop after this many rows. If ``None`` all rows are scanned.
+                         Counts and estimates in the report are for the rows
+                         scanned only and are not scaled up to the whole input
+        :type max_rows: int
+        :param max_errors: Maximum number of errors to include in report. All
+                           errors are counted
+        :type max_errors: int
+        :param sample_size: Number of rows encoded to measure average size of
+                            elements in CX
+        :type sample_size: int
+        :raises Exception: if a column in the plan is not in the header
+        :return: report with number of ``rows`` scanned, ``complete`` which is
+                 False if scan stopped at `max_rows`, ``filtered_rows`` the number
+                 of rows dropped by ``row_filter``, ``error_count``, ``errors``
+                 a list of dicts with ``line`` and ``message`` of the first
+                 `max_errors` errors, and the estimated number of ``nodes``,
+                 ``edges``, ``node_attributes`` and ``edge_attributes`` plus
+                 ``cx_size`` the estimated size of the CX in bytes of the
+                 rows scanned
+        :rtype: dict
+        """
+        node_sketch = HyperLogLog()
+        edge_sketch = HyperLogLog() if self._edge_plan.collapse_edges else None
+        rows = 0
+        complete = True
+        errors = []
+        error_count = 0
+        filtered_rows = 0
+        node_attr_occurrences = 0
+        edge_attrs = 0
+        sample = []
+        with self._open_tsv_inputs(tsv_file_discriptor) as (tsv_lines, header):
+            # start at 1 so count is line number of last line of row
+            line_counter = _LineCounter(tsv_lines, count=1)
+            if self._rows_input:
+                row_reader = line_counter
+            else:
+                row_reader = _read_tsv_rows(line_counter, **self._row_options)
+            for row in row_reader:
+                if max_rows is not None and rows >= max_rows:
+                    complete = False
+                    break
+                rows += 1
+                if self._row_filter is not None and not self._row_filter.accept(row):
+                    filtered_rows += 1
+                    continue
+                try:
+                    source = self._source_plan.parse(row)
+                    target = self._target_plan.parse(row)
+                    edge = self._edge_plan.parse(row)
+                except Exception as e:
+                    error_count += 1
+                    if len(errors) < max_errors:
+                        errors.append({'line': line_counter.count,
+                                       'message': str(e)})
+                    continue
+                node_sketch.add(source[0])
+                node_sketch.add(target[0])
+                node_attr_occurrences += len(source[3]) + len(target[3])
+                edge_attrs += len(edge[1])
+                if edge_sketch is not None:
+                    edge_sketch.add((source[0], target[0], edge[0]))
+                if len(sample) < sample_size:
+                    sample.append((source, target, edge))
+
+        parsed_rows = rows - error_count - filtered_rows
+        nodes = node_sketch.count() if parsed_rows > 0 else 0
+        node_attrs = 0
+        edges = parsed_rows
+        if parsed_rows > 0:
+            node_attrs = int(round(nodes * node_attr_occurrences / (2.0 * parsed_rows)))
+            if edge_sketch is not None:
+                edges = min(edge_sketch.count(), parsed_rows)
+                edge_attrs = int(round(edge_attrs * float(edges) / parsed_rows))
+        node_size, node_attr_size, edge_size, edge_attr_size =\
+            self._get_sample_element_sizes(sample, nodes, edges)
+        return {'rows': rows,
+                'complete': complete,
+                'filtered_rows': filtered_rows,
+                'error_count': error_count,
+                'errors': errors,
+                'nodes': nodes,
+                'edges': edges,
+                'node_attributes': node_attrs,
+                'edge_attributes': edge_attrs,
+                'cx_size': int(round(node_size * nodes + node_attr_size * node_attrs +
+                                     edge_size * edges + edge_attr_size * edge_attrs))}
+
+    def _get_sample_element_sizes(self, sample, nodes, edges):
+        """
+        Encodes the nodes and edges parsed from `sample` rows the same way
+        as :py:meth:`_write_batch` to measure their average size. Ids are
+        set to half of `nodes` and `edges` to approximate the average
+        length of ids. For CX2 the attributes are part of the size of
+        the nodes and edges
+
+        :param sample: tuples of parsed source, target and edge
+        :type sample: list
+        :param nodes: estimated number of nodes
+        :type nodes: int
+        :param edges: number of edges
+        :type edges: int
+        :return: average size in bytes of a node, node attribute, edge and
+                 edge attribute or zeros if `sample` is empty
+        :rtype: tuple
+        """
+        sizes = [0, 0, 0, 0]
+        counts = [0, 0, 0, 0]
 
+        def _add(index, element):
+            data = self._encoder.encode(element)
+            if type(data) is str:
+                data = data.encode('utf-8')
+            # plus separator between elements
+            sizes[index] += len(data) + 1
+            counts[index] += 1
+
+        node_id = nodes // 2
+        edge_id = edges // 2
+        cx2 = self._output_format == CX2_FORMAT
+        for source, target, edge in sample:
+            for external_id, node_name, represent, attributes in (source, target):
+                if cx2:
+                    _add(0, StreamTSVLoader._get_cx2_node({'id': node_id, 'n': node_name,
+                                                           'r': represent,
+                                                           'attr': attributes}))
+                    continue
+                new_n = {'@id': node_id}
+                if node_name:
+                    new_n['n'] = node_name
+                if represent:
+                    new_n['r'] = represent
+                _add(0, new_n)
+                for value in attributes.values():
+                    _add(1, dict(value, po=node_id))
+            predicate_str, attributes = edge
+            if cx2:
+                _add(2, StreamTSVLoader._get_cx2_edge({'id': edge_id, 's': node_id,
+                                                       't': node_id, 'i': predicate_str,
+                                                       'attr': attributes}))
+                continue
+            new_e = {'@id': edge_id, 's': node_id, 't': node_id}
+            if predicate_str:
+                new_e['i'] = predicate_str
+            _add(2, new_e)
+            for value in attributes.values():
+                _add(3, dict(value, po=edge_id))
+        return tuple(float(size) / count if count > 0 else 0.0
+                     for size, count in zip(sizes, counts))
+
+    def _write_cx_network(self, tsv_file_discriptor, header, output_file_descriptor,
+                          network_attributes, node_table, checkpoint_file,
+                          checkpoint_interval, resume, edge_table=None):
+        """
+        Writes network for :py:meth:`write_cx_network` once input
+        has been opened and header read
+
+        :param tsv_file_discriptor: lines of input after header
+        :param header: column names
+        :type header: list
+        :return: None
+        """
         # table to track the node constructed in this network
         # key: the external id of the node. Can come from represent or node name depend on the loading plan
-        # value: node and its attributes.
-        self.nodeTable = {}
+        # value: depends on node_check passed to constructor, node and its attributes,
+        #        tuple of node id and fingerprint or just node id
+        if node_table is None:
+            node_table = InMemoryNodeTable()
+        self.nodeTable = node_table
         self.nodeCounter = 0
         self.edgeCounter = 0
         self.nodeAttrCounter = 0
         self.edgeAttrCounter = 0
         self.newNodes = []  # new nodes in the batch, each element has nodes and nodesAttribute info
         self.newEdges = []  # new edges in the batch, each element has edges and edgesAttribute info
+        self._batch_elements = 0  # nodes, edges and attributes in the batch
 
-        # start the process
-        header = [h.strip() for h in tsv_file_discriptor.readline().split('\t')]
-        self._check_header_vs_plan(header)
+        # table to collapse edges with same source, target and interaction,
+        # None if edges are written as rows are processed
+        self._edge_table = None
+        if self._edge_plan.collapse_edges:
+            self._edge_table = edge_table if edge_table is not None else InMemoryEdgeTable()
 
         # initialize the writer
-        self.cxWriter = CXStreamWriter(output_file_descriptor)
+        if self._output_format == CX2_FORMAT:
+            self.cxWriter = CX2StreamWriter(output_file_descriptor, encoder=self._encoder)
+        else:
+            self.cxWriter = CXStreamWriter(output_file_descriptor, encoder=self._encoder)
+
+        self._checkpoint = None
+        self._checkpoint_nodes = None
+        resume_state = None
+        if checkpoint_file is not None:
+            if checkpoint_interval is None or checkpoint_interval < 1:
+                raise NDExUtilError('checkpoint_interval must be 1 or larger')
+            self._checkpoint = TSVLoaderCheckpoint(checkpoint_file)
+            self._checkpoint_interval = checkpoint_interval
+            self._checkpoint_header = header
+            self._output_stream = output_file_descriptor
+            self._batches_since_checkpoint = 0
+            self._checkpoint_nodes = []
+            if resume is True:
+                resume_state = self._checkpoint.load()
+                if resume_state is None:
+                    logger.info('No checkpoint found in ' + checkpoint_file +
+                                ', starting from the beginning')
+                    output_file_descriptor.seek(0)
+                    output_file_descriptor.truncate()
+
+        lines_done = 0
+        try:
+            if resume_state is not None:
+                lines_done = self._resume_from_checkpoint(resume_state, header,
+                                                          output_file_descriptor)
+                if resume_state['complete'] is True:
+                    logger.info('Checkpoint shows network is complete, '
+                                'nothing left to write')
+                    return
+                _skip_lines(tsv_file_discriptor, lines_done)
+            else:
+                self._write_network_header(network_attributes)
+            if self._checkpoint is not None:
+                self._checkpoint.start(resume=resume_state is not None)
+
+            self._write_network_body(tsv_file_discriptor, header, lines_done)
+
+            if self._checkpoint is not None:
+                self._save_checkpoint(self._get_checkpoint_state(complete=True))
+        finally:
+            if self._checkpoint is not None:
+                self._checkpoint.close()
+            if self._edge_table is not None and edge_table is None:
+                self._edge_table.close()
+            self._edge_table = None
+
+    def _write_network_header(self, network_attributes):
+        """
+        Writes pre metadata, network attributes and style
 
+        :param network_attributes: network attributes passed
+                                   to :py:meth:`write_cx_network`
+        :return: None
+        """
         # write the context as network attribute
         net_attrs = []
         context = self._plan.get("context")
@@ -229,6 +2137,10 @@ class StreamTSVLoader(object):
             if context_found is False:
                 net_attrs.append({"n": "@context", "v": json.dumps(context)})
 
+        if self._output_format == CX2_FORMAT:
+            self._write_cx2_network_header(net_attrs)
+            return
+
         # prepare metadata
         premetadata = [{
                 "name": "nodes",
@@ -269,23 +2181,78 @@ class StreamTSVLoader(object):
         if self._visual_properties_aspect:
             self.cxWriter.write_aspect_fragment({"cyVisualProperties": self._visual_properties_aspect})
 
-        # start processing the file
-        reader = csv.DictReader(tsv_file_discriptor, dialect='excel-tab', fieldnames=header)
-        row_count = 2
-        # for debugging purposes, max_rows can be set so that only a subset of a large file is processed
-        for row in reader:
-            try:
-                self._process_row(row)
-                row_count = row_count + 1
-            except RuntimeError as err1:
-                print("Error occurred in line " + str(row_count) + ". Message: " + str(err1))
-                raise err1
-            except Exception as err2:
-                print("Error occurred in line " + str(row_count) + ". Message: " + str(err2))
-                raise err2
+    def _write_cx2_network_header(self, net_attrs):
+        """
+        Writes CX2 descriptor, meta data, attribute declarations,
+        network attributes and style
+
+        :param net_attrs: network attributes in CX format
+        :type net_attrs: list
+        :return: None
+        """
+        network_attributes = {}
+        network_declarations = {}
+        for net_a in net_attrs:
+            data_type = net_a.get('d') or 'string'
+            value = net_a.get('v')
+            if data_type != 'string' and type(value) is str:
+                value = self._data_to_type(value, data_type)
+            network_attributes[net_a['n']] = value
+            network_declarations[net_a['n']] = {'d': _CX2_DATA_TYPES.get(data_type,
+                                                                         data_type)}
+        declarations = {}
+        if network_declarations:
+            declarations['networkAttributes'] = network_declarations
+        declarations.update(self._cx2_attribute_declarations)
+
+        metadata = [{'name': 'attributeDeclarations', 'elementCount': 1}]
+        if network_attributes:
+            metadata.append({'name': 'networkAttributes', 'elementCount': 1})
+        # number of nodes and edges is not known until the end
+        metadata.append({'name': 'nodes'})
+        metadata.append({'name': 'edges'})
+        style_aspects = self._visual_properties_aspect or []
+        for aspect in style_aspects:
+            for name, elements in aspect.items():
+                metadata.append({'name': name, 'elementCount': len(elements)})
+
+        self.cxWriter.write_pre_metadata(metadata)
+        self.cxWriter.write_aspect_fragment({'attributeDeclarations': [declarations]})
+        if network_attributes:
+            self.cxWriter.write_aspect_fragment({'networkAttributes': [network_attributes]})
+        for aspect in style_aspects:
+            self.cxWriter.write_aspect_fragment(aspect)
+
+    def _write_network_body(self, tsv_file_discriptor, header, lines_done):
+        """
+        Writes nodes and edges for all rows in `tsv_file_discriptor`
+        followed by the post metadata
+
+        :param tsv_file_discriptor: input stream positioned after the header
+                                    and any lines already processed
+        :param header: column names
+        :type header: list
+        :param lines_done: number of lines after header already processed
+        :type lines_done: int
+        :return: None
+        """
+        self._batch_writer = None
+        if self._background_writer:
+            self._batch_writer = _BackgroundBatchWriter(self._write_batch)
+
+        try:
+            self._process_rows(tsv_file_discriptor, header, lines_done)
+
+            if self._edge_table is not None:
+                self._add_collapsed_edges()
 
-        # flush out whats left in the buffer
-        self._print_batch()
+            # flush out whats left in the buffer
+            self._print_batch()
+        finally:
+            if self._batch_writer is not None:
+                batch_writer = self._batch_writer
+                self._batch_writer = None
+                batch_writer.close(raise_error=sys.exc_info()[0] is None)
 
         # write the post metadata and finish the writing
 
@@ -296,6 +2263,150 @@ class StreamTSVLoader(object):
 
         self.cxWriter.write_post_metadata(postmetadata)
 
+    def _resume_from_checkpoint(self, state, header, output_file_descriptor):
+        """
+        Restores counters and node table from checkpoint `state` and
+        truncates output to the end of the last batch in the checkpoint
+
+        :param state: checkpoint loaded by
+                      :py:meth:`~ndexutil.tsv.checkpoint.TSVLoaderCheckpoint.load`
+        :type state: dict
+        :param header: column names of input
+        :type header: list
+        :param output_file_descriptor: output stream to truncate
+        :raises NDExUtilError: if checkpoint was saved for a different
+                               header or node check mode
+        :return: number of lines after header already processed
+        :rtype: int
+        """
+        if state['header'] != header:
+            raise NDExUtilError('Header ' + str(header) + ' does not match header ' +
+                                str(state['header']) + ' in checkpoint')
+        if state['node_check'] != self._node_check:
+            raise NDExUtilError('Checkpoint was saved with node_check ' +
+                                str(state['node_check']) + ' not ' + self._node_check)
+        self.nodeCounter = state['nodeCounter']
+        self.edgeCounter = state['edgeCounter']
+        self.nodeAttrCounter = state['nodeAttrCounter']
+        self.edgeAttrCounter = state['edgeAttrCounter']
+        if state['complete'] is True:
+            return state['lines']
+        num_nodes = self._checkpoint.restore_node_table(self.nodeTable, state)
+        logger.info('Resuming from checkpoint after ' + str(state['lines']) +
+                    ' lines with ' + str(num_nodes) + ' nodes')
+        output_file_descriptor.seek(state['output_offset'])
+        output_file_descriptor.truncate()
+        self.cxWriter.resume()
+        return state['lines']
+
+    def _get_checkpoint_state(self, complete=False):
+        """
+        Gets state of load to save as checkpoint once the nodes and edges
+        added so far are written. Only call between rows
+
+        :param complete: True if network has been completely written
+        :type complete: bool
+        :return: state
+        :rtype: dict
+        """
+        node_entries = self._checkpoint_nodes
+        self._checkpoint_nodes = []
+        return {'header': self._checkpoint_header,
+                'node_check': self._node_check,
+                'lines': self._get_lines_done(),
+                'nodeCounter': self.nodeCounter,
+                'edgeCounter': self.edgeCounter,
+                'nodeAttrCounter': self.nodeAttrCounter,
+                'edgeAttrCounter': self.edgeAttrCounter,
+                'complete': complete,
+                'node_entries': node_entries}
+
+    def _get_lines_done(self):
+        """
+        Gets number of lines after header that have been processed
+
+        :return: number of lines
+        :rtype: int
+        """
+        return self._lines_done
+
+    def _save_checkpoint(self, checkpoint_state):
+        """
+        Saves checkpoint from :py:meth:`_get_checkpoint_state`
+
+        :param checkpoint_state: state to save
+        :type checkpoint_state: dict
+        :return: None
+        """
+        state = dict(checkpoint_state)
+        node_entries = state.pop('node_entries')
+        self._checkpoint.save(state, node_entries, self._output_stream)
+        logger.debug('Saved checkpoint after ' + str(state['lines']) + ' lines')
+
+    def _process_rows(self, tsv_file_discriptor, header, lines_done=0):
+        """
+        Processes all rows in `tsv_file_discriptor`. Lines are parsed
+        in chunks of :py:const:`ROWS_PER_CHUNK` lines via :py:func:`_parse_lines`
+        so edge attributes are converted column wise
+
+        :param tsv_file_discriptor: input stream positioned after the header
+                                    and `lines_done` lines
+        :param header: column names
+        :type header: list
+        :param lines_done: number of lines after header already processed
+        :type lines_done: int
+        :return: None
+        """
+        self._lines_done = lines_done
+        self._filtered_rows = 0
+        if self._workers > 1:
+            self._process_rows_in_parallel(tsv_file_discriptor, header)
+        else:
+            row_count = 2 + lines_done
+            chunk_start = lines_done
+            row_options = None if self._rows_input else self._row_options
+            for chunk in self._read_chunks(tsv_file_discriptor, ROWS_PER_CHUNK):
+                parsed_chunk = _parse_lines(chunk, row_options, self._source_plan,
+                                            self._target_plan, self._edge_plan,
+                                            self._row_filter)
+                row_count = self._add_parsed_chunk(parsed_chunk, row_count, chunk_start)
+                chunk_start += len(chunk)
+        if self._filtered_rows > 0:
+            logger.info('Skipped ' + str(self._filtered_rows) +
+                        ' rows that did not pass row_filter')
+
+    def _read_chunks(self, tsv_file_discriptor, chunk_size):
+        """
+        Groups lines, or rows from Parquet or Arrow inputs, into
+        chunks via :py:func:`_read_tsv_chunks`
+
+        :param tsv_file_discriptor: lines or rows after header
+        :param chunk_size: number of lines or rows per chunk
+        :type chunk_size: int
+        :return: chunks
+        :rtype: list
+        """
+        quotechar = None if self._rows_input else self._quotechar
+        return _read_tsv_chunks(tsv_file_discriptor, chunk_size, delimiter=self._delimiter,
+                                quotechar=quotechar)
+
+    def _bind_plan(self, header):
+        """
+        Resolves the columns referenced by the compiled plan to their
+        position in rows projected to just those columns via
+        :py:func:`_bind_plans`
+
+        :param header: column names
+        :type header: list
+        :return: None
+        """
+        self._row_options = _bind_plans(header, [self._source_plan,
+                                                 self._target_plan,
+                                                 self._edge_plan,
+                                                 self._row_filter],
+                                        delimiter=self._delimiter,
+                                        quotechar=self._quotechar)
+
     def _check_header_vs_plan(self, header):
         # each column name referenced in the plan must be in the header, otherwise raise an exception
         StreamTSVLoader._check_column(self._plan.get('source_plan').get('rep_column'), header)
@@ -310,6 +2421,9 @@ class StreamTSVLoader(object):
         StreamTSVLoader._check_column(self._plan.get('edge_plan').get('citation_id_column'), header)
         StreamTSVLoader._check_plan_property_columns(self._plan.get('edge_plan'), header)
 
+        for condition in self._plan.get('row_filter', []):
+            StreamTSVLoader._check_column(condition.get('column_name'), header)
+
     @staticmethod
     def _check_column(column_name, header):
         if column_name:
@@ -337,237 +2451,285 @@ class StreamTSVLoader(object):
                         "Error in import plan: column name " + column_name + " in import plan is not in header " +
                         str(header))
 
-    def _process_row(self, row):
+    def _process_rows_in_parallel(self, tsv_file_discriptor, header):
         """
-        For each row, we create an edge + edge properties
-        For that edge, we may create elements if they are new
-        - source node + properties
-        - target node + properties
-        - predicate term
-        :param row:
-        :return:
+        Hands chunks of lines to a pool of worker processes that parse
+        them via :py:func:`_parse_chunk`. The parsed rows are added in
+        the order of the file by this process, which is the only one
+        touching the node table, ids and CX writer. At most two chunks
+        per worker are in flight to bound memory.
+
+        :param tsv_file_discriptor: input stream positioned after the header
+        :param header: column names
+        :type header: list
+        :return: None
         """
-
-        source_node_id = self._create_node(row, self._plan.get('source_plan'))
-        target_node_id = self._create_node(row, self._plan.get('target_plan'))
-
-        self._create_edge(source_node_id, target_node_id, row)
-
-    def _create_node(self, row, node_plan):
-
-        nodename = None
-
-        use_name_as_id = False
-
-        if not node_plan.get('rep_column'):
-            use_name_as_id = True
-
-        if use_name_as_id and node_plan.get('rep_prefix'):
-            raise RuntimeError("rep_column needs to be defined if re_prefix is defined in your loading plan.")
-
-        if 'node_name_column' in node_plan:
-            nodename = row.get(node_plan['node_name_column'])
-
-        if use_name_as_id:
-            ext_id = nodename
-        else:
-            ext_id = row.get(node_plan['rep_column'])
-
-        if not ext_id:
-            raise RuntimeError("Id value is missing.")
-
-        node_attr = self._create_attr_obj(node_plan, row)
-
-        if use_name_as_id:
-            represent = None
-        else:
-            represent = (node_plan['rep_prefix'] + ":" + ext_id) if node_plan.get('rep_prefix') else ext_id
-
-        return self._add_node(ext_id, nodename, represent, node_attr)
+        pending = deque()
+        row_count = 2 + self._lines_done
+        chunk_start = self._lines_done
+        with multiprocessing.Pool(self._workers, initializer=_init_parse_worker,
+                                  initargs=(self._plan, header, self._delimiter,
+                                            self._quotechar, self._rows_input)) as pool:
+            for chunk in self._read_chunks(tsv_file_discriptor, self._worker_chunksize):
+                pending.append((pool.apply_async(_parse_chunk, (chunk,)), chunk_start))
+                chunk_start += len(chunk)
+                if len(pending) >= 2 * self._workers:
+                    result, start = pending.popleft()
+                    row_count = self._add_parsed_chunk(result.get(), row_count, start)
+            while pending:
+                result, start = pending.popleft()
+                row_count = self._add_parsed_chunk(result.get(), row_count, start)
+
+    def _add_parsed_chunk(self, parsed_chunk, row_count, chunk_start=0):
+        """
+        Adds nodes and edges parsed by :py:func:`_parse_chunk`
+
+        :param parsed_chunk: result from :py:func:`_parse_chunk`
+        :type parsed_chunk: tuple
+        :param row_count: line number of first row in chunk
+        :type row_count: int
+        :param chunk_start: number of lines after header before chunk
+        :type chunk_start: int
+        :return: line number of first row in next chunk
+        :rtype: int
+        """
+        parsed_rows, parse_error = parsed_chunk
+        for source, target, edge, lines_read in parsed_rows:
+            if source is None:
+                # row dropped by row_filter
+                self._lines_done = chunk_start + lines_read
+                self._filtered_rows += 1
+                row_count = row_count + 1
+                continue
+            try:
+                source_node_id = self._add_node(*source)
+                target_node_id = self._add_node(*target)
+                self._lines_done = chunk_start + lines_read
+                self._add_edge(source_node_id, target_node_id, *edge)
+                row_count = row_count + 1
+            except Exception as err:
+                print("Error occurred in line " + str(row_count) + ". Message: " + str(err))
+                raise err
+        if parse_error is not None:
+            print("Error occurred in line " + str(row_count) + ". Message: " + str(parse_error))
+            raise parse_error
+        return row_count
 
     def _add_node(self, external_id, node_name, represent, attributes):
         existing_node = self.nodeTable.get(external_id)
-        if existing_node:
-            # check if everything matches
-            if node_name != existing_node.get('n'):
-                raise RuntimeError("Node name mismatch on node id " + external_id + ": " +
-                                   (node_name if node_name else "''") + " vs " +
-                                   existing_node.n if existing_node else "''")
-            if existing_node.get('r') != represent:
-                raise RuntimeError("Node represent mismatch on node id " + external_id + ": " + (represent if represent else "''")
-                                   + " vs " + (existing_node.r if existing_node.r else "''"))
-
-            # check attributes consistency
-            tmp_node = {"n": node_name,
-                        "r": represent,
-                        "attr": attributes}
-            tmp_node2 = {"n": existing_node.get("n"), "r": existing_node.get("r"), "attr": existing_node.get("attr")}
-
-            if tmp_node != tmp_node2:
-                raise RuntimeError("Node value mismatch between " + json.dumps(tmp_node) + " and " + json.dumps(tmp_node2))
-            return existing_node.get('id')
+        if existing_node is None:
+            return self._add_new_node(external_id, node_name, represent, attributes)
+
+        if self._node_check == NODE_CHECK_NONE:
+            return existing_node
+
+        if self._node_check == NODE_CHECK_FINGERPRINT:
+            if existing_node[1] != StreamTSVLoader._get_node_fingerprint(node_name, represent, attributes):
+                raise RuntimeError("Node value mismatch on node id " + external_id + ": " +
+                                   json.dumps({"n": node_name, "r": represent, "attr": attributes}) +
+                                   " does not match first occurrence of node")
+            return existing_node[0]
+
+        # check if everything matches
+        if node_name != existing_node.get('n'):
+            raise RuntimeError("Node name mismatch on node id " + external_id + ": " +
+                               (node_name if node_name else "''") + " vs " +
+                               (existing_node.get('n') if existing_node.get('n') else "''"))
+        if existing_node.get('r') != represent:
+            raise RuntimeError("Node represent mismatch on node id " + external_id + ": " +
+                               (represent if represent else "''") + " vs " +
+                               (existing_node.get('r') if existing_node.get('r') else "''"))
+
+        # check attributes consistency
+        tmp_node = {"n": node_name,
+                    "r": represent,
+                    "attr": attributes}
+        tmp_node2 = {"n": existing_node.get("n"), "r": existing_node.get("r"), "attr": existing_node.get("attr")}
+
+        if tmp_node != tmp_node2:
+            raise RuntimeError("Node value mismatch between " + json.dumps(tmp_node) + " and " + json.dumps(tmp_node2))
+        return existing_node.get('id')
+
+    def _add_new_node(self, external_id, node_name, represent, attributes):
+        new_node = {"id": self.nodeCounter,
+                    "n": node_name,
+                    "r": represent,
+                    "attr": attributes}
+
+        self.nodeCounter += 1
+        self.nodeAttrCounter += len(attributes)
+        self._batch_elements += 1 + len(attributes)
+        if self._node_check == NODE_CHECK_FULL:
+            table_value = new_node
+        elif self._node_check == NODE_CHECK_FINGERPRINT:
+            table_value = (new_node["id"],
+                           StreamTSVLoader._get_node_fingerprint(node_name, represent,
+                                                                 attributes))
         else:
-            new_node = {"id": self.nodeCounter,
-                        "n": node_name,
-                        "r": represent,
-                        "attr": attributes}
-
-            self.nodeCounter += 1
-            self.nodeAttrCounter += len(attributes.keys())
-            self.nodeTable[external_id] = new_node
-            self.newNodes.append(new_node)
-            return new_node["id"]
+            table_value = new_node["id"]
+        self.nodeTable[external_id] = table_value
+        if self._checkpoint_nodes is not None:
+            self._checkpoint_nodes.append((external_id, table_value))
+        self.newNodes.append(new_node)
+        return new_node["id"]
 
-    def _create_attr_obj(self, node_or_edge_plan, row):
+    @staticmethod
+    def _get_node_fingerprint(node_name, represent, attributes):
         """
-        Create attribute object
-        :param node_or_edge_plan: node or edge plan in the loading plan
-        :param row: current row to be parsed
-        :return:
+        Gets compact hash of node that is stable across processes
+
+        :param node_name: name of node
+        :param represent: represents of node
+        :param attributes: attributes of node
+        :type attributes: dict
+        :return: 8 byte digest
+        :rtype: bytes
         """
-        attr = {}
-        if node_or_edge_plan.get('property_columns'):
-            for column_raw_temp in node_or_edge_plan['property_columns']:
-                if isinstance(column_raw_temp, dict):
-                    column_raw = column_raw_temp
-                else:
-                    if '::' in column_raw_temp:
-                        column_split = column_raw_temp.split('::')
-                        if len(column_split) > 1:
-                            column_raw = {
-                                'column_name': column_split[0],
-                                'attribute_name': column_split[0],
-                                'data_type': column_split[1]
-                            }
-                        else:
-                            column_raw = {
-                                'column_name': column_raw_temp,
-                                'attribute_name': column_raw_temp
-                            }
-                    else:
-                        column_raw = {
-                            'column_name': column_raw_temp,
-                            'attribute_name': column_raw_temp
-                        }
-
-                if not column_raw.get('data_type'):
-                    if column_raw.get('delimiter'):
-                        # if there is a delimiter, set the default datatype to list of strings
-                        column_raw['data_type'] = 'list_of_string'
-                    else:
-                        # set the default datatype to string
-                        column_raw['data_type'] = 'string'
-
-                if not column_raw.get('attribute_name'):  # set the attribute name if it is not defined.
-                    column_raw['attribute_name'] = column_raw.get('column_name')
-
-                # type_temp = column_raw.get('data_type')
-                value = None
-
-                # this allows us to add arbitary attributes to all source or target nodes
-                if column_raw.get('column_name'):
-                    value = row.get(column_raw['column_name'])
-
-                if (value is None) and column_raw.get('default_value'):
-                    value = column_raw['default_value']
-
-                if value:
-                    if column_raw.get('delimiter'):
-                        value = value.split(column_raw.get('delimiter'))
-                        value = [entry.strip() for entry in value]
-                        value = self._data_to_type(value, column_raw['data_type'])
-                        # if not type_temp.startswith('list'):
-                        #    type_temp = 'list_of_' + type_temp
-
-                        if column_raw.get('value_prefix'):
-                            value_list_temp = []
-                            for value_item in value:
-                                value_temp = column_raw.get('value_prefix') + ":" + str(value_item)
-                                value_list_temp.append(value_temp)
-                            value = value_list_temp
-                    else:
-                        value = self._data_to_type(value, column_raw['data_type'])
-                        if value is None:
-                            return ''
-
-                        if column_raw.get('value_prefix'):
-                            value = column_raw.get('value_prefix') + ":" + str(value)
-
-                    attrname = column_raw['attribute_name'] if column_raw.get('attribute_name') \
-                        else column_raw['column_name']
-                    tmp_attr = {"n": attrname, "v": value}
-                    if column_raw['data_type'] != 'string':
-                        tmp_attr['d'] = column_raw['data_type']
-                    attr[attrname] = tmp_attr
-
-        return attr
+        return hashlib.blake2b(repr((node_name, represent, attributes)).encode('utf-8'),
+                               digest_size=8).digest()
 
     def _data_to_type(self, data, data_type):
-        return_data = None
-
+        converter = _DATA_TYPE_CONVERTERS.get(data_type)
+        if converter is None:
+            return None
         if type(data) is str:
             data = data.replace('[', '').replace(']', '')
             if 'list_of' in data_type:
                 data = data.split(',')
+        return converter(data)
+
+    def _add_edge(self, src_node_id, tgt_node_id, predicate_str, attr):
+        if self._edge_table is not None:
+            self._edge_table.add(src_node_id, tgt_node_id, predicate_str, attr)
+            # edges are written at the end, but nodes still need
+            # to be written in batches
+            if self._is_batch_full(len(self.newNodes)):
+                self._print_batch()
+            return
+        self._add_new_edge(src_node_id, tgt_node_id, predicate_str, attr)
+
+    def _add_collapsed_edges(self):
+        """
+        Adds edges collapsed in edge table once all rows have been
+        processed. Ids are assigned in order each edge first appeared
 
-        if data_type == "boolean":
-            if type(data) is str:
-                return_data = data.lower() == 'true'
-            else:
-                return_data = bool(data)
-        elif data_type == "double" or data_type == "float":
-            return_data = float(data)
-        elif data_type == "long" or data_type == "integer":
-            return_data = int(data)
-        elif data_type == "string":
-            return_data = str(data)
-        elif data_type == "list_of_boolean":
-            # Assumption: if the first element is a string then so are the rest...
-            if type(data[0]) is str:
-                return_data = [s.lower() == 'true' for s in data]
-            else:
-                return_data = [bool(s) for s in data]
-        elif data_type == "list_of_double" or data_type == "list_of_float":
-            return_data = [float(s) for s in data]
-        elif data_type == "list_of_long" or data_type == "list_of_integer":
-            return_data = [int(s) for s in data]
-        elif data_type == "list_of_string":
-            return_data = [str(s) for s in data]
-        else:
-            return None
-
-        return return_data
-
-    def _create_edge(self, src_node_id, tgt_node_id, row):
-        predicate_str = None
-        edge_plan = self._plan.get('edge_plan')
-        if edge_plan.get('predicate_id_column'):
-            predicate_str = row[edge_plan['predicate_id_column']]
-
-        if not predicate_str and edge_plan.get('default_predicate'):
-            predicate_str = edge_plan['default_predicate']
-
-        if not predicate_str:
-            raise RuntimeError("Value for predicate string is not found in this row.")
-        if edge_plan.get("predicate_prefix"):
-            predicate_str = edge_plan['predicate_prefix'] + ":" + predicate_str
+        :return: None
+        """
+        logger.info('Writing ' + str(len(self._edge_table)) + ' collapsed edges')
+        for src_node_id, tgt_node_id, predicate_str, attr in self._edge_table:
+            self._add_new_edge(src_node_id, tgt_node_id, predicate_str, attr)
 
-        attr = self._create_attr_obj(edge_plan, row)
+    def _add_new_edge(self, src_node_id, tgt_node_id, predicate_str, attr):
         new_edge = {"id": self.edgeCounter, "s": src_node_id, "t": tgt_node_id, "i": predicate_str, "attr": attr}
         self.edgeCounter += 1
 
         self.newEdges.append(new_edge)
-        self.edgeAttrCounter += len(attr.keys())
+        self.edgeAttrCounter += len(attr)
+        self._batch_elements += 1 + len(attr)
 
-        if len(self.newEdges) >= self.batchsize:
+        if self._is_batch_full(len(self.newEdges)):
             self._print_batch()
 
+    def _is_batch_full(self, batch_length):
+        """
+        Checks if the current batch should be written
+
+        :param batch_length: number of rows in batch
+        :type batch_length: int
+        :return: True if `batch_length` reached ``batchsize`` or, if
+                 ``max_batch_bytes`` is set, the estimated size of the
+                 batch reached it
+        :rtype: bool
+        """
+        if self._max_batch_bytes is None:
+            return batch_length >= self.batchsize
+        return self._batch_elements * self._bytes_per_element >= self._max_batch_bytes
+
     def _print_batch(self):
+        """
+        Writes nodes and edges added since the last call, in a separate
+        thread if `background_writer` was set in constructor
+
+        :return: None
+        """
+        checkpoint_state = None
+        if self._checkpoint is not None:
+            self._batches_since_checkpoint += 1
+            if self._batches_since_checkpoint >= self._checkpoint_interval:
+                self._batches_since_checkpoint = 0
+                checkpoint_state = self._get_checkpoint_state()
+        self._batch_elements = 0
+        if self._batch_writer is not None:
+            self._batch_writer.submit(self.newNodes, self.newEdges,
+                                      checkpoint_state=checkpoint_state)
+            self.newNodes = []
+            self.newEdges = []
+            return
+        self._write_batch(self.newNodes, self.newEdges,
+                          checkpoint_state=checkpoint_state)
+        self.newNodes.clear()
+        self.newEdges.clear()
+
+    def _add_batch_statistics(self, elements, batch_bytes):
+        """
+        Adds batch written to statistics returned by :py:meth:`get_batch_statistics`
+        and updates the estimated size of an element used to size batches
 
+        :param elements: number of nodes, edges and attributes in batch
+        :type elements: int
+        :param batch_bytes: size of batch written
+        :type batch_bytes: int
+        :return: None
+        """
+        if elements == 0:
+            return
+        stats = self._batch_statistics
+        stats['batches'] += 1
+        stats['elements'] += elements
+        stats['bytes'] += batch_bytes
+        stats['max_batch_elements'] = max(stats['max_batch_elements'], elements)
+        stats['max_batch_bytes'] = max(stats['max_batch_bytes'], batch_bytes)
+        self._bytes_per_element = stats['bytes'] / stats['elements']
+
+    def _write_batch(self, batch_nodes, batch_edges, checkpoint_state=None):
+        """
+        Writes nodes and edges along with their attributes as
+        aspect fragments
+
+        :param batch_nodes: new nodes
+        :type batch_nodes: list
+        :param batch_edges: new edges
+        :type batch_edges: list
+        :param checkpoint_state: if set, checkpoint to save once
+                                 the batch is written
+        :type checkpoint_state: dict
+        :return: None
+        """
+        if self._output_format == CX2_FORMAT:
+            elements, batch_bytes = self._write_cx2_batch(batch_nodes, batch_edges)
+        else:
+            elements, batch_bytes = self._write_cx_batch(batch_nodes, batch_edges)
+        self._add_batch_statistics(elements, batch_bytes)
+
+        if checkpoint_state is not None:
+            self._save_checkpoint(checkpoint_state)
+
+    def _write_cx_batch(self, batch_nodes, batch_edges):
+        """
+        Writes nodes, node attributes, edges and edge attributes
+        as CX aspect fragments
+
+        :param batch_nodes: new nodes
+        :type batch_nodes: list
+        :param batch_edges: new edges
+        :type batch_edges: list
+        :return: (number of nodes, edges and attributes, size written)
+        :rtype: tuple
+        """
         # print new nodes:
         new_nodes = []
         newnode_attrs = []
-        for n in self.newNodes:
+        for n in batch_nodes:
             new_n = {"@id": n["id"]}
             if n.get("n"):
                 new_n['n'] = n.get("n")
@@ -580,31 +2742,92 @@ class StreamTSVLoader(object):
                     tmp_value['po'] = n["id"]
                     newnode_attrs.append(tmp_value)
 
+        batch_bytes = 0
         if new_nodes:
-            self.cxWriter.write_aspect_fragment({"nodes": new_nodes})
+            batch_bytes += self.cxWriter.write_aspect_fragment({"nodes": new_nodes})
         if newnode_attrs:
-            self.cxWriter.write_aspect_fragment({"nodeAttributes": newnode_attrs})
-
-        # clear the buffer
-        self.newNodes.clear()
+            batch_bytes += self.cxWriter.write_aspect_fragment({"nodeAttributes": newnode_attrs})
 
         # print edges and their attributes
         new_edges = []
         new_edge_attrs = []
-        for e in self.newEdges:
+        for e in batch_edges:
             new_e = {'@id': e.get('id'), "s": e.get('s'), "t": e.get('t')}
             if e.get("i"):
                 new_e['i'] = e.get("i")
                 new_edges.append(new_e)
             if e.get("attr"):
                 for key, value in e.get("attr").items():
-                    value["po"] = e.get("id")
-                    new_edge_attrs.append(value)
+                    # attributes can be shared so they are copied
+                    new_edge_attrs.append(dict(value, po=e.get('id')))
 
         if new_edges:
-            self.cxWriter.write_aspect_fragment({"edges": new_edges})
+            batch_bytes += self.cxWriter.write_aspect_fragment({"edges": new_edges})
 
         if new_edge_attrs:
-            self.cxWriter.write_aspect_fragment({"edgeAttributes": new_edge_attrs})
+            batch_bytes += self.cxWriter.write_aspect_fragment({"edgeAttributes": new_edge_attrs})
 
-        self.newEdges.clear()
+        return (len(batch_nodes) + len(newnode_attrs) + len(batch_edges) +
+                len(new_edge_attrs), batch_bytes)
+
+    def _write_cx2_batch(self, batch_nodes, batch_edges):
+        """
+        Writes nodes and edges with their attribute values inline
+        as CX2 aspect fragments
+
+        :param batch_nodes: new nodes
+        :type batch_nodes: list
+        :param batch_edges: new edges
+        :type batch_edges: list
+        :return: (number of nodes, edges and attributes, size written)
+        :rtype: tuple
+        """
+        elements = len(batch_nodes) + len(batch_edges)
+        for element in itertools.chain(batch_nodes, batch_edges):
+            elements += len(element['attr'])
+        batch_bytes = 0
+        if batch_nodes:
+            batch_bytes += self.cxWriter.write_aspect_fragment(
+                {'nodes': [StreamTSVLoader._get_cx2_node(n) for n in batch_nodes]})
+        if batch_edges:
+            batch_bytes += self.cxWriter.write_aspect_fragment(
+                {'edges': [StreamTSVLoader._get_cx2_edge(e) for e in batch_edges]})
+        return elements, batch_bytes
+
+    @staticmethod
+    def _get_cx2_node(node):
+        """
+        Gets `node` as written in CX2
+
+        :param node: node added by :py:meth:`_add_new_node`
+        :type node: dict
+        :return: node with name, represents and attributes in ``v``
+        :rtype: dict
+        """
+        new_n = {'id': node['id']}
+        values = {name: attribute['v'] for name, attribute in node['attr'].items()}
+        if node.get('n'):
+            values[_CX2_NODE_NAME] = node['n']
+        if node.get('r'):
+            values[_CX2_NODE_REPRESENTS] = node['r']
+        if values:
+            new_n['v'] = values
+        return new_n
+
+    @staticmethod
+    def _get_cx2_edge(edge):
+        """
+        Gets `edge` as written in CX2
+
+        :param edge: edge added by :py:meth:`_add_new_edge`
+        :type edge: dict
+        :return: edge with interaction and attributes in ``v``
+        :rtype: dict
+        """
+        new_e = {'id': edge['id'], 's': edge['s'], 't': edge['t']}
+        values = {name: attribute['v'] for name, attribute in edge['attr'].items()}
+        if edge.get('i'):
+            values[_CX2_EDGE_INTERACTION] = edge['i']
+        if values:
+            new_e['v'] = values
+        return new_e
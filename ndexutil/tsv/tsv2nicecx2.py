@@ -1,14 +1,22 @@
 
 import json
 import os
+import inspect
 from os import path
 import jsonschema
+import numpy as np
 import pandas as pd
 import time
 import re
 import logging
+import math
+import tempfile
 from ndex2cx.nice_cx_builder import NiceCXBuilder
 from ndex2.client import Ndex2
+from ndexutil.tsv.rowfilter import get_row_filter
+from ndexutil.tsv.streamtsvloader import CXStreamWriter
+from ndexutil.tsv.networkcache import NetworkNameCache
+from ndexutil.exceptions import NDExUtilError
 
 version="0.1"
 
@@ -16,22 +24,91 @@ node_id_lookup = {}
 
 logger = logging.getLogger(__name__)
 
+# values of citation_id_column are split on any of these
+_CITATION_SEPARATOR = re.compile(r'\s*[,;|]\s*')
+
+ROWS_PER_BATCH = 10000
+"""
+Maximum number of rows of a DataFrame converted before the CX
+elements for them are written by :py:class:`CXChunkWriter`
+"""
+
+# id of property_columns of a plan => (property_columns, normalized columns)
+# so the columns are normalized once per plan instead of once per row
+_PROPERTY_COLUMNS_CACHE = {}
+
+# number of plans whose property_columns are kept in _PROPERTY_COLUMNS_CACHE
+_PROPERTY_COLUMNS_CACHE_SIZE = 64
+
+# error_bad_lines was replaced by on_bad_lines in pandas 1.3 and
+# removed in pandas 2.0
+if 'on_bad_lines' in inspect.signature(pd.read_csv).parameters:
+    _SKIP_BAD_LINES = {'on_bad_lines': 'skip'}
+else:
+    _SKIP_BAD_LINES = {'error_bad_lines': False}
+
 
 class ContentImporter(object):
-    def __init__(self, server, username, password, **attr):
-        self.update_mapping = {}
+    def __init__(self, server, username, password, network_cache_file=None, **attr):
+        """
+        Constructor. Networks of `username` are only requested from
+        NDEx once a network is uploaded
+
+        :param network_cache_file: path to file networks of `username`
+                                   are saved in to find the network
+                                   to update by name. See
+                                   :py:class:`~ndexutil.tsv.networkcache.NetworkNameCache`
+        :type network_cache_file: str
+        """
         self.server = server
         self.username = username
         self.password = password
         self.network = None
+        self._cx_file = None
+        self._cx_chunk_writer = None
+        self._network_name = None
         self.ndex = Ndex2(self.server, self.username, self.password)
-
-        networks = self.ndex.get_network_summaries_for_user(self.username)
-        for nk in networks:
-            if nk.get('name') is not None:
-                self.update_mapping[nk.get('name').upper()] = nk.get('externalId')
-
-    def process_file(self, file_name, load_plan_path, name, style_template=None, custom_header=None, delimiter='\t'):
+        self.network_cache = NetworkNameCache(self.ndex, self.server, self.username,
+                                              cache_file=network_cache_file)
+
+    @property
+    def update_mapping(self):
+        """
+        Name of network in upper case => UUID for all networks of user.
+        Every access requests the summaries of all networks of the user
+        from NDEx to rebuild the map, so get it once instead of in a loop
+        and use :py:meth:`~ndexutil.tsv.networkcache.NetworkNameCache.get_network_uuid`
+        of ``network_cache`` to look up a single network
+
+        :rtype: dict
+        """
+        return self.network_cache.get_mapping()
+
+    def process_file(self, file_name, load_plan_path, name, style_template=None, custom_header=None, delimiter='\t',
+                     chunk_size=None):
+        """
+        Converts `file_name` to a network using loading plan in `load_plan_path`
+        for :py:meth:`upload_network`
+
+        :param file_name: delimited file, looked for in ``data`` directory if not found
+        :type file_name: str
+        :param load_plan_path: loading plan, looked for in ``data`` directory if not found
+        :type load_plan_path: str
+        :param name: name of network
+        :type name: str
+        :param style_template: UUID of network on NDEx whose style is copied
+        :type style_template: str
+        :param custom_header: column names to use if `file_name` has no header
+        :type custom_header: list
+        :param delimiter: column delimiter
+        :type delimiter: str
+        :param chunk_size: if set, `file_name` is read `chunk_size` rows at a
+                           time and CX is written to a temporary file as each
+                           chunk is converted instead of creating the network
+                           in memory
+        :type chunk_size: int
+        :return: None
+        """
         # ==============================
         # LOAD TSV FILE INTO DATAFRAME
         # ==============================
@@ -41,19 +118,6 @@ class ContentImporter(object):
         if not os.path.isfile(load_plan_path): # If file is not in main directory try the ./data directory
             load_plan_path = os.path.join('data', load_plan_path)
 
-        with open(file_name, 'r', encoding='utf-8', errors='ignore') as tsvfile:
-            if custom_header is None:
-                header = [h.strip() for h in tsvfile.readline().split(delimiter)]
-
-                df = pd.read_csv(tsvfile, delimiter=delimiter, na_filter=False, engine='python', names=header,
-                                 dtype=str, error_bad_lines=False, comment='#')
-            else:
-                if isinstance(custom_header, list):
-                    df = pd.read_csv(tsvfile, delimiter=delimiter, na_filter=False, engine='python', names=custom_header,
-                                     dtype=str, error_bad_lines=False, comment='#')
-                else:
-                    raise Exception('Custom header provided was not of type list')
-
         # =====================
         # LOAD TSV LOAD PLAN
         # =====================
@@ -69,6 +133,25 @@ class ContentImporter(object):
         else:
             raise Exception('Please provide a load plan')
 
+        self.network = None
+        self._close_cx_file()
+        with open(file_name, 'r', encoding='utf-8', errors='ignore') as tsvfile:
+            if custom_header is None:
+                header = [h.strip() for h in tsvfile.readline().split(delimiter)]
+            elif isinstance(custom_header, list):
+                header = custom_header
+            else:
+                raise Exception('Custom header provided was not of type list')
+
+            if chunk_size:
+                chunks = pd.read_csv(tsvfile, delimiter=delimiter, na_filter=False, engine='c', names=header,
+                                     dtype=str, comment='#', chunksize=chunk_size, **_SKIP_BAD_LINES)
+                self._write_cx_file(chunks, load_plan, name, style_template)
+                return
+
+            df = pd.read_csv(tsvfile, delimiter=delimiter, na_filter=False, engine='python', names=header,
+                             dtype=str, comment='#', **_SKIP_BAD_LINES)
+
         # ====================
         # UPPERCASE COLUMNS
         # ====================
@@ -85,8 +168,41 @@ class ContentImporter(object):
 
         self.network = network
 
+    def _write_cx_file(self, chunks, load_plan, name, style_template):
+        """
+        Writes nodes and edges converted from `chunks` to a temporary
+        file. Network attributes and post meta data are written by
+        :py:meth:`upload_network` once it is known if the attributes
+        of an existing network are reused
+
+        :param chunks: DataFrames with rows of input
+        :return: None
+        """
+        style_aspects = None
+        if style_template is not None:
+            logger.debug('Applying style from network: ' + style_template)
+            visual_properties = self.ndex.get_network_aspect_as_cx_stream(style_template,
+                                                                          'cyVisualProperties').json()
+            style_aspects = [{'cyVisualProperties': visual_properties}]
+
+        self._cx_file = tempfile.TemporaryFile()
+        self._cx_chunk_writer = CXChunkWriter(load_plan, CXStreamWriter(self._cx_file))
+        self._cx_chunk_writer.write_pre_metadata(style_aspects=style_aspects)
+        for chunk in chunks:
+            self._cx_chunk_writer.write_dataframe(chunk)
+        self._network_name = name
+
+    def _close_cx_file(self):
+        if self._cx_file is not None:
+            self._cx_file.close()
+        self._cx_file = None
+        self._cx_chunk_writer = None
+
     def upload_network(self, re_use_metadata=True):
-        network_update_key = self.update_mapping.get(self.network.get_name().upper())
+        if self._cx_chunk_writer is not None:
+            self._upload_cx_file(re_use_metadata)
+            return
+        network_update_key = self.network_cache.get_network_uuid(self.network.get_name())
         if network_update_key is not None and re_use_metadata in ['true', 'True', 'yes', True]:
             logger.debug("Updating")
             self.update_network_properties(network_update_key)
@@ -97,6 +213,33 @@ class ContentImporter(object):
 
         logger.info(message)
 
+    def _upload_cx_file(self, re_use_metadata):
+        """
+        Finishes CX written by :py:meth:`process_file` in chunked mode
+        and uploads it
+
+        :return: None
+        """
+        network_attributes = [{'n': 'name', 'v': self._network_name}]
+        network_update_key = self.network_cache.get_network_uuid(self._network_name)
+        update = network_update_key is not None and re_use_metadata in ['true', 'True', 'yes', True]
+        if update:
+            for k, v in self.get_network_properties(network_update_key).items():
+                network_attributes.append({'n': k, 'v': v})
+        try:
+            self._cx_chunk_writer.write_post_metadata(network_attributes=network_attributes)
+            self._cx_file.seek(0)
+            if update:
+                logger.debug("Updating")
+                message = self.ndex.update_cx_network(self._cx_file, network_update_key)
+            else:
+                logger.debug("New network")
+                message = self.ndex.save_cx_stream_as_new_network(self._cx_file)
+        finally:
+            self._close_cx_file()
+
+        logger.info(message)
+
     def get_network_properties(self, uuid):
 
         network_properties_stream = self.ndex.get_network_aspect_as_cx_stream(uuid, 'networkAttributes')
@@ -125,38 +268,135 @@ def convert_pandas_to_nice_cx_with_load_plan(pandas_dataframe, load_plan, max_ro
                                             name=None, description=None,
                                             network_attributes=None, provenance=None):
 
-    # open the schema first
+    _validate_load_plan(load_plan)
+
+    nice_cx_builder = NiceCXBuilder()
+    t1 = int(time.time()*1000)
+
+    network_attributes = _add_context(load_plan, network_attributes)
+
+    _add_dataframe(nice_cx_builder, load_plan, pandas_dataframe,
+                   get_row_filter(load_plan), row_limit=_get_row_limit(max_rows))
+
+    _add_network_attributes(nice_cx_builder, network_attributes)
+
+    tsv_data_event = {
+            "inputs": None,
+            "startedAtTime": t1,
+            "endedAtTime": int(time.time()*1000),
+            "eventType": "TSV network generation",
+            "properties": [{
+                            "name": "TSV loader version",
+                            "value": version
+                        }]
+        }
+
+    # name and description take precedence over any prior values
+    _add_network_attributes(nice_cx_builder, None, name=name, description=description)
+
+    return nice_cx_builder.get_nice_cx()
+
+
+def write_cx_with_load_plan(pandas_dataframe, load_plan, output_stream, max_rows=None,
+                            name=None, description=None, network_attributes=None,
+                            style_aspects=None, encoder=None):
+    """
+    Writes CX of network converted from `pandas_dataframe` with `load_plan`
+    to `output_stream`. The network is the same as the one created by
+    :py:func:`convert_pandas_to_nice_cx_with_load_plan` with the same
+    arguments, but CX elements are created directly, without a
+    :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder` or
+    :py:class:`~ndex2.nice_cx_network.NiceCXNetwork` holding the whole
+    network. Use :py:class:`CXChunkWriter` for a DataFrame read in chunks
+
+    :param pandas_dataframe: data
+    :type pandas_dataframe: :py:class:`pandas.DataFrame`
+    :param load_plan: loading plan
+    :type load_plan: dict
+    :param output_stream: text or binary stream to write CX to
+    :param max_rows: if set, at most `max_rows` + 3 rows are loaded
+    :type max_rows: int
+    :param name: name of network
+    :type name: str
+    :param description: description of network
+    :type description: str
+    :param network_attributes: network attributes as dicts with ``n``,
+                               ``v`` and optionally ``d``
+    :type network_attributes: list
+    :param style_aspects: aspects such as ``cyVisualProperties``
+                          as dicts of aspect name to elements
+    :type style_aspects: list
+    :param encoder: encoder for fragments, see
+                    :py:func:`~ndexutil.tsv.streamtsvloader.get_fragment_encoder`
+    :raises jsonschema.ValidationError: if `load_plan` is not valid
+    :return: None
+    """
+    writer = CXChunkWriter(load_plan, CXStreamWriter(output_stream, encoder=encoder),
+                           max_rows=max_rows)
+    writer.write_pre_metadata(style_aspects=style_aspects)
+    writer.write_dataframe(pandas_dataframe)
+    writer.write_post_metadata(network_attributes=network_attributes, name=name,
+                               description=description)
+
+
+def _get_row_limit(max_rows):
+    """
+    Gets number of rows loaded for `max_rows`. Rows were counted
+    after they were loaded, stopping once the count was larger than
+    `max_rows` + 2, so `max_rows` + 3 rows are loaded
+
+    :return: number of rows or None if `max_rows` is not set
+    :rtype: int
+    """
+    if max_rows:
+        return max_rows + 3
+    return None
+
+
+def _validate_load_plan(load_plan):
+    """
+    Validates `load_plan` against ``loading_plan_schema.json``
+
+    :param load_plan: loading plan
+    :type load_plan: dict
+    :raises jsonschema.ValidationError: if `load_plan` is not valid
+    :return: None
+    """
     here = path.abspath(path.dirname(__file__))
     with open(path.join(here, 'loading_plan_schema.json')) as json_file:
         plan_schema = json.load(json_file)
 
     jsonschema.validate(load_plan, plan_schema)
 
-    node_lookup = {}
-    nice_cx_builder = NiceCXBuilder()
-    row_count = 0
-    t1 = int(time.time()*1000)
 
-    #Add context if they are defined
+def _add_context(load_plan, network_attributes):
+    """
+    Appends ``context`` of `load_plan`, if set, to `network_attributes`
+    as ``@context`` network attribute
+
+    :return: `network_attributes`, a new list if `network_attributes` is
+             None and `load_plan` has ``context``
+    :rtype: list
+    """
     context = load_plan.get('context')
     if context:
         if network_attributes is None:
             network_attributes = []
         network_attributes.append({"n": "@context", "v": json.dumps(context)})
+    return network_attributes
 
-    total_row_count = pandas_dataframe.shape
-    if len(total_row_count) > 1:
-        total_row_count = str(total_row_count[0])
-    for index, row in pandas_dataframe.iterrows():
-        # As each row is processed, self.G_nx is updated
-        process_row(nice_cx_builder, load_plan, row, node_lookup)
-        row_count = row_count + 1
-        if max_rows and row_count > max_rows + 2:
-            break
 
-        if row_count % 2500 == 0:
-            logger.info('processing %s out of %s edges' % (str(row_count), total_row_count))
+def _add_network_attributes(nice_cx_builder, network_attributes, name=None,
+                            description=None):
+    """
+    Adds `network_attributes` followed by `name` and `description`,
+    which take precedence, to `nice_cx_builder`
 
+    :param network_attributes: network attributes as dicts with ``n``,
+                               ``v`` and optionally ``d``
+    :type network_attributes: list
+    :return: None
+    """
     if network_attributes:
         for attribute in network_attributes:
             if attribute.get("n") == "name":
@@ -164,25 +404,699 @@ def convert_pandas_to_nice_cx_with_load_plan(pandas_dataframe, load_plan, max_ro
             else:
                 nice_cx_builder.add_network_attribute(name=attribute.get('n'), values=attribute.get('v'),
                                                       type=attribute.get('d'))
-
-    tsv_data_event = {
-            "inputs": None,
-            "startedAtTime": t1,
-            "endedAtTime": int(time.time()*1000),
-            "eventType": "TSV network generation",
-            "properties": [{
-                            "name": "TSV loader version",
-                            "value": version
-                        }]
-        }
-
-    # name and description take precedence over any prior values
     if name:
         nice_cx_builder.set_name(name)
     if description:
         nice_cx_builder.add_network_attribute(name='description', values=description)
 
-    return nice_cx_builder.get_nice_cx()
+
+def _add_dataframe(nice_cx_builder, load_plan, pandas_dataframe, row_filter,
+                   row_limit=None):
+    """
+    Adds nodes, edges and their attributes for rows of `pandas_dataframe`
+    that pass `row_filter`
+
+    :param row_filter: compiled ``row_filter`` of `load_plan` or None
+    :type row_filter: :py:class:`~ndexutil.tsv.rowfilter.RowFilter`
+    :param row_limit: if not None, at most `row_limit` rows are added
+    :type row_limit: int
+    :return: number of rows added
+    :rtype: int
+    """
+    columns = _DataFrameColumns(pandas_dataframe)
+    row_positions = _get_row_positions(columns, row_filter, row_limit)
+    logger.info('processing %s out of %s rows' % (str(len(row_positions)),
+                                                 str(pandas_dataframe.shape[0])))
+    _add_rows(nice_cx_builder, load_plan, columns, row_positions)
+    return len(row_positions)
+
+
+def _infer_cx_data_type(value):
+    """
+    Gets CX data type of `value` the same way as
+    :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder` does for
+    attributes without a data type
+
+    :return: (value, data type) with value None for NaN
+    :rtype: tuple
+    """
+    if isinstance(value, float):
+        if math.isnan(value):
+            value = None
+        elif math.isinf(value):
+            value = 'INFINITY'
+        return value, 'double'
+    if isinstance(value, bool):
+        return value, 'boolean'
+    if isinstance(value, int):
+        return value, 'integer'
+    if isinstance(value, list):
+        if len(value) > 0:
+            if isinstance(value[0], float):
+                return value, 'list_of_double'
+            if isinstance(value[0], bool):
+                return value, 'list_of_boolean'
+            if isinstance(value[0], int):
+                return value, 'list_of_integer'
+        return value, 'list_of_string'
+    return value, 'string'
+
+
+def _get_cx_attribute(property_of, name, values, data_type):
+    """
+    Creates node or edge attribute element the same way as
+    :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder`
+
+    :raises TypeError: if `values` is None
+    :raises ValueError: if `values` is not a number and `data_type`
+                        is ``double`` or ``float``
+    :return: element or None if value is NaN and `data_type` is not set
+    :rtype: dict
+    """
+    if values is None:
+        raise TypeError('Attribute value is None')
+    if data_type:
+        if data_type == 'float' or data_type == 'double':
+            data_type = 'double'
+            try:
+                if not isinstance(values, float):
+                    values = float(values)
+            except ValueError:
+                raise ValueError('Value was not of type %s' % data_type)
+        elif data_type == 'list_of_float' or data_type == 'list_of_double':
+            try:
+                if isinstance(values, list):
+                    for value in values:
+                        if not isinstance(value, float):
+                            float(value)
+            except ValueError:
+                raise ValueError('Value was not of type %s' % data_type)
+            data_type = 'list_of_double'
+    else:
+        values, data_type = _infer_cx_data_type(values)
+        if values is None:
+            return None
+    return {'po': property_of, 'n': name, 'v': values, 'd': data_type}
+
+
+class _CXElementEmitter(object):
+    """
+    Creates CX elements for nodes, edges and their attributes with the
+    same ids and values as :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder`,
+    implementing the methods of it used by :py:func:`_add_rows`, but
+    without creating a :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`.
+    Elements are kept only until :py:meth:`get_fragments` is called.
+    Only the node name to id lookup and the names of the attributes set
+    on each node, needed so the first value of a node attribute is kept,
+    stay in memory
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.node_id_counter = 0
+        self.edge_id_counter = 0
+        self.node_attribute_count = 0
+        self.edge_attribute_count = 0
+        self.node_attribute_map = {}
+        self.network_attribute_inventory = {}
+        self._node_ids = {}
+        # attributes are only added to the last edge
+        self._edge_id = None
+        self._edge_attribute_names = []
+        self._nodes = []
+        self._node_attributes = []
+        self._edges = []
+        self._edge_attributes = []
+
+    def set_name(self, network_name):
+        self.network_attribute_inventory['name'] = {'n': 'name', 'v': network_name, 'd': 'string'}
+
+    def add_network_attribute(self, name=None, values=None, type=None):
+        network_attribute = {'n': name, 'v': values}
+        if type:
+            network_attribute['d'] = type
+        self.network_attribute_inventory[name] = network_attribute
+
+    def add_node(self, name=None, represents=None, data_type=None):
+        node_id = self._node_ids.get(name)
+        if node_id is not None:
+            return node_id
+        node_id = self.node_id_counter
+        self.node_id_counter += 1
+        node = {'@id': node_id, 'n': name}
+        if represents:
+            node['r'] = represents
+        if data_type:
+            node['d'] = data_type
+        self._nodes.append(node)
+        self._node_ids[name] = node_id
+        return node_id
+
+    def add_edge(self, source=None, target=None, interaction=None):
+        edge_id = self.edge_id_counter
+        self.edge_id_counter += 1
+        self._edges.append({'@id': edge_id, 's': source, 't': target,
+                            'i': interaction or 'interacts-with'})
+        self._edge_id = edge_id
+        self._edge_attribute_names = []
+        return edge_id
+
+    def add_node_attribute(self, property_of, name, values, type=None):
+        names = self.node_attribute_map.get(property_of)
+        if values is not None and names is not None and name in names:
+            return
+        attribute = _get_cx_attribute(property_of, name, values, type)
+        if names is None:
+            names = set()
+            self.node_attribute_map[property_of] = names
+        if attribute is not None:
+            self._node_attributes.append(attribute)
+            names.add(name)
+
+    def add_edge_attribute(self, property_of=None, name=None, values=None, type=None):
+        """
+        Adds attribute to edge created by last call to :py:meth:`add_edge`
+
+        :raises NDExUtilError: if `property_of` is not id of last edge
+        """
+        if property_of != self._edge_id:
+            raise NDExUtilError('Attributes can only be added to last edge, ' +
+                                str(self._edge_id) + ', not ' + str(property_of))
+        if values is not None and name in self._edge_attribute_names:
+            return
+        attribute = _get_cx_attribute(property_of, name, values, type)
+        if attribute is not None:
+            self._edge_attributes.append(attribute)
+            self._edge_attribute_names.append(name)
+
+    def get_fragments(self):
+        """
+        Gets aspect fragments with elements created since last call
+
+        :return: aspect fragments
+        :rtype: list
+        """
+        fragments = []
+        for aspect_name, elements in [('nodes', self._nodes),
+                                      ('nodeAttributes', self._node_attributes),
+                                      ('edges', self._edges),
+                                      ('edgeAttributes', self._edge_attributes)]:
+            if elements:
+                fragments.append({aspect_name: elements})
+        self.node_attribute_count += len(self._node_attributes)
+        self.edge_attribute_count += len(self._edge_attributes)
+        self._nodes = []
+        self._node_attributes = []
+        self._edges = []
+        self._edge_attributes = []
+        return fragments
+
+
+class CXChunkWriter(object):
+    """
+    Writes CX for a network converted with a loading plan from a
+    DataFrame given in chunks, such as those returned by
+    :py:func:`pandas.read_csv` with ``chunksize`` set. The network is
+    the same as the one created by :py:func:`convert_pandas_to_nice_cx_with_load_plan`
+    from all the chunks concatenated, but nodes, edges and their
+    attributes are written to the stream as each chunk is added so
+    memory used does not grow with the number of rows. CX elements are
+    created directly without a :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder`
+    or :py:class:`~ndex2.nice_cx_network.NiceCXNetwork`.
+
+    Usage:
+
+    .. code-block:: python
+
+        writer = CXChunkWriter(load_plan, CXStreamWriter(out))
+        writer.write_pre_metadata()
+        for chunk in pd.read_csv(tsvfile, sep='\\t', dtype=str, chunksize=100000):
+            writer.write_dataframe(chunk)
+        writer.write_post_metadata(name='mynetwork')
+    """
+    def __init__(self, load_plan, cx_writer, max_rows=None):
+        """
+        Constructor
+
+        :param load_plan: loading plan
+        :type load_plan: dict
+        :param cx_writer: writer for output stream
+        :type cx_writer: :py:class:`~ndexutil.tsv.streamtsvloader.CXStreamWriter`
+        :param max_rows: if set, rows are loaded the same way as with
+                         `max_rows` of :py:func:`convert_pandas_to_nice_cx_with_load_plan`
+                         counting rows of all chunks
+        :type max_rows: int
+        :raises jsonschema.ValidationError: if `load_plan` is not valid
+        """
+        _validate_load_plan(load_plan)
+        self._load_plan = load_plan
+        self._row_filter = get_row_filter(load_plan)
+        self._row_limit = _get_row_limit(max_rows)
+        self._cx_writer = cx_writer
+        self._emitter = _CXElementEmitter()
+        self._row_count = 0
+
+    def write_pre_metadata(self, style_aspects=None):
+        """
+        Writes pre meta data followed by `style_aspects`
+
+        :param style_aspects: aspects such as ``cyVisualProperties``
+                              as dicts of aspect name to elements
+        :type style_aspects: list
+        :return: None
+        """
+        premetadata = [{'name': 'nodes', 'version': '1.0', 'consistencyGroup': 1},
+                       {'name': 'edges', 'version': '1.0', 'consistencyGroup': 1},
+                       {'name': 'nodeAttributes', 'version': '1.0', 'consistencyGroup': 1},
+                       {'name': 'edgeAttributes', 'version': '1.0', 'consistencyGroup': 1},
+                       {'name': 'networkAttributes', 'version': '1.0', 'consistencyGroup': 1}]
+        for aspect in style_aspects or []:
+            for aspect_name, elements in aspect.items():
+                premetadata.append({'name': aspect_name, 'version': '1.0',
+                                    'consistencyGroup': 1, 'elementCount': len(elements)})
+        self._cx_writer.write_pre_metadata(premetadata)
+        for aspect in style_aspects or []:
+            self._cx_writer.write_aspect_fragment(aspect)
+
+    def write_dataframe(self, pandas_dataframe):
+        """
+        Writes nodes, edges and their attributes for rows of
+        `pandas_dataframe`, :py:const:`ROWS_PER_BATCH` rows at a time.
+        Nodes already written for an earlier chunk are reused
+
+        :param pandas_dataframe: next chunk of rows
+        :type pandas_dataframe: :py:class:`pandas.DataFrame`
+        :return: number of rows added
+        :rtype: int
+        """
+        row_count = 0
+        for offset in range(0, pandas_dataframe.shape[0], ROWS_PER_BATCH):
+            row_limit = None
+            if self._row_limit is not None:
+                row_limit = max(self._row_limit - self._row_count, 0)
+            batch_row_count = _add_dataframe(self._emitter, self._load_plan,
+                                             pandas_dataframe.iloc[offset:offset + ROWS_PER_BATCH],
+                                             self._row_filter, row_limit=row_limit)
+            for fragment in self._emitter.get_fragments():
+                self._cx_writer.write_aspect_fragment(fragment)
+            self._row_count += batch_row_count
+            row_count += batch_row_count
+        return row_count
+
+    def write_post_metadata(self, network_attributes=None, name=None,
+                            description=None):
+        """
+        Writes network attributes followed by the post meta data.
+        Network attributes are set the same way as by
+        :py:func:`convert_pandas_to_nice_cx_with_load_plan`
+
+        :param network_attributes: network attributes as dicts with ``n``,
+                                   ``v`` and optionally ``d``
+        :type network_attributes: list
+        :param name: name of network
+        :type name: str
+        :param description: description of network
+        :type description: str
+        :return: None
+        """
+        network_attributes = _add_context(self._load_plan, network_attributes)
+        _add_network_attributes(self._emitter, network_attributes,
+                                name=name, description=description)
+        network_attribute_inventory = self._emitter.network_attribute_inventory
+        if network_attribute_inventory:
+            self._cx_writer.write_aspect_fragment({'networkAttributes':
+                                                   list(network_attribute_inventory.values())})
+        node_count = self._emitter.node_id_counter
+        edge_count = self._emitter.edge_id_counter
+        self._cx_writer.write_post_metadata([{'name': 'nodes', 'idCounter': node_count,
+                                              'elementCount': node_count},
+                                             {'name': 'edges', 'idCounter': edge_count,
+                                              'elementCount': edge_count},
+                                             {'name': 'nodeAttributes',
+                                              'elementCount': self._emitter.node_attribute_count},
+                                             {'name': 'edgeAttributes',
+                                              'elementCount': self._emitter.edge_attribute_count},
+                                             {'name': 'networkAttributes',
+                                              'elementCount': len(network_attribute_inventory)}])
+        logger.info('Wrote %s nodes and %s edges from %s rows' % (str(node_count), str(edge_count),
+                                                                 str(self._row_count)))
+
+
+class _DeferredError(object):
+    """
+    Error raised converting a value that is raised once the row
+    holding the value is added, same as if the rows were processed
+    one at a time
+    """
+    def __init__(self, error):
+        self.error = error
+
+
+# returned for a node attribute value that stops the remaining
+# attributes of the node in that row from being added
+_SKIP_REMAINING_ATTRIBUTES = object()
+
+
+class _DataFrameColumns(object):
+    """
+    Columns of a DataFrame as lists holding the same values as the
+    row :py:class:`pandas.Series` created by :py:meth:`pandas.DataFrame.iterrows`
+    without creating a Series for every row
+    """
+    def __init__(self, pandas_dataframe):
+        """
+        Constructor
+
+        :param pandas_dataframe: data
+        :type pandas_dataframe: :py:class:`pandas.DataFrame`
+        """
+        self._values = pandas_dataframe.values
+        self._positions = {name: index for index, name in
+                           enumerate(pandas_dataframe.columns)}
+        self.num_rows = self._values.shape[0]
+
+    def has_column(self, column_name):
+        return column_name in self._positions
+
+    def get_column_names(self):
+        return list(self._positions.keys())
+
+    def get_values(self, column_name, row_positions):
+        """
+        Gets values of column at `row_positions`
+
+        :param column_name: name of column
+        :param row_positions: positions of rows
+        :type row_positions: list
+        :raises KeyError: if column is not in DataFrame
+        :return: values
+        :rtype: list
+        """
+        column = self._values[:, self._positions[column_name]]
+        return list(column[row_positions])
+
+
+def _get_row_positions(columns, row_filter, row_limit):
+    """
+    Gets positions of rows that pass `row_filter`
+
+    :param columns: columns of DataFrame
+    :type columns: :py:class:`_DataFrameColumns`
+    :param row_filter: compiled ``row_filter`` or None
+    :type row_filter: :py:class:`~ndexutil.tsv.rowfilter.RowFilter`
+    :param row_limit: if not None, at most `row_limit` rows are returned
+    :type row_limit: int
+    :raises NDExUtilError: if a column of `row_filter` is not in DataFrame
+    :return: row positions
+    :rtype: :py:class:`numpy.ndarray`
+    """
+    row_positions = np.arange(columns.num_rows)
+    if row_filter is not None:
+        filter_columns = list(dict.fromkeys(row_filter.get_column_names()))
+        for column_name in filter_columns:
+            if not columns.has_column(column_name):
+                raise NDExUtilError('Error in import plan: column name ' + str(column_name) +
+                                    ' of row_filter is not in DataFrame columns ' +
+                                    str(columns.get_column_names()))
+    if row_filter is not None and columns.num_rows > 0:
+        row_filter.bind({name: index for index, name in enumerate(filter_columns)})
+        filter_values = [[_get_filter_value(v) for v in
+                          columns.get_values(c, row_positions)]
+                         for c in filter_columns]
+        rows = zip(*filter_values) if filter_values else [()] * columns.num_rows
+        row_positions = np.array([position for position, row in zip(row_positions, rows)
+                                  if row_filter.accept(row)], dtype=int)
+    if row_limit is not None:
+        row_positions = row_positions[:row_limit]
+    return row_positions
+
+
+def _convert_values(values, convert):
+    """
+    Applies `convert` to `values` calling it once per distinct value.
+    Errors are returned as :py:class:`_DeferredError`
+
+    :param values: values of a column
+    :type values: list
+    :param convert: function taking a value
+    :return: converted values
+    :rtype: list
+    """
+    def _convert(value):
+        try:
+            return convert(value)
+        except Exception as e:
+            return _DeferredError(e)
+
+    converted = {}
+    result = []
+    for value in values:
+        # type is part of key since values such as 1, 1.0 and True
+        # are equal but are not converted the same way
+        try:
+            key = (value.__class__, value)
+            result.append(converted[key])
+        except KeyError:
+            converted[key] = _convert(value)
+            result.append(converted[key])
+        except TypeError:
+            result.append(_convert(value))
+    return result
+
+
+def _get_node_keys(columns, row_positions, node_plan):
+    """
+    Gets name and represents of node of `node_plan` for each row
+    the same way as :py:func:`create_node` including the updates
+    :py:func:`create_node` makes to `node_plan`
+
+    :return: (names with None for rows without a node, represents,
+             data type of node name from ``node_name_column`` or None,
+             node name column)
+    :rtype: tuple
+    """
+    node_name_column = node_plan['node_name_column']
+    node_name_type = None
+    if '::' in node_name_column:
+        node_name_split = node_name_column.split('::')
+        node_plan['node_name_column'] = node_name_split[0]
+        node_name_type = node_name_split[1]
+
+    if not node_plan.get('rep_column'):
+        node_plan['rep_column'] = node_plan['node_name_column']
+        if node_plan.get('rep_prefix'):
+            raise RuntimeError("Id column needs to be defined if id_prefix is defined in your query plan.")
+
+    rep_prefix = node_plan.get('rep_prefix')
+    names = []
+    represents = []
+    for node_name, ext_id in zip(columns.get_values(node_plan['node_name_column'],
+                                                    row_positions),
+                                 columns.get_values(node_plan['rep_column'],
+                                                    row_positions)):
+        if ext_id and rep_prefix:
+            ext_id = rep_prefix + ":" + str(ext_id)
+        if node_name and not ext_id:
+            ext_id = node_name
+        elif not node_name and ext_id:
+            node_name = ext_id
+        elif not node_name and not ext_id:
+            node_name = None
+        names.append(node_name)
+        represents.append(ext_id)
+    return names, represents, node_name_type, node_plan['node_name_column']
+
+
+def _get_attribute_columns(columns, row_positions, plan, get_attribute):
+    """
+    Converts values of ``property_columns`` of `plan` column by column
+    via :py:func:`_convert_values`
+
+    :param get_attribute: :py:meth:`_PropertyColumn.get_node_attribute` or
+                          :py:meth:`_PropertyColumn.get_edge_attribute`
+    :return: list of converted values for each row of each column
+    :rtype: list
+    """
+    attribute_columns = []
+    for column in _get_property_columns(plan):
+        if column.column_name and columns.has_column(column.column_name):
+            values = columns.get_values(column.column_name, row_positions)
+        else:
+            values = [None] * len(row_positions)
+        attribute_columns.append(_convert_values(values, lambda value, c=column:
+                                                 get_attribute(c, value)))
+    return attribute_columns
+
+
+def _get_predicate(edge_plan, predicate_str):
+    """
+    Gets interaction of edge the same way as :py:func:`create_edge`
+
+    :raises RuntimeError: if there is no predicate
+    :return: predicate
+    :rtype: str
+    """
+    if not predicate_str and edge_plan.get('default_predicate'):
+        predicate_str = edge_plan['default_predicate']
+
+    if not predicate_str:
+        raise RuntimeError("Value for predicate string is not found in this row.")
+    if edge_plan.get("predicate_prefix"):
+        predicate_str = edge_plan['predicate_prefix'] + ":" + predicate_str
+    return predicate_str
+
+
+def _get_citations(edge_plan, citation_ids):
+    """
+    Splits each value of ``citation_id_column`` in `citation_ids` on
+    ``,``, ``;`` and ``|``, ignoring whitespace around them, and adds
+    ``citation_id_prefix`` of `edge_plan` if set
+
+    :param citation_ids: values of ``citation_id_column``
+    :type citation_ids: list
+    :return: citations for each value
+    :rtype: list
+    """
+    split = _CITATION_SEPARATOR.split
+    prefix = edge_plan.get("citation_id_prefix")
+    if prefix:
+        prefix = prefix + ':'
+        return [[prefix + c for c in split(str(citation_id))]
+                for citation_id in citation_ids]
+    return [split(str(citation_id)) for citation_id in citation_ids]
+
+
+def _get_value(converted):
+    """
+    Gets value converted by :py:func:`_convert_values` raising
+    the error if conversion failed. Lists are copied since values
+    are shared by all rows with the same raw value
+    """
+    if type(converted) is _DeferredError:
+        raise converted.error
+    if type(converted) is list:
+        return list(converted)
+    return converted
+
+
+def _add_node_attribute_columns(nice_cx_builder, node_id, attribute_columns, index):
+    """
+    Adds attributes of node in row at `index` the same way as
+    :py:func:`add_node_attributes`
+
+    :return: None
+    """
+    attribute_map = nice_cx_builder.node_attribute_map.get(node_id)
+    for attribute_column in attribute_columns:
+        attribute = attribute_column[index]
+        if attribute is None:
+            continue
+        if attribute is _SKIP_REMAINING_ATTRIBUTES:
+            return
+        attribute = _get_value(attribute)
+        if attribute_map is not None and attribute[1] is not None and\
+                attribute[0] in attribute_map:
+            # first value of attribute is kept
+            continue
+        nice_cx_builder.add_node_attribute(node_id, attribute[0], _get_value(attribute[1]),
+                                           type=attribute[2])
+        attribute_map = nice_cx_builder.node_attribute_map.get(node_id)
+
+
+def _add_rows(nice_cx_builder, load_plan, columns, row_positions):
+    """
+    Adds nodes, edges and their attributes for rows at `row_positions`
+    producing the same network as calling :py:func:`process_row` for
+    each row. Instead of creating a :py:class:`pandas.Series` for each
+    row and interpreting the plan for every value, values are read
+    column by column and each distinct value of a column is converted
+    once. Only adding the converted values to `nice_cx_builder` is
+    done row by row
+
+    :param nice_cx_builder: builder to add nodes and edges to
+    :type nice_cx_builder: :py:class:`~ndex2cx.nice_cx_builder.NiceCXBuilder`
+    :param load_plan: loading plan
+    :type load_plan: dict
+    :param columns: columns of DataFrame
+    :type columns: :py:class:`_DataFrameColumns`
+    :param row_positions: positions of rows to add
+    :type row_positions: :py:class:`numpy.ndarray`
+    :return: None
+    """
+    if len(row_positions) == 0:
+        return
+    source_plan = load_plan.get('source_plan')
+    target_plan = load_plan.get('target_plan')
+    edge_plan = load_plan.get('edge_plan')
+
+    nodes = []
+    for node_plan in (source_plan, target_plan):
+        names, represents, node_name_type, node_name_column =\
+            _get_node_keys(columns, row_positions, node_plan)
+        nodes.append((names, represents, node_name_type, node_name_column,
+                      _get_attribute_columns(columns, row_positions, node_plan,
+                                             _PropertyColumn.get_node_attribute)))
+
+    predicate_id_column = edge_plan.get('predicate_id_column')
+    if predicate_id_column:
+        predicates = columns.get_values(predicate_id_column, row_positions)
+    else:
+        predicates = [None] * len(row_positions)
+    predicates = _convert_values(predicates, lambda value: _get_predicate(edge_plan, value))
+    edge_attribute_columns = _get_attribute_columns(columns, row_positions, edge_plan,
+                                                    _PropertyColumn.get_edge_attribute)
+    citations = None
+    if edge_plan.get("citation_id_column"):
+        citations = _get_citations(edge_plan, columns.get_values(edge_plan['citation_id_column'],
+                                                                 row_positions))
+
+    for index in range(len(row_positions)):
+        node_ids = []
+        for names, represents, node_name_type, node_name_column, attribute_columns in nodes:
+            node_name = names[index]
+            if node_name is None:
+                print('No node name or ext id.  Skipping this node (%s)' % node_name_column)
+                node_ids.append(None)
+                continue
+            node_id = nice_cx_builder.add_node(name=node_name, represents=represents[index],
+                                               data_type=node_name_type if index == 0 else None)
+            _add_node_attribute_columns(nice_cx_builder, node_id, attribute_columns, index)
+            node_ids.append(node_id)
+
+        if node_ids[0] is None or node_ids[1] is None:
+            continue
+        edge_id = nice_cx_builder.add_edge(source=node_ids[0], target=node_ids[1],
+                                           interaction=_get_value(predicates[index]))
+        for attribute_column in edge_attribute_columns:
+            attribute = attribute_column[index]
+            if attribute is None:
+                continue
+            if type(attribute) is _DeferredError:
+                raise attribute.error
+            value = attribute[1]
+            if type(value) is list:
+                value = list(value)
+            nice_cx_builder.add_edge_attribute(property_of=edge_id, name=attribute[0],
+                                               values=value, type=attribute[2])
+        if citations is not None:
+            nice_cx_builder.add_edge_attribute(property_of=edge_id, name='citation',
+                                               values=citations[index],
+                                               type='list_of_string')
+
+
+def _get_filter_value(value):
+    """
+    Converts `value` from a cell of a DataFrame to the str or None
+    expected by :py:class:`~ndexutil.tsv.rowfilter.RowFilter`
+
+    :param value: value of cell
+    :return: value as str or None if value is missing
+    :rtype: str
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
 
 
 #==================================
@@ -272,21 +1186,8 @@ def create_edge(nice_cx_builder, src_node_id, tgt_node_id, row, import_plan):
     add_edge_attributes(nice_cx_builder, edge_id, edge_plan, row)
 
     # Deal with citiations
-    citation_id = None
     if edge_plan.get("citation_id_column"):
-        citation_id = str(row[edge_plan['citation_id_column']])
-
-    if citation_id is not None:
-        citation_id = citation_id.replace(';', ',')
-        citation_id = citation_id.replace('|', ',')
-        if edge_plan.get("citation_id_prefix"):
-            citation_id_temp = re.split('\s*,\s*', citation_id)
-            citation_id = []
-            for c in citation_id_temp:
-                citation_id.append(edge_plan.get("citation_id_prefix") + ':' + c)
-            #citation_id = edge_plan.get("citation_id_prefix") + ':' + citation_id
-        else:
-            citation_id = re.split('\s*,\s*', citation_id)
+        citation_id = _get_citations(edge_plan, [row[edge_plan['citation_id_column']]])[0]
 
         nice_cx_builder.add_edge_attribute(property_of=edge_id, name='citation', values=citation_id, type='list_of_string')
 
@@ -306,170 +1207,218 @@ valid_cx_data_types = ['boolean', 'byte', 'char', 'double', 'float', 'integer',
  'list_of_short','list_of_string']
 
 
+_VALID_CX_DATA_TYPES = frozenset(valid_cx_data_types)
+
+
+def _get_column_raw(column_raw_temp):
+    """
+    Gets entry of ``property_columns`` as dict. Entries given as
+    ``<column>`` or ``<column>::<data type>`` are converted to a
+    dict with ``column_name``, ``attribute_name`` and ``data_type``
+
+    :param column_raw_temp: entry of ``property_columns``
+    :type column_raw_temp: str or dict
+    :return: entry as dict
+    :rtype: dict
+    """
+    if isinstance(column_raw_temp, dict):
+        return column_raw_temp
+    if '::' in column_raw_temp:
+        column_split = column_raw_temp.split('::')
+        return {
+            'column_name': column_split[0],
+            'attribute_name': column_split[0],
+            'data_type': column_split[1]
+        }
+    return {
+        'column_name': column_raw_temp,
+        'attribute_name': column_raw_temp
+    }
+
+
+class _PropertyColumn(object):
+    """
+    Entry of ``property_columns`` of loading plan normalized once so
+    values of the column can be converted to node or edge attributes
+    without looking up the settings of the column for every value
+    """
+    def __init__(self, column_raw_temp):
+        """
+        Constructor
+
+        :param column_raw_temp: entry of ``property_columns``
+        :type column_raw_temp: str or dict
+        """
+        column_raw = _get_column_raw(column_raw_temp)
+        self.column_raw = column_raw
+        self.column_name = column_raw.get('column_name')
+        self.attribute_name = column_raw.get('attribute_name') or self.column_name
+        self.data_type = column_raw.get('data_type')
+        self.delimiter = column_raw.get('delimiter')
+        self.value_prefix = column_raw.get('value_prefix')
+        self.default_value = column_raw.get('default_value')
+        self.list_data_type = None
+        if self.data_type:
+            self.data_type = str(self.data_type)
+            self.list_data_type = self.data_type
+            if not self.data_type.startswith('list'):
+                self.list_data_type = 'list_of_' + self.data_type
+
+    def _check_data_type(self):
+        """
+        :raises Exception: if ``data_type`` is not valid
+        """
+        if self.data_type not in _VALID_CX_DATA_TYPES:
+            raise Exception('data_type: ' + self.data_type + ' is not valid')
+
+    def _split(self, value):
+        return [entry.strip() for entry in value.split(self.delimiter)]
+
+    def _add_prefix(self, values):
+        return [self.value_prefix + ":" + str(value_item) for value_item in values]
+
+    def get_node_attribute(self, value):
+        """
+        Converts `value` of column to node attribute
+
+        :param value: value in column or None if row has no such column
+        :raises Exception: if ``data_type`` is not valid
+        :return: (name, value, data type), None if attribute is not set or
+                 :py:const:`_SKIP_REMAINING_ATTRIBUTES` if value could not be
+                 converted to ``data_type``
+        :rtype: tuple
+        """
+        type_temp = self.data_type
+
+        if (value is None) and self.default_value:
+            value = self.default_value
+
+        if not value:
+            return None
+        if self.delimiter:
+            if self.data_type:
+                self._check_data_type()
+                value = data_to_type(self._split(value), self.data_type)
+                type_temp = self.list_data_type
+            else:
+                if not isinstance(value, str):
+                    value = str(value)
+                value = self._split(value)
+                type_temp = 'list_of_string'
+
+            if self.value_prefix:
+                value = self._add_prefix(value)
+        else:
+            if self.data_type:
+                self._check_data_type()
+                value = data_to_type(value, self.data_type)
+                if value is None:
+                    return _SKIP_REMAINING_ATTRIBUTES
+
+            if self.value_prefix:
+                value = self.value_prefix + ":" + str(value)
+
+        return self.attribute_name, value, type_temp
+
+    def get_edge_attribute(self, value):
+        """
+        Converts `value` of column to edge attribute
+
+        :param value: value in column or None if row has no such column
+        :raises Exception: if ``data_type`` is not valid
+        :return: (name, value, data type) or None if attribute is not set
+        :rtype: tuple
+        """
+        type_temp = self.data_type
+
+        if pd.isnull(value) or value == 'None':
+            if self.default_value:
+                value = self.default_value
+            else:
+                return None
+
+        if value is None:
+            return None
+        if self.delimiter:
+            if self.data_type:
+                self._check_data_type()
+                value = data_to_type(self._split(value), self.data_type)
+                type_temp = self.list_data_type
+            else:
+                value = self._split(value)
+                type_temp = 'list_of_string'
+
+            if self.value_prefix:
+                value = self._add_prefix(value)
+        else:
+            if self.data_type:
+                self._check_data_type()
+                value = data_to_type(value, self.data_type)
+
+            if self.value_prefix:
+                value = self.value_prefix + ":" + str(value)
+
+        if value is None:
+            logger.debug('Value is None, skipping edge attribute'
+                         ' name => ' + str(self.column_raw) +
+                         ' type => ' + str(type_temp))
+            return None
+        return self.attribute_name, value, type_temp
+
+
+def _get_property_columns(plan):
+    """
+    Gets ``property_columns`` of node or edge `plan`, normalized
+    the first time they are requested. Changes made to the list of
+    ``property_columns`` after that are only seen if the list is replaced
+
+    :return: normalized columns
+    :rtype: list
+    """
+    property_columns = plan.get('property_columns')
+    if not property_columns:
+        return []
+    entry = _PROPERTY_COLUMNS_CACHE.get(id(property_columns))
+    # the cache keeps property_columns alive so its id is not reused
+    if entry is not None and entry[0] is property_columns:
+        return entry[1]
+    columns = [_PropertyColumn(c) for c in property_columns]
+    if len(_PROPERTY_COLUMNS_CACHE) >= _PROPERTY_COLUMNS_CACHE_SIZE:
+        _PROPERTY_COLUMNS_CACHE.clear()
+    _PROPERTY_COLUMNS_CACHE[id(property_columns)] = (property_columns, columns)
+    return columns
+
+
 def add_node_attributes(nice_cx_builder, node_element, load_plan, row):
     if load_plan.get('property_columns'):
-        for column_raw_temp in load_plan['property_columns']:
-            if isinstance(column_raw_temp, dict):
-                column_raw = column_raw_temp
-            else:
-                if '::' in column_raw_temp:
-                    column_split = column_raw_temp.split('::')
-                    if len(column_split) > 1:
-                        column_raw = {
-                            'column_name': column_split[0],
-                            'attribute_name': column_split[0],
-                            'data_type': column_split[1]
-                        }
-                    else:
-                        column_raw = {
-                            'column_name': column_raw_temp,
-                            'attribute_name': column_raw_temp
-                        }
-                else:
-                    column_raw = {
-                        'column_name': column_raw_temp,
-                        'attribute_name': column_raw_temp
-                    }
-
-            type_temp = column_raw.get('data_type')
+        for column in _get_property_columns(load_plan):
             value = None
 
-            if column_raw.get('column_name'):
-                value = row.get(column_raw['column_name'])
-
-            if (value is None) and column_raw.get('default_value'):
-                value = column_raw['default_value']
-
-            if value:
-                if column_raw.get('delimiter'):
-                    if column_raw.get('data_type'):
-                        if column_raw['data_type'] not in valid_cx_data_types:
-                            raise Exception('data_type: ' + column_raw['data_type'] + ' is not valid')
-                        value = value.split(column_raw.get('delimiter'))
-                        value = [entry.strip() for entry in value]
-                        value = data_to_type(value, column_raw['data_type'])
-                        if not type_temp.startswith('list'):
-                            type_temp = 'list_of_' + type_temp
-                    else:
-                        if not isinstance(value, str):
-                            value = str(value)
-                        value = value.split(column_raw.get('delimiter'))
-                        value = [entry.strip() for entry in value]
-                        type_temp = 'list_of_string'
-
-                    if column_raw.get('value_prefix'):
-                        value_list_temp = []
-                        for value_item in value:
-                            value_temp = column_raw.get('value_prefix') + ":" + str(value_item)
-                            value_list_temp.append(value_temp)
-                        value = value_list_temp
-                else:
-                    if column_raw.get('data_type'):
-                        if column_raw['data_type'] not in valid_cx_data_types:
-                            raise Exception('data_type: ' + column_raw['data_type'] + ' is not valid')
-
-                        value = data_to_type(value, column_raw['data_type'])
-                        if value is None:
-                            return ''
-
-                    if column_raw.get('value_prefix'):
-                        value = column_raw.get('value_prefix') + ":" + str(value)
-
-                if column_raw.get('attribute_name'):
-                    nice_cx_builder.add_node_attribute(node_element, column_raw['attribute_name'], value, type=type_temp)
-                else:
-                    nice_cx_builder.add_node_attribute(node_element, column_raw['column_name'], value, type=type_temp)
+            if column.column_name:
+                value = row.get(column.column_name)
+
+            attribute = column.get_node_attribute(value)
+            if attribute is None:
+                continue
+            if attribute is _SKIP_REMAINING_ATTRIBUTES:
+                return ''
+            nice_cx_builder.add_node_attribute(node_element, attribute[0], attribute[1],
+                                               type=attribute[2])
 
 
 def add_edge_attributes(nice_cx_builder, edge_id, load_plan, row):
     if load_plan.get('property_columns'):
-        for column_raw_temp in load_plan['property_columns']:
-            if isinstance(column_raw_temp, dict):
-                column_raw = column_raw_temp
-            else:
-                if '::' in column_raw_temp:
-                    column_split = column_raw_temp.split('::')
-                    if len(column_split) > 1:
-                        column_raw = {
-                            'column_name': column_split[0],
-                            'attribute_name': column_split[0],
-                            'data_type': column_split[1]
-                        }
-                    else:
-                        column_raw = {
-                            'column_name': column_raw_temp,
-                            'attribute_name': column_raw_temp
-                        }
-                else:
-                    column_raw = {
-                        'column_name': column_raw_temp,
-                        'attribute_name': column_raw_temp
-                    }
-
-            type_temp = column_raw.get('data_type')
-
+        for column in _get_property_columns(load_plan):
             value = None
 
-            if column_raw.get('column_name'):
-                value = row.get(column_raw['column_name'])
-
-            if pd.isnull(value) or value == 'None':
-                if column_raw.get('default_value'):
-                    value = column_raw['default_value']
-                else:
-                    continue
-
-            if value is not None:
-                dt = None
-
-                if column_raw.get('delimiter'):
-                    if column_raw.get('data_type'):
-                        dt = str(column_raw.get('data_type'))
-                        if dt not in valid_cx_data_types:
-                            raise Exception('data_type: ' + dt + ' is not valid')
-
-                        value = value.split(column_raw.get('delimiter'))
-                        value = [entry.strip() for entry in value]
-                        value = data_to_type(value, dt)
-                        if not type_temp.startswith('list'):
-                            type_temp = 'list_of_' + type_temp
-                    else:
-                        value = value.split(column_raw.get('delimiter'))
-                        value = [entry.strip() for entry in value]
-                        type_temp = 'list_of_string'
-
-                    if column_raw.get('value_prefix'):
-                        value_list_temp = []
-                        for value_item in value:
-                            value_temp = column_raw.get('value_prefix') + ":" + str(value_item)
-                            value_list_temp.append(value_temp)
-                        value = value_list_temp
-                else:
-                    if column_raw.get('data_type'):
-                        dt = str(column_raw.get('data_type'))
-                        if dt not in valid_cx_data_types:
-                            raise Exception('data_type: ' + dt + ' is not valid')
-
-                        value = data_to_type(value, dt)
-
-                    if column_raw.get('value_prefix'):
-                        value = column_raw.get('value_prefix') + ":" + str(value)
+            if column.column_name:
+                value = row.get(column.column_name)
 
-                if value is None:
-                    logger.debug('Value is None, skipping edge attribute'
-                                 'edge id => ' + str(edge_id) +
-                                 ' name => ' + str(column_raw) +
-                                 ' values => ' + str(value) +
-                                 ' type => ' + str(type_temp))
-
-                    continue
-
-                if column_raw.get('attribute_name'):
-                    nice_cx_builder.add_edge_attribute(property_of=edge_id, name=column_raw['attribute_name'],
-                                                       values=value, type=type_temp)
-                else:
-                    nice_cx_builder.add_edge_attribute(property_of=edge_id, name=column_raw['column_name'],
-                                                       values=value, type=type_temp)
+            attribute = column.get_edge_attribute(value)
+            if attribute is None:
+                continue
+            nice_cx_builder.add_edge_attribute(property_of=edge_id, name=attribute[0],
+                                               values=attribute[1], type=attribute[2])
 
 
 def data_to_type(data, data_type):
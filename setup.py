@@ -87,7 +87,10 @@ setup(
         'ijson',
         'tqdm'
     ],
-    extra_requires={'cytoscape': ['py4cytoscape']},
+    extra_requires={'cytoscape': ['py4cytoscape'],
+                    'orjson': ['orjson'],
+                    'arrow': ['pyarrow'],
+                    'zstd': ['zstandard']},
     scripts=['ndexutil/ndexmisctools.py' ],
     test_suite='tests',
     test_requires=[
@@ -8,6 +8,10 @@ import shutil
 import os
 import unittest
 import json
+import io
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
 from unittest.mock import MagicMock
 from unittest import mock
 import requests
@@ -16,6 +20,57 @@ import requests_mock
 from ndexutil.ndex import NDExExtraUtils
 from ndexutil.exceptions import NDExUtilError
 from ndex2.nice_cx_network import NiceCXNetwork
+from ndex2.client import Ndex2
+
+
+class _ChunkedUploadHandler(BaseHTTPRequestHandler):
+    """
+    Stand in for NDEx server that records chunked multipart uploads
+    """
+    def _handle_upload(self):
+        self.server.requests.append({'method': self.command,
+                                     'path': self.path,
+                                     'headers': dict(self.headers)})
+        body = b''
+        try:
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunk = self.rfile.read(size)
+                self.rfile.readline()
+                if size == 0:
+                    break
+                body += chunk
+        except ValueError:
+            # client aborted upload mid transfer
+            self.server.requests[-1]['aborted'] = True
+            return
+        boundary = self.headers['Content-Type'].split('boundary=')[1]
+        part = body.split(b'--' + boundary.encode('utf-8'))[1]
+        self.server.requests[-1]['cx'] = part[part.index(b'\r\n\r\n') +
+                                              4:-2]
+        self.send_response(self.server.status)
+        self.end_headers()
+        self.wfile.write(b'http://127.0.0.1/v2/network/1234')
+
+    do_POST = _handle_upload
+    do_PUT = _handle_upload
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ErrorStream(object):
+    """
+    Stream that returns some data and then raises an error
+    """
+    def __init__(self):
+        self._reads = 0
+
+    def read(self, size=-1):
+        self._reads += 1
+        if self._reads == 1:
+            return b'[{"partial'
+        raise NDExUtilError('generation failed')
 
 
 class TestNDExExtraUtils(unittest.TestCase):
@@ -283,3 +338,83 @@ class TestNDExExtraUtils(unittest.TestCase):
         finally:
             shutil.rmtree(temp_dir)
 
+    def _start_upload_server(self, status=200):
+        server = HTTPServer(('127.0.0.1', 0), _ChunkedUploadHandler)
+        server.requests = []
+        server.status = status
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = Ndex2('http://127.0.0.1:' + str(server.server_port),
+                       username='bob', password='smith',
+                       skip_version_check=True)
+        return server, client
+
+    def test_upload_cx_stream_chunked_invalid_args(self):
+        util = NDExExtraUtils()
+        try:
+            util.upload_cx_stream_chunked(client=None,
+                                          cx_stream=io.BytesIO())
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as e:
+            self.assertEqual('NDEx client is None', str(e))
+        try:
+            util.upload_cx_stream_chunked(client=MagicMock(),
+                                          cx_stream=None)
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as e:
+            self.assertEqual('cx_stream is None', str(e))
+
+    def test_upload_cx_stream_chunked_new_and_update(self):
+        server, client = self._start_upload_server()
+        try:
+            util = NDExExtraUtils()
+            cx = b'[{"numberVerification": [{"longNumber": 281474976710655}]}]'
+            res = util.upload_cx_stream_chunked(client=client,
+                                                cx_stream=io.BytesIO(cx),
+                                                chunk_size=7)
+            self.assertEqual('http://127.0.0.1/v2/network/1234', res)
+            res = util.upload_cx_stream_chunked(client=client,
+                                                cx_stream=io.BytesIO(cx),
+                                                networkid='1234')
+            self.assertEqual(2, len(server.requests))
+            self.assertEqual('POST', server.requests[0]['method'])
+            self.assertEqual('/v2/network', server.requests[0]['path'])
+            self.assertEqual('PUT', server.requests[1]['method'])
+            self.assertEqual('/v2/network/1234', server.requests[1]['path'])
+            for req in server.requests:
+                self.assertEqual(cx, req['cx'])
+                self.assertEqual('chunked',
+                                 req['headers']['Transfer-Encoding'])
+                self.assertTrue(req['headers']['Authorization'].
+                                startswith('Basic '))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_upload_cx_stream_chunked_http_error(self):
+        server, client = self._start_upload_server(status=401)
+        try:
+            util = NDExExtraUtils()
+            util.upload_cx_stream_chunked(client=client,
+                                          cx_stream=io.BytesIO(b'[]'))
+            self.fail('Expected HTTPError')
+        except requests.exceptions.HTTPError as he:
+            self.assertTrue('401 Client Error' in str(he))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_upload_cx_stream_chunked_stream_error_aborts(self):
+        server, client = self._start_upload_server()
+        try:
+            util = NDExExtraUtils()
+            util.upload_cx_stream_chunked(client=client,
+                                          cx_stream=_ErrorStream())
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as e:
+            self.assertEqual('generation failed', str(e))
+        finally:
+            server.shutdown()
+            server.server_close()
+        for req in server.requests:
+            self.assertTrue('cx' not in req)
@@ -7,16 +7,22 @@ import tempfile
 import shutil
 import os
 import uuid
+import gzip
+import io
 import json
 from json.decoder import JSONDecodeError
 from requests.exceptions import HTTPError
 import unittest
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
 import ndex2
 from ndexutil.exceptions import ConfigError
 from ndexutil.exceptions import NDExUtilError
 from ndexutil.ndexmisctools import TSVLoader
+from ndexutil import ndexmisctools
+from ndexutil.tsv import nodetable
+from ndexutil.tsv import edgetable
 from ndexutil.config import NDExUtilConfig
 
 
@@ -39,6 +45,25 @@ class TestTSVLoader(unittest.TestCase):
         p.password = 'password'
         p.server = 'ndex'
         p.layout = None
+        p.nodecheck = 'full'
+        p.nodetable = 'memory'
+        p.nodetablecachesize = nodetable.DEFAULT_CACHE_SIZE
+        p.edgetable = 'memory'
+        p.edgetablecachesize = edgetable.DEFAULT_CACHE_SIZE
+        p.workers = 1
+        p.encoder = 'json'
+        p.backgroundwriter = False
+        p.delimiter = '\\t'
+        p.quotechar = '"'
+        p.compressoutput = None
+        p.streamupload = False
+        p.checkpointdir = None
+        p.resume = False
+        p.checkpointinterval = 10
+        p.batchsize = 20000
+        p.maxbatchbytes = None
+        p.scanonly = False
+        p.scanmaxrows = None
         return p
 
     def setUp(self):
@@ -49,6 +74,13 @@ class TestTSVLoader(unittest.TestCase):
         """Tear down test fixtures, if any."""
         pass
 
+    def test_nodetablecachesize_default_same_as_node_table(self):
+        args = ndexmisctools._parse_arguments('desc', ['tsvloader', 'bob',
+                                                       'password', 'ndex',
+                                                       'f.tsv', 'plan.json'])
+        self.assertEqual(nodetable.DEFAULT_CACHE_SIZE, args.nodetablecachesize)
+        self.assertEqual(edgetable.DEFAULT_CACHE_SIZE, args.edgetablecachesize)
+
     def test_parse_config_no_credentials_needed_from_configfile(self):
         temp_dir = tempfile.mkdtemp()
         try:
@@ -409,7 +441,17 @@ class TestTSVLoader(unittest.TestCase):
         p.uppercaseheader = False
         p.header = None
         loader = TSVLoader(p)
-        self.assertEqual(p.tsv_file, loader._get_tsvfile())
+        self.assertEqual([p.tsv_file], loader._get_tsvfile())
+
+        # glob patterns are expanded
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsvfile = os.path.join(temp_dir, 'part-1.tsv')
+            open(tsvfile, 'w').close()
+            p.tsv_file = [os.path.join(temp_dir, 'part-*.tsv')]
+            self.assertEqual([tsvfile], loader._get_tsvfile())
+        finally:
+            shutil.rmtree(temp_dir)
 
     def test_get_tsvfile_header_is_set(self):
         temp_dir = tempfile.mkdtemp()
@@ -459,6 +501,369 @@ class TestTSVLoader(unittest.TestCase):
         finally:
             shutil.rmtree(temp_dir)
 
+    def test_get_node_table(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self.get_dummy_params()
+            loader = TSVLoader(p)
+            loader._tmpdir = temp_dir
+            self.assertEqual(None, loader._get_node_table())
+            p.nodetable = TSVLoader.DISK_NODE_TABLE
+            table = loader._get_node_table()
+            try:
+                self.assertTrue(os.path.isfile(os.path.join(temp_dir,
+                                                            'nodetable.sqlite')))
+            finally:
+                table.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_edge_table(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self.get_dummy_params()
+            loader = TSVLoader(p)
+            loader._tmpdir = temp_dir
+            self.assertEqual(None, loader._get_edge_table())
+            p.edgetable = TSVLoader.DISK_EDGE_TABLE
+            table = loader._get_edge_table()
+            try:
+                self.assertTrue(os.path.isfile(os.path.join(temp_dir,
+                                                            'edgetable.sqlite')))
+            finally:
+                table.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_delimiter_and_quotechar(self):
+        p = self.get_dummy_params()
+        loader = TSVLoader(p)
+        self.assertEqual('\t', loader._get_delimiter())
+        self.assertEqual('"', loader._get_quotechar())
+        p.delimiter = ','
+        p.quotechar = 'None'
+        self.assertEqual(',', loader._get_delimiter())
+        self.assertEqual(None, loader._get_quotechar())
+
+    def test_run_with_compressed_input_and_output(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.join(os.path.dirname(__file__), 'tsv')
+            p = self.get_dummy_params()
+            p.tsv_file = os.path.join(temp_dir, 'ctd.tsv.gz')
+            with open(os.path.join(here, 'ctd_test.tsv'), 'rb') as f:
+                with gzip.open(p.tsv_file, 'wb') as out:
+                    shutil.copyfileobj(f, out)
+            p.load_plan = os.path.join(here, 'ctd-gene-disease-2019-'
+                                             'norm-plan-collapsed.json')
+            p.t = None
+            p.u = None
+            p.header = None
+            p.uppercaseheader = False
+            p.name = 'new name'
+            p.description = None
+            p.copyattribs = False
+            p.tmpdir = temp_dir
+            p.outputcx = os.path.join(temp_dir, 'my.cx')
+            p.skipupload = True
+            p.compressoutput = 'gzip'
+            loader = TSVLoader(p, altclient=MagicMock())
+            self.assertEqual(0, loader.run())
+            net = ndex2.create_nice_cx_from_file(p.outputcx)
+            self.assertEqual('new name', net.get_name())
+            self.assertEqual(49, len(net.edges))
+            self.assertEqual(50, len(net.nodes))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_cx_output_compression(self):
+        p = self.get_dummy_params()
+        loader = TSVLoader(p)
+        self.assertEqual(None, loader._get_cx_output_compression())
+        p.compressoutput = 'gzip'
+        self.assertEqual('gzip', loader._get_cx_output_compression())
+        p.layout = '-'
+        self.assertEqual(None, loader._get_cx_output_compression())
+
+    def test_use_stream_upload(self):
+        p = self.get_dummy_params()
+        p.outputcx = None
+        p.skipupload = False
+        loader = TSVLoader(p)
+        self.assertFalse(loader._use_stream_upload())
+        p.streamupload = True
+        self.assertTrue(loader._use_stream_upload())
+        p.skipupload = True
+        self.assertFalse(loader._use_stream_upload())
+        p.skipupload = False
+        p.outputcx = 'foo.cx'
+        self.assertFalse(loader._use_stream_upload())
+        p.outputcx = None
+        p.layout = '-'
+        self.assertFalse(loader._use_stream_upload())
+
+    def _get_stream_upload_params(self, temp_dir):
+        here = os.path.join(os.path.dirname(__file__), 'tsv')
+        p = self.get_dummy_params()
+        p.tsv_file = os.path.join(here, 'ctd_test.tsv')
+        p.load_plan = os.path.join(here, 'ctd-gene-disease-2019-'
+                                         'norm-plan-collapsed.json')
+        p.t = None
+        p.u = None
+        p.header = None
+        p.uppercaseheader = False
+        p.name = 'new name'
+        p.description = None
+        p.copyattribs = False
+        p.tmpdir = temp_dir
+        p.outputcx = None
+        p.skipupload = False
+        p.streamupload = True
+        return p
+
+    def test_run_with_stream_upload(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self._get_stream_upload_params(temp_dir)
+            p.nodetable = 'disk'
+            uploaded = []
+
+            def _upload(client=None, cx_stream=None, networkid=None):
+                while True:
+                    chunk = cx_stream.read(10)
+                    if not chunk:
+                        break
+                    uploaded.append(chunk)
+                return 'http://foo/v2/network/1234'
+
+            mockextra = MagicMock()
+            mockextra.upload_cx_stream_chunked = MagicMock(side_effect=_upload)
+            mockclient = MagicMock()
+            loader = TSVLoader(p, altclient=mockclient, ndexextra=mockextra)
+            self.assertEqual(0, loader.run())
+            mockclient.save_cx_stream_as_new_network.assert_not_called()
+            self.assertEqual(None, mockextra.upload_cx_stream_chunked.
+                             call_args[1]['networkid'])
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(b''.join(uploaded)))
+            self.assertEqual('new name', net.get_name())
+            self.assertEqual(49, len(net.edges))
+            self.assertEqual(50, len(net.nodes))
+            self.assertFalse(os.path.isdir(temp_dir) and
+                             len(os.listdir(temp_dir)) > 0)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_stream_upload_http_error(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self._get_stream_upload_params(temp_dir)
+            p.u = '1234'
+            mockextra = MagicMock()
+            mockextra.upload_cx_stream_chunked =\
+                MagicMock(side_effect=HTTPError('401 Client Error'))
+            loader = TSVLoader(p, altclient=MagicMock(), ndexextra=mockextra)
+            self.assertEqual(2, loader.run())
+            self.assertEqual('1234', mockextra.upload_cx_stream_chunked.
+                             call_args[1]['networkid'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_stream_upload_generation_fails(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self._get_stream_upload_params(temp_dir)
+
+            def _upload(client=None, cx_stream=None, networkid=None):
+                while cx_stream.read(10):
+                    pass
+                self.fail('Expected NDExUtilError')
+
+            mocktsvloader = MagicMock()
+            mocktsvloader.write_cx_network =\
+                MagicMock(side_effect=NDExUtilError('bad row'))
+            mockfac = MagicMock()
+            mockfac.get_tsv_streamloader = MagicMock(return_value=mocktsvloader)
+            mockextra = MagicMock()
+            mockextra.upload_cx_stream_chunked = MagicMock(side_effect=_upload)
+            loader = TSVLoader(p, altclient=MagicMock(),
+                               streamtsvfac=mockfac, ndexextra=mockextra)
+            try:
+                loader.run()
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as e:
+                self.assertEqual('Unable to generate CX: bad row', str(e))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_resume_requires_checkpointdir(self):
+        p = self.get_dummy_params()
+        p.resume = True
+        loader = TSVLoader(p, altclient=MagicMock())
+        try:
+            loader.run()
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('--resume requires --checkpointdir', str(ne))
+
+    def test_run_with_checkpoint_and_resume(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.join(os.path.dirname(__file__), 'tsv')
+            with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                lines = f.readlines()
+            p = self._get_stream_upload_params(temp_dir)
+            p.streamupload = False
+            p.compressoutput = 'gzip'
+            p.checkpointdir = os.path.join(temp_dir, 'checkpoint')
+            p.batchsize = 5
+            p.checkpointinterval = 2
+            p.tsv_file = os.path.join(temp_dir, 'input.tsv')
+
+            # fail load by adding row with mismatched node
+            bad_row = lines[-1].split('\t')
+            bad_row[0] = 'bad'
+            with open(p.tsv_file, 'w') as f:
+                f.writelines(lines + ['\t'.join(bad_row)])
+            mockclient = MagicMock()
+            loader = TSVLoader(p, altclient=mockclient)
+            try:
+                loader.run()
+                self.fail('Expected RuntimeError')
+            except RuntimeError:
+                pass
+            checkpoint_file = os.path.join(p.checkpointdir,
+                                           TSVLoader.CHECKPOINT_FILE)
+            self.assertTrue(os.path.isfile(checkpoint_file))
+            self.assertTrue(os.path.isfile(os.path.join(p.checkpointdir,
+                                                        'tsvloader.cx')))
+            with open(checkpoint_file, 'r') as f:
+                self.assertEqual(40, json.load(f)['lines'])
+
+            # fix input and resume
+            with open(p.tsv_file, 'w') as f:
+                f.writelines(lines)
+            uploaded = []
+
+            def _save(cx_stream):
+                uploaded.append(cx_stream.read())
+                return 'http://foo/v2/network/1234'
+
+            mockclient.save_cx_stream_as_new_network =\
+                MagicMock(side_effect=_save)
+            p.resume = True
+            loader = TSVLoader(p, altclient=mockclient)
+            self.assertEqual(0, loader.run())
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(uploaded[0]))
+            self.assertEqual(49, len(net.edges))
+            self.assertEqual(50, len(net.nodes))
+            self.assertEqual([], os.listdir(p.checkpointdir))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_expand_tsvfiles(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for name in ['part-2.tsv', 'part-1.tsv', 'other.tsv']:
+                open(os.path.join(temp_dir, name), 'w').close()
+            p = self.get_dummy_params()
+            p.tsv_file = 'foo.tsv'
+            loader = TSVLoader(p)
+            self.assertEqual(['foo.tsv'], loader._expand_tsvfiles())
+            p.tsv_file = ['foo.tsv', os.path.join(temp_dir, 'part-*.tsv')]
+            self.assertEqual(['foo.tsv',
+                              os.path.join(temp_dir, 'part-1.tsv'),
+                              os.path.join(temp_dir, 'part-2.tsv')],
+                             loader._expand_tsvfiles())
+            p.tsv_file = [os.path.join(temp_dir, 'x?.tsv')]
+            try:
+                loader._expand_tsvfiles()
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertTrue('No files match' in str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_tsvfile_uppercaseheader_multiple_files(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            p = self.get_dummy_params()
+            p.tsv_file = []
+            for name, data in [('a.tsv', 'myheader\nhello'),
+                               ('b.tsv', 'myheader\nbye\n')]:
+                p.tsv_file.append(os.path.join(temp_dir, name))
+                with open(p.tsv_file[-1], 'w') as f:
+                    f.write(data)
+            p.header = None
+            p.uppercaseheader = True
+            loader = TSVLoader(p)
+            loader._tmpdir = temp_dir
+            tmptsv = os.path.join(temp_dir, 'temp.tsv')
+            self.assertEqual([tmptsv], loader._get_tsvfiles())
+            with open(tmptsv, 'r') as f:
+                self.assertEqual('MYHEADER\nhello\nbye\n', f.read())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_multiple_tsv_files(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.join(os.path.dirname(__file__), 'tsv')
+            with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                lines = f.readlines()
+            p = self._get_stream_upload_params(temp_dir)
+            p.streamupload = False
+            p.skipupload = True
+            p.outputcx = os.path.join(temp_dir, 'my.cx')
+            p.tsv_file = [os.path.join(temp_dir, 'part-*.tsv.gz')]
+            for i in range(5):
+                with gzip.open(os.path.join(temp_dir, 'part-' + str(i) +
+                                            '.tsv.gz'), 'wt') as f:
+                    f.writelines([lines[0]] + lines[1 + i * 10:11 + i * 10])
+            loader = TSVLoader(p, altclient=MagicMock())
+            self.assertEqual(0, loader.run())
+            net = ndex2.create_nice_cx_from_file(p.outputcx)
+            self.assertEqual(49, len(net.edges))
+            self.assertEqual(50, len(net.nodes))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_run_with_scanonly(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.join(os.path.dirname(__file__), 'tsv')
+            with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                lines = f.readlines()
+            p = self._get_stream_upload_params(temp_dir)
+            p.streamupload = False
+            p.scanonly = True
+            p.tsv_file = [os.path.join(temp_dir, 'bad.tsv')]
+            bad_row = lines[5].split('\t')
+            bad_row[6] = 'notanumber'
+            with open(p.tsv_file[0], 'w') as f:
+                f.writelines(lines[:5] + ['\t'.join(bad_row)] + lines[6:])
+
+            mockclient = MagicMock()
+            loader = TSVLoader(p, altclient=mockclient)
+            with patch('sys.stdout', new_callable=io.StringIO) as out:
+                self.assertEqual(1, loader.run())
+            report = json.loads(out.getvalue())
+            self.assertEqual(len(lines) - 1, report['rows'])
+            self.assertEqual(1, report['error_count'])
+            self.assertEqual(6, report['errors'][0]['line'])
+            self.assertEqual([], mockclient.method_calls)
+
+            p.tsv_file = [os.path.join(here, 'ctd_test.tsv')]
+            p.scanmaxrows = 10
+            loader = TSVLoader(p, altclient=mockclient)
+            with patch('sys.stdout', new_callable=io.StringIO) as out:
+                self.assertEqual(0, loader.run())
+            report = json.loads(out.getvalue())
+            self.assertEqual(10, report['rows'])
+            self.assertFalse(report['complete'])
+            self.assertEqual(10, report['edges'])
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_mock_run_success(self):
         temp_dir = tempfile.mkdtemp()
         try:
@@ -494,6 +899,8 @@ class TestTSVLoader(unittest.TestCase):
             mockfac.get_tsv_streamloader.assert_called_once()
             self.assertEqual('plan',
                              mockfac.get_tsv_streamloader.call_args[0][0])
+            self.assertEqual('full',
+                             mockfac.get_tsv_streamloader.call_args[1]['node_check'])
             mocktsvloader.write_cx_network.assert_called_once()
             n_a = mocktsvloader.write_cx_network.call_args[1]
             self.assertTrue({'n': 'name',
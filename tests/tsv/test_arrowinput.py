@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `arrowinput` module."""
+
+import tempfile
+import shutil
+import os
+import io
+import unittest
+from ndexutil.tsv import arrowinput
+from ndexutil.tsv.arrowinput import ArrowInput
+from ndexutil.exceptions import NDExUtilError
+
+if arrowinput.PYARROW_LOADED:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+
+@unittest.skipUnless(arrowinput.PYARROW_LOADED, 'pyarrow is not installed')
+class TestArrowInput(unittest.TestCase):
+    """
+    Tests arrowinput.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def _get_table(self):
+        return pyarrow.table({'name': ['a', 'b', None],
+                              'id': pyarrow.array([1, 0, 3], pyarrow.int64()),
+                              'score': [1.5, 0.0, None],
+                              'flag': [True, False, None],
+                              'kind': pyarrow.array(['x', 'y', 'x']).dictionary_encode(),
+                              'tags': [['p', 'q'], [], None]})
+
+    def test_get_input_format(self):
+        self.assertEqual(arrowinput.PARQUET_FORMAT,
+                         arrowinput.get_input_format('/foo/x.Parquet'))
+        self.assertEqual(arrowinput.ARROW_FORMAT,
+                         arrowinput.get_input_format('x.feather'))
+        self.assertEqual(None, arrowinput.get_input_format('x.tsv'))
+        self.assertEqual(None, arrowinput.get_input_format(io.BytesIO()))
+
+    def test_constructor_invalid_args(self):
+        for kwargs, message in [({}, 'Unsupported input_format None for x.tsv'),
+                                ({'input_format': 'foo'},
+                                 'Unsupported input_format foo for x.tsv'),
+                                ({'input_format': 'arrow', 'batch_size': 0},
+                                 'batch_size must be 1 or larger')]:
+            try:
+                ArrowInput('x.tsv', **kwargs)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual(message, str(ne))
+
+    def test_read_rows_parquet(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, 'x.parquet')
+            pyarrow.parquet.write_table(self._get_table(), path)
+            arrow_input = ArrowInput(path, batch_size=2)
+            self.assertEqual(['name', 'id', 'score', 'flag', 'kind', 'tags'],
+                             arrow_input.get_column_names())
+
+            # everything but strings is converted to strings by default
+            self.assertEqual([('a', '1', '1.5', 'true', 'x'),
+                              ('b', '0', '0', 'false', 'y'),
+                              (None, '3', None, None, 'x')],
+                             list(arrow_input.read_rows(['name', 'id', 'score',
+                                                         'flag', 'kind'])))
+
+            # columns whose type fits the plan keep their type
+            data_types = {'id': {'long', 'double'}, 'score': {'double'},
+                          'flag': {'boolean'}, 'kind': {'string'},
+                          'tags': {'list_of_string'}}
+            self.assertEqual([(1, 1.5, True, 'x', ['p', 'q']),
+                              (0, 0.0, False, 'y', []),
+                              (3, None, None, 'x', None)],
+                             list(arrow_input.read_rows(['id', 'score', 'flag',
+                                                         'kind', 'tags'],
+                                                        data_types)))
+            # integer values do not fit string or double values long
+            self.assertEqual([('1', '1.5')],
+                             list(arrow_input.read_rows(['id', 'score'],
+                                                        {'id': {'long', 'string'},
+                                                         'score': {'long'}}))[:1])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_read_rows_arrow_file_and_stream(self):
+        table = self._get_table()
+        for new_writer in [pyarrow.ipc.new_file, pyarrow.ipc.new_stream]:
+            sink = io.BytesIO()
+            with new_writer(sink, table.schema) as writer:
+                writer.write_table(table)
+            arrow_input = ArrowInput(io.BytesIO(sink.getvalue()),
+                                     input_format=arrowinput.ARROW_FORMAT,
+                                     batch_size=1)
+            self.assertEqual([('1', 'a'), ('0', 'b'), ('3', None)],
+                             list(arrow_input.read_rows(['id', 'name'])))
+            self.assertEqual(3, len(list(arrow_input.read_rows([]))))
+
+    def test_read_rows_list_to_string(self):
+        sink = io.BytesIO()
+        pyarrow.parquet.write_table(self._get_table(), sink)
+        arrow_input = ArrowInput(sink, input_format=arrowinput.PARQUET_FORMAT)
+        try:
+            list(arrow_input.read_rows(['tags']))
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('Values of column tags of type list<element: '
+                            'string> cannot be converted' in str(ne))
+
+    def test_duplicate_column_names(self):
+        table = pyarrow.Table.from_arrays([pyarrow.array(['a']),
+                                           pyarrow.array(['b'])],
+                                          names=['x', 'x'])
+        sink = io.BytesIO()
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        try:
+            ArrowInput(sink, input_format=arrowinput.ARROW_FORMAT).get_column_names()
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('are not unique' in str(ne))
+
+
+if __name__ == '__main__':
+    unittest.main()
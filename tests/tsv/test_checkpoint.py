@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `checkpoint` module."""
+
+import tempfile
+import shutil
+import os
+import io
+import json
+import unittest
+from ndexutil.tsv.checkpoint import TSVLoaderCheckpoint
+from ndexutil.tsv.nodetable import InMemoryNodeTable
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Tests checkpoint.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def test_constructor_none_checkpoint_file(self):
+        try:
+            TSVLoaderCheckpoint(None)
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('checkpoint_file is None', str(ne))
+
+    def test_load_no_checkpoint(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cp_file = os.path.join(temp_dir, 'cp.json')
+            checkpoint = TSVLoaderCheckpoint(cp_file)
+            self.assertEqual(cp_file, checkpoint.get_checkpoint_file())
+            self.assertEqual(cp_file + '.nodes',
+                             checkpoint.get_node_log_file())
+            self.assertEqual(None, checkpoint.load())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_save_load_and_restore(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cp_file = os.path.join(temp_dir, 'cp.json')
+            checkpoint = TSVLoaderCheckpoint(cp_file)
+            checkpoint.start()
+            out = io.BytesIO()
+            out.write(b'hello')
+            checkpoint.save({'lines': 1}, [('a', 0), ('b', 1)], out)
+            checkpoint.close()
+
+            checkpoint.start(resume=True)
+            out.write(b'world')
+            checkpoint.save({'lines': 2}, [('c', (2, b'x'))], out)
+            with open(cp_file, 'r') as f:
+                saved = f.read()
+            # simulate failure after node log was appended to
+            # but before checkpoint file was replaced
+            checkpoint.save({'lines': 3}, [('d', 3)], out)
+            checkpoint.close()
+            with open(cp_file, 'w') as f:
+                f.write(saved)
+
+            state = checkpoint.load()
+            self.assertEqual(2, state['lines'])
+            self.assertEqual(1, state['version'])
+            self.assertEqual(10, state['output_offset'])
+            table = InMemoryNodeTable()
+            self.assertEqual(3, checkpoint.restore_node_table(table, state))
+            self.assertEqual({'a': 0, 'b': 1, 'c': (2, b'x')}, table)
+            self.assertEqual(state['node_log_size'],
+                             os.path.getsize(checkpoint.get_node_log_file()))
+
+            checkpoint.remove()
+            self.assertFalse(os.path.isfile(cp_file))
+            self.assertFalse(os.path.isfile(checkpoint.get_node_log_file()))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_start_without_resume_deletes_checkpoint(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cp_file = os.path.join(temp_dir, 'cp.json')
+            checkpoint = TSVLoaderCheckpoint(cp_file)
+            checkpoint.start()
+            checkpoint.save({'lines': 1}, [('a', 0)], io.BytesIO(b'hello'))
+            checkpoint.close()
+            self.assertEqual(1, checkpoint.load()['lines'])
+
+            # new load that fails before its first checkpoint
+            checkpoint.start(resume=False)
+            checkpoint.close()
+            self.assertEqual(None, checkpoint.load())
+            self.assertEqual(0, os.path.getsize(checkpoint.get_node_log_file()))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_load_invalid_checkpoint(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cp_file = os.path.join(temp_dir, 'cp.json')
+            checkpoint = TSVLoaderCheckpoint(cp_file)
+            with open(cp_file, 'w') as f:
+                json.dump({'version': 1}, f)
+            try:
+                checkpoint.load()
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertTrue('for checkpoint is missing' in str(ne))
+
+            with open(cp_file, 'w') as f:
+                json.dump({'version': 99}, f)
+            try:
+                checkpoint.load()
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertTrue('Unsupported checkpoint version 99' in
+                                str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `compression` module."""
+
+import tempfile
+import shutil
+import os
+import io
+import gc
+import gzip
+import unittest
+from ndexutil.tsv import compression
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestCompression(unittest.TestCase):
+    """
+    Tests compression.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def get_supported_compression_types(self):
+        res = [None, compression.GZIP, compression.BZIP2, compression.XZ]
+        if compression.ZSTANDARD_LOADED:
+            res.append(compression.ZSTD)
+        return res
+
+    def test_get_compression_from_filename(self):
+        self.assertEqual(None, compression.get_compression_from_filename(None))
+        self.assertEqual(None,
+                         compression.get_compression_from_filename('a.tsv'))
+        self.assertEqual(compression.GZIP,
+                         compression.get_compression_from_filename('a.TSV.GZ'))
+        self.assertEqual(compression.BZIP2,
+                         compression.get_compression_from_filename('a.bz2'))
+        self.assertEqual(compression.XZ,
+                         compression.get_compression_from_filename('a.xz'))
+        self.assertEqual(compression.ZSTD,
+                         compression.get_compression_from_filename('a.zst'))
+
+    def test_get_compression_from_header(self):
+        self.assertEqual(None, compression.get_compression_from_header(b''))
+        self.assertEqual(None,
+                         compression.get_compression_from_header(b'a\tb'))
+        self.assertEqual(compression.GZIP,
+                         compression.get_compression_from_header(b'\x1f\x8b\x08'))
+
+    def test_open_output_invalid_compression(self):
+        try:
+            compression.open_output('foo', compression='foo')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('Unsupported compression foo' in str(ne))
+
+    def test_open_input_invalid_mode(self):
+        try:
+            compression.open_input('foo', mode='w')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('mode must be rt or rb', str(ne))
+
+    def test_roundtrip(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            data = 'a\tb\nü\tc\n'
+            for ctype in self.get_supported_compression_types():
+                # extension is intentionally not set so
+                # detection relies on magic number
+                outfile = os.path.join(temp_dir, str(ctype))
+                with compression.open_output(outfile,
+                                             compression=ctype) as f:
+                    f.write(data.encode('utf-8'))
+                with compression.open_input(outfile) as f:
+                    self.assertEqual(data, f.read())
+                with compression.open_input(outfile, mode='rb') as f:
+                    self.assertEqual(data.encode('utf-8'), f.read())
+                with open(outfile, 'rb') as raw:
+                    stream = compression.get_decompressed_text_stream(raw)
+                    self.assertEqual('a\tb\n', stream.readline())
+                    stream.detach()
+                    self.assertFalse(raw.closed)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_decompressed_stream_not_peekable(self):
+        stream = compression.get_decompressed_stream(io.BytesIO(b'hello'))
+        self.assertEqual(b'hello', stream.read())
+
+    def test_get_decompressed_stream_leaves_stream_open(self):
+        for data in [b'hello', gzip.compress(b'hello')]:
+            binary_stream = io.BytesIO(data)
+            stream = compression.get_decompressed_stream(binary_stream)
+            self.assertEqual(b'hello', stream.read())
+            del stream
+            gc.collect()
+            self.assertFalse(binary_stream.closed)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `edgetable` module."""
+
+import tempfile
+import shutil
+import os
+import unittest
+from ndexutil.tsv.edgetable import merge_edge_attributes
+from ndexutil.tsv.edgetable import InMemoryEdgeTable
+from ndexutil.tsv.edgetable import SQLiteEdgeTable
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestEdgeTable(unittest.TestCase):
+    """
+    Tests edgetable.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def test_merge_edge_attributes(self):
+        merged = {}
+        merge_edge_attributes(merged, {'a': {'n': 'a', 'v': 'x'},
+                                       'b': {'n': 'b', 'v': 1.5,
+                                             'd': 'double'},
+                                       'c': {'n': 'c', 'v': ['1', '2', '1'],
+                                             'd': 'list_of_string'}})
+        merge_edge_attributes(merged, {'a': {'n': 'a', 'v': 'x'},
+                                       'c': {'n': 'c', 'v': ['3', '2'],
+                                             'd': 'list_of_string'},
+                                       'd': {'n': 'd', 'v': True,
+                                             'd': 'boolean'}})
+        merge_edge_attributes(merged, {'a': {'n': 'a', 'v': 'y'},
+                                       'b': {'n': 'b', 'v': 2.0,
+                                             'd': 'double'}})
+        self.assertEqual({'a': {'n': 'a', 'v': ['x', 'y'],
+                                'd': 'list_of_string'},
+                          'b': {'n': 'b', 'v': [1.5, 2.0],
+                                'd': 'list_of_double'},
+                          'c': {'n': 'c', 'v': ['1', '2', '3'],
+                                'd': 'list_of_string'},
+                          'd': {'n': 'd', 'v': [True],
+                                'd': 'list_of_boolean'}}, merged)
+
+    def test_merge_edge_attributes_seen_values(self):
+        merged = {}
+        seen_values = {}
+        for value in ['x', 'y', 'x', 1, True, 1.0, 'y', 'z']:
+            merge_edge_attributes(merged, {'a': {'n': 'a', 'v': value}},
+                                  seen_values)
+        self.assertEqual(['x', 'y', 1, 'z'], merged['a']['v'])
+        self.assertEqual({'x', 'y', 1, 'z'}, seen_values['a'])
+
+        # unhashable values are compared with merged values
+        merge_edge_attributes(merged, {'a': {'n': 'a', 'v': [['p'], 'q', ['p'], 'x'],
+                                             'd': 'list_of_string'}},
+                              seen_values)
+        self.assertEqual(['x', 'y', 1, 'z', ['p'], 'q'], merged['a']['v'])
+
+        # without seen values they are created from merged values
+        merge_edge_attributes(merged, {'a': {'n': 'a', 'v': 'q'},
+                                       'b': {'n': 'b', 'v': ['r', 'r'],
+                                             'd': 'list_of_string'}})
+        self.assertEqual(['x', 'y', 1, 'z', ['p'], 'q'], merged['a']['v'])
+        self.assertEqual(['r'], merged['b']['v'])
+
+    def _check_hub_edge(self, table):
+        for i in range(300):
+            table.add(0, 1, 'binds', {'a': {'n': 'a', 'v': str(i % 100)}})
+            table.add(i + 2, 0, 'binds', {'a': {'n': 'a', 'v': 'x'}})
+        edges = list(table)
+        self.assertEqual(301, len(edges))
+        self.assertEqual([str(i) for i in range(100)], edges[0][3]['a']['v'])
+
+    def _check_edge_table(self, table):
+        self.assertTrue(table.add(0, 1, 'binds', {'a': {'n': 'a',
+                                                        'v': 'x'}}))
+        self.assertTrue(table.add(1, 0, 'binds', {}))
+        self.assertTrue(table.add(0, 1, 'inhibits', {}))
+        for i in range(10):
+            self.assertTrue(table.add(i + 2, 0, 'binds', {}))
+        self.assertFalse(table.add(0, 1, 'binds', {'a': {'n': 'a',
+                                                         'v': 'y'}}))
+        self.assertFalse(table.add(1, 0, 'binds', {'a': {'n': 'a',
+                                                         'v': 'z'}}))
+        self.assertEqual(13, len(table))
+        edges = list(table)
+        self.assertEqual(13, len(edges))
+        self.assertEqual((0, 1, 'binds',
+                          {'a': {'n': 'a', 'v': ['x', 'y'],
+                                 'd': 'list_of_string'}}), edges[0])
+        self.assertEqual((1, 0, 'binds',
+                          {'a': {'n': 'a', 'v': ['z'],
+                                 'd': 'list_of_string'}}), edges[1])
+        self.assertEqual((0, 1, 'inhibits', {}), edges[2])
+        self.assertEqual([(i + 2, 0, 'binds', {}) for i in range(10)],
+                         edges[3:])
+
+    def test_inmemory_edge_table(self):
+        table = InMemoryEdgeTable()
+        self._check_edge_table(table)
+        table = InMemoryEdgeTable()
+        self._check_hub_edge(table)
+        table.close()
+        self.assertEqual(0, len(table))
+
+    def test_sqlite_edge_table_invalid_constructor_args(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            dbfile = os.path.join(temp_dir, 'db')
+            for args in [{'dbfile': None},
+                         {'dbfile': dbfile, 'cache_size': 0},
+                         {'dbfile': dbfile, 'flush_size': 0}]:
+                try:
+                    SQLiteEdgeTable(**args)
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError:
+                    pass
+            with open(dbfile, 'w') as f:
+                f.write('hi')
+            try:
+                SQLiteEdgeTable(dbfile)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual(dbfile + ' already exists', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_edge_table_evicts_and_reloads(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for cache_size, flush_size in [(1, 1), (2, 3), (100, 100)]:
+                dbfile = os.path.join(temp_dir, 'db')
+                table = SQLiteEdgeTable(dbfile, cache_size=cache_size,
+                                        flush_size=flush_size)
+                self._check_edge_table(table)
+                table.close()
+                table = SQLiteEdgeTable(dbfile, cache_size=cache_size,
+                                        flush_size=flush_size)
+                self._check_hub_edge(table)
+                table.close()
+                self.assertFalse(os.path.exists(dbfile))
+                # calling close twice is fine
+                table.close()
+        finally:
+            shutil.rmtree(temp_dir)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `networkcache` module."""
+
+import tempfile
+import shutil
+import os
+import json
+import unittest
+from mock import MagicMock, patch
+from requests.exceptions import HTTPError
+from ndexutil.tsv import networkcache
+from ndexutil.tsv.networkcache import NetworkNameCache
+
+
+class TestNetworkNameCache(unittest.TestCase):
+    """
+    Tests networkcache.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self._temp_dir = tempfile.mkdtemp()
+        self._cache_file = os.path.join(self._temp_dir, 'cache.json')
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        shutil.rmtree(self._temp_dir)
+
+    def _get_client(self, summaries):
+        """
+        Gets mock client returning `summaries` most recently modified
+        first and a summary for every network in it
+        """
+        client = MagicMock()
+
+        def get_summaries(username, offset=0, limit=1000):
+            ordered = sorted(summaries, key=lambda s: -s['modificationTime'])
+            return ordered[offset:offset + limit]
+
+        def get_summary(uuid):
+            for summary in summaries:
+                if summary['externalId'] == uuid:
+                    return summary
+            raise HTTPError('404')
+        client.get_user_network_summaries = MagicMock(side_effect=get_summaries)
+        client.get_network_summary = MagicMock(side_effect=get_summary)
+        return client
+
+    def _get_summaries(self, count):
+        return [{'name': 'net' + str(i), 'externalId': 'uuid' + str(i),
+                 'modificationTime': i} for i in range(count)]
+
+    def test_default_cache_file(self):
+        cache = NetworkNameCache(MagicMock(), 'server', 'user')
+        self.assertEqual(os.path.join(os.path.expanduser('~'),
+                                      networkcache.CACHE_FILE),
+                         cache.get_cache_file())
+
+    @patch('ndexutil.tsv.networkcache.NETWORKS_PER_PAGE', 2)
+    def test_get_network_uuid_pages_and_persists(self):
+        summaries = self._get_summaries(5) + [{'name': None, 'externalId': 'x',
+                                               'modificationTime': 1}]
+        client = self._get_client(summaries)
+        cache = NetworkNameCache(client, 'server', 'user', cache_file=self._cache_file)
+        self.assertEqual(0, client.get_user_network_summaries.call_count)
+
+        # stops at page with network
+        self.assertEqual('uuid3', cache.get_network_uuid('NET3'))
+        self.assertEqual(1, client.get_user_network_summaries.call_count)
+        # unknown name requests all pages
+        self.assertEqual(None, cache.get_network_uuid('foo'))
+        self.assertEqual(5, client.get_user_network_summaries.call_count)
+        self.assertTrue(os.path.isfile(self._cache_file))
+
+        # new cache starts from file and only requests changed networks
+        summaries.append({'name': 'new', 'externalId': 'uuid9',
+                          'modificationTime': 9})
+        client = self._get_client(summaries)
+        cache = NetworkNameCache(client, 'server', 'user', cache_file=self._cache_file)
+        self.assertEqual('uuid0', cache.get_network_uuid('net0'))
+        self.assertEqual(0, client.get_user_network_summaries.call_count)
+        self.assertEqual(['uuid0'], [c[0][0] for c in
+                                     client.get_network_summary.call_args_list])
+        self.assertEqual('uuid9', cache.get_network_uuid('New'))
+        # stops at second page that ends with network older than
+        # last complete refresh
+        self.assertEqual(None, cache.get_network_uuid('foo'))
+        self.assertEqual(3, client.get_user_network_summaries.call_count)
+
+        # other users do not share networks
+        cache = NetworkNameCache(self._get_client([]), 'server', 'other',
+                                 cache_file=self._cache_file)
+        self.assertEqual(None, cache.get_network_uuid('net0'))
+        with open(self._cache_file, 'r') as f:
+            self.assertEqual(['server other', 'server user'],
+                             sorted(json.load(f)['accounts'].keys()))
+
+    def test_deleted_and_renamed_networks(self):
+        summaries = self._get_summaries(3)
+        cache = NetworkNameCache(self._get_client(summaries), 'server', 'user',
+                                 cache_file=self._cache_file)
+        self.assertEqual({'NET0': 'uuid0', 'NET1': 'uuid1', 'NET2': 'uuid2'},
+                         cache.get_mapping())
+
+        # network was renamed and another one with old name deleted
+        summaries[0] = {'name': 'net1', 'externalId': 'uuid0', 'modificationTime': 0}
+        del summaries[1]
+        cache = NetworkNameCache(self._get_client(summaries), 'server', 'user',
+                                 cache_file=self._cache_file)
+        self.assertEqual('uuid0', cache.get_network_uuid('net1'))
+        self.assertEqual(None, cache.get_network_uuid('net0'))
+
+    def test_get_mapping_drops_deleted_networks(self):
+        summaries = self._get_summaries(3)
+        cache = NetworkNameCache(self._get_client(summaries), 'server', 'user',
+                                 cache_file=self._cache_file)
+        self.assertEqual('uuid2', cache.get_network_uuid('net2'))
+        del summaries[1]
+        cache = NetworkNameCache(self._get_client(summaries), 'server', 'user',
+                                 cache_file=self._cache_file)
+        self.assertEqual({'NET0': 'uuid0', 'NET2': 'uuid2'}, cache.get_mapping())
+        with open(self._cache_file, 'r') as f:
+            self.assertEqual(['NET0', 'NET2'],
+                             sorted(json.load(f)['accounts']['server user']['networks']))
+        self.assertEqual(['cache.json'], os.listdir(self._temp_dir))
+
+    def test_unordered_summaries_and_duplicate_names(self):
+        summaries = [{'name': 'a', 'externalId': 'old', 'modificationTime': 1},
+                     {'name': 'A', 'externalId': 'new', 'modificationTime': 5},
+                     {'name': 'b', 'externalId': 'b', 'modificationTime': 3}]
+        client = MagicMock()
+        client.get_user_network_summaries = MagicMock(side_effect=lambda username,
+                                                      offset=0, limit=1000:
+                                                      summaries[offset:offset + limit])
+        with patch('ndexutil.tsv.networkcache.NETWORKS_PER_PAGE', 1):
+            cache = NetworkNameCache(client, 'server', 'user', cache_file=self._cache_file)
+            self.assertEqual({'A': 'new', 'B': 'b'}, cache.get_mapping())
+            client.get_user_network_summaries.reset_mock()
+            # summaries were not in order so all pages are requested
+            cache = NetworkNameCache(client, 'server', 'user', cache_file=self._cache_file)
+            cache.refresh()
+            self.assertEqual(4, client.get_user_network_summaries.call_count)
+
+    def test_unreadable_cache_file(self):
+        with open(self._cache_file, 'w') as f:
+            f.write('{')
+        cache = NetworkNameCache(self._get_client(self._get_summaries(1)), 'server',
+                                 'user', cache_file=self._cache_file)
+        self.assertEqual('uuid0', cache.get_network_uuid('net0'))
+        with open(self._cache_file, 'r') as f:
+            self.assertEqual(NetworkNameCache.VERSION, json.load(f)['version'])
+
+        # lookups work if cache file cannot be saved
+        cache = NetworkNameCache(self._get_client(self._get_summaries(1)), 'server',
+                                 'user', cache_file=os.path.join(self._temp_dir, 'foo',
+                                                                 'cache.json'))
+        self.assertEqual('uuid0', cache.get_network_uuid('net0'))
+        self.assertEqual(['cache.json'], os.listdir(self._temp_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
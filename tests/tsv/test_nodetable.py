@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `nodetable` module."""
+
+import tempfile
+import shutil
+import os
+import unittest
+from ndexutil.tsv.nodetable import InMemoryNodeTable
+from ndexutil.tsv.nodetable import SQLiteNodeTable
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestNodeTable(unittest.TestCase):
+    """
+    Tests nodetable.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def test_inmemory_node_table(self):
+        table = InMemoryNodeTable()
+        self.assertEqual(None, table.get('a'))
+        table['a'] = 0
+        self.assertEqual(0, table.get('a'))
+        self.assertEqual(1, len(table))
+        table.close()
+
+    def test_sqlite_node_table_invalid_constructor_args(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            dbfile = os.path.join(temp_dir, 'db')
+            for args in [{'dbfile': None},
+                         {'dbfile': dbfile, 'cache_size': 0},
+                         {'dbfile': dbfile, 'flush_size': 0}]:
+                try:
+                    SQLiteNodeTable(**args)
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError:
+                    pass
+            with open(dbfile, 'w') as f:
+                f.write('hi')
+            try:
+                SQLiteNodeTable(dbfile)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual(dbfile + ' already exists', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_node_table_evicts_and_reloads(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            dbfile = os.path.join(temp_dir, 'db')
+            table = SQLiteNodeTable(dbfile, cache_size=2, flush_size=3)
+            self.assertEqual(None, table.get('x'))
+            self.assertEqual('foo', table.get('x', 'foo'))
+            for i in range(10):
+                table['node' + str(i)] = {'id': i, 'n': 'node' + str(i)}
+            table['tuple'] = (10, b'12345678')
+            table['zero'] = 0
+            self.assertEqual(12, len(table))
+            for i in range(10):
+                self.assertEqual({'id': i, 'n': 'node' + str(i)},
+                                 table.get('node' + str(i)))
+            self.assertEqual((10, b'12345678'), table.get('tuple'))
+            self.assertEqual(0, table.get('zero'))
+            table.flush()
+            self.assertEqual(0, table.get('zero'))
+            table.close()
+            self.assertFalse(os.path.exists(dbfile))
+            # calling close twice is fine
+            table.close()
+        finally:
+            shutil.rmtree(temp_dir)
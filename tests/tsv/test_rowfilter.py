@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `rowfilter` module."""
+
+import unittest
+from ndexutil.tsv.rowfilter import RowFilter
+from ndexutil.tsv.rowfilter import get_row_filter
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestRowFilter(unittest.TestCase):
+    """
+    Tests rowfilter.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def _get_accepted(self, condition, rows):
+        row_filter = RowFilter([dict(condition, column_name='a')])
+        row_filter.bind({'b': 0, 'a': 1})
+        return [row[1] for row in rows if row_filter.accept(row)]
+
+    def test_get_row_filter_no_conditions(self):
+        self.assertEqual(None, get_row_filter({}))
+        self.assertEqual(None, get_row_filter({'row_filter': []}))
+
+    def test_numeric_comparisons(self):
+        rows = [['x', '0.5'], ['x', '1'], ['x', ' 2.0 '], ['x', 'foo'],
+                ['x', ''], ['x', None]]
+        self.assertEqual(['1', ' 2.0 '],
+                         self._get_accepted({'operator': '>=', 'value': 1},
+                                            rows))
+        self.assertEqual(['0.5'],
+                         self._get_accepted({'operator': '<', 'value': 1},
+                                            rows))
+        self.assertEqual([' 2.0 '],
+                         self._get_accepted({'operator': '==', 'value': 2},
+                                            rows))
+        # values that are not numbers never pass numeric comparisons
+        self.assertEqual(['0.5', ' 2.0 '],
+                         self._get_accepted({'operator': '!=', 'value': 1},
+                                            rows))
+
+    def test_string_comparisons(self):
+        rows = [['x', 'human'], ['x', 'mouse'], ['x', ''], ['x', None]]
+        self.assertEqual(['human'],
+                         self._get_accepted({'operator': '==',
+                                             'value': 'human'}, rows))
+        self.assertEqual(['mouse', '', None],
+                         self._get_accepted({'operator': '!=',
+                                             'value': 'human'}, rows))
+        self.assertEqual(['', None],
+                         self._get_accepted({'operator': '==',
+                                             'value': ''}, rows))
+        self.assertEqual(['human', 'mouse'],
+                         self._get_accepted({'operator': 'in',
+                                             'value': ['human', 'mouse']},
+                                            rows))
+        self.assertEqual(['mouse', '', None],
+                         self._get_accepted({'operator': 'not_in',
+                                             'value': ['human']}, rows))
+
+    def test_regular_expressions(self):
+        rows = [['x', 'inhibits'], ['x', 'activates'], ['x', None]]
+        self.assertEqual(['inhibits'],
+                         self._get_accepted({'operator': 'matches',
+                                             'value': '^inh'}, rows))
+        self.assertEqual(['activates', None],
+                         self._get_accepted({'operator': 'not_matches',
+                                             'value': 'inh'}, rows))
+
+    def test_all_conditions_must_pass(self):
+        row_filter = RowFilter([{'column_name': 'a', 'operator': '>',
+                                 'value': 1},
+                                {'column_name': 'b', 'operator': '==',
+                                 'value': 'yes'}])
+        self.assertEqual(['a', 'b'], row_filter.get_column_names())
+        row_filter.bind({'a': 0, 'b': 1})
+        self.assertTrue(row_filter.accept(['2', 'yes']))
+        self.assertFalse(row_filter.accept(['2', 'no']))
+        self.assertFalse(row_filter.accept(['1', 'yes']))
+
+    def test_invalid_conditions(self):
+        for condition, message in [({'operator': 'foo', 'value': 1},
+                                    'Unsupported row_filter operator foo'),
+                                   ({'operator': '>', 'value': '1'},
+                                    'Value of > condition on column a must '
+                                    'be a number'),
+                                   ({'operator': '==', 'value': True},
+                                    'Value of == condition on column a must '
+                                    'be a number'),
+                                   ({'operator': 'in', 'value': 'x'},
+                                    'Value of in condition on column a must '
+                                    'be a list')]:
+            try:
+                RowFilter([dict(condition, column_name='a')])
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual(message, str(ne))
+        try:
+            RowFilter([{'column_name': 'a', 'operator': 'matches',
+                        'value': '('}])
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('Invalid regular expression for matches '
+                            'condition on column a' in str(ne))
+
+
+if __name__ == '__main__':
+    unittest.main()
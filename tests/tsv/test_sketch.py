@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for `sketch` module."""
+
+import unittest
+from ndexutil.tsv.sketch import HyperLogLog
+from ndexutil.exceptions import NDExUtilError
+
+
+class TestSketch(unittest.TestCase):
+    """
+    Tests sketch.py
+    """
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        pass
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        pass
+
+    def test_constructor_invalid_precision(self):
+        for precision in [None, 3, 19]:
+            try:
+                HyperLogLog(precision=precision)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual('precision must be between 4 and 18',
+                                 str(ne))
+
+    def test_count(self):
+        sketch = HyperLogLog()
+        self.assertEqual(0, sketch.count())
+        for i in range(100):
+            sketch.add('node' + str(i))
+            sketch.add('node' + str(i))
+        self.assertEqual(100, sketch.count())
+        for i in range(50000):
+            sketch.add(i)
+        self.assertTrue(abs(sketch.count() - 50100) < 50100 * 0.03)
+
+    def test_merge(self):
+        one = HyperLogLog(precision=10)
+        two = HyperLogLog(precision=10)
+        for i in range(1000):
+            one.add(i)
+            two.add(i + 500)
+        one.merge(two)
+        self.assertTrue(abs(one.count() - 1500) < 1500 * 0.1)
+        try:
+            one.merge(HyperLogLog())
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('Cannot merge sketches with different '
+                             'precision', str(ne))
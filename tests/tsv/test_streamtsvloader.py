@@ -8,13 +8,36 @@ import shutil
 import os
 import io
 import json
+import contextlib
 import unittest
 from ndexutil.tsv.streamtsvloader import StreamTSVLoader
 from ndexutil.tsv.streamtsvloader import CXStreamWriter
+from ndexutil.tsv.streamtsvloader import CX2StreamWriter
+from ndexutil.tsv.streamtsvloader import _CompiledAttributeColumn
+from ndexutil.tsv.streamtsvloader import _CompiledNodePlan
+from ndexutil.tsv.streamtsvloader import _read_tsv_rows
+from ndexutil.tsv.streamtsvloader import _read_tsv_chunks
+from ndexutil.tsv import streamtsvloader
+from ndexutil.tsv.nodetable import SQLiteNodeTable
+from ndexutil.tsv.edgetable import SQLiteEdgeTable
+from ndexutil.tsv import compression
+from ndexutil.tsv import arrowinput
 from ndexutil.exceptions import NDExUtilError
 import ndex2
+from ndex2.cx2 import CX2Network
+from ndex2.cx2 import RawCX2NetworkFactory
 
 
+SIMPLE_PLAN = {'source_plan': {'node_name_column': 'a',
+                               'property_columns': ['atype']},
+               'target_plan': {'node_name_column': 'b'},
+               'edge_plan': {'default_predicate': 'interacts',
+                             'property_columns': ['score::double']}}
+
+SIMPLE_TSV = 'a\tb\tatype\tscore\n' \
+             'x\ty\tgene\t1.0\n' \
+             'x\tz\tgene\t2.0\n'
+
 class TeststreamTSVLoader(unittest.TestCase):
     """
     Tests streamtsvloader.py
@@ -51,6 +74,50 @@ class TeststreamTSVLoader(unittest.TestCase):
         except NDExUtilError as ne:
             self.assertTrue('Post metadata aspect can only' in str(ne))
 
+    def test_get_fragment_encoder(self):
+        self.assertTrue(isinstance(streamtsvloader.get_fragment_encoder(),
+                                   streamtsvloader.JSONFragmentEncoder))
+        encoder = streamtsvloader.get_fragment_encoder(streamtsvloader.AUTO_ENCODER)
+        if streamtsvloader.ORJSON_LOADED:
+            self.assertTrue(isinstance(encoder,
+                                       streamtsvloader.OrjsonFragmentEncoder))
+        else:
+            self.assertTrue(isinstance(encoder,
+                                       streamtsvloader.JSONFragmentEncoder))
+        try:
+            streamtsvloader.get_fragment_encoder('foo')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('Unsupported encoder foo' in str(ne))
+
+    def test_write_to_binary_and_text_stream(self):
+        encoders = [streamtsvloader.JSONFragmentEncoder()]
+        if streamtsvloader.ORJSON_LOADED:
+            encoders.append(streamtsvloader.OrjsonFragmentEncoder())
+        for encoder in encoders:
+            res = []
+            for stream in [io.StringIO(), io.BytesIO()]:
+                writer = CXStreamWriter(stream, encoder=encoder)
+                writer.write_pre_metadata([{'name': 'nodes'}])
+                writer.write_aspect_fragment({'nodes': [{'@id': 0,
+                                                         'n': 'ü'}]})
+                writer.write_post_metadata([])
+                data = stream.getvalue()
+                if isinstance(data, bytes):
+                    data = data.decode('utf-8')
+                res.append(json.loads(data))
+            self.assertEqual(res[0], res[1])
+            self.assertEqual([{'@id': 0, 'n': 'ü'}], res[0][2]['nodes'])
+
+    def test_write_aspect_fragment_returns_size(self):
+        for stream in [io.StringIO(), io.BytesIO()]:
+            writer = CXStreamWriter(stream)
+            writer.write_pre_metadata([{'name': 'nodes'}])
+            start = len(stream.getvalue())
+            size = writer.write_aspect_fragment({'nodes': [{'@id': 0,
+                                                            'n': 'ü'}]})
+            self.assertEqual(len(stream.getvalue()) - start, size)
+
     def test_write_pre_metadata_twice(self):
         stream = io.StringIO()
         writer = CXStreamWriter(stream)
@@ -72,6 +139,434 @@ class TeststreamTSVLoader(unittest.TestCase):
         except NDExUtilError as ne:
             self.assertTrue('Post metadata aspect can only' in str(ne))
 
+    def test_compiled_attribute_column_from_string(self):
+        col = _CompiledAttributeColumn('score::double')
+        self.assertEqual('score', col.column_name)
+        self.assertEqual('score', col.attribute_name)
+        col.bind({'foo': 0, 'score': 1})
+        self.assertEqual(1, col.column_index)
+        self.assertEqual({'n': 'score', 'v': 1.5, 'd': 'double'},
+                         col.get_attribute(['x', '[1.5]']))
+        self.assertEqual(None, col.get_attribute(['x', '']))
+        self.assertEqual(None, col.get_attribute(['x', None]))
+
+        col = _CompiledAttributeColumn('name')
+        self.assertEqual('string', col.data_type)
+        col.bind({'name': 0})
+        self.assertEqual({'n': 'name', 'v': 'foo'},
+                         col.get_attribute(['foo']))
+
+    def test_compiled_attribute_column_from_dict(self):
+        col = _CompiledAttributeColumn({'column_name': 'pmids',
+                                        'attribute_name': 'citation',
+                                        'value_prefix': 'pubmed',
+                                        'delimiter': '|'})
+        self.assertEqual('list_of_string', col.data_type)
+        col.bind({'pmids': 0})
+        self.assertEqual({'n': 'citation',
+                          'v': ['pubmed:1', 'pubmed:2'],
+                          'd': 'list_of_string'},
+                         col.get_attribute(['1 | 2']))
+
+        col = _CompiledAttributeColumn({'attribute_name': 'type',
+                                        'default_value': 'gene'})
+        self.assertEqual(None, col.column_name)
+        col.bind({'type': 0})
+        self.assertEqual(None, col.column_index)
+        self.assertEqual({'n': 'type', 'v': 'gene'},
+                         col.get_attribute(['ignored']))
+
+        col = _CompiledAttributeColumn({'column_name': 'x',
+                                        'data_type': 'list_of_integer',
+                                        'default_value': '3'})
+        col.bind({'x': 0})
+        self.assertEqual([1, 2], col.get_attribute(['[1,2]'])['v'])
+        self.assertEqual([3], col.get_attribute([None])['v'])
+
+        # column not in header only gets default value
+        col.bind({})
+        self.assertEqual([3], col.get_attribute(['1'])['v'])
+
+    def test_compiled_attribute_column_interns_values(self):
+        col = _CompiledAttributeColumn('organism')
+        col.bind({'organism': 0})
+        attr = col.get_attribute(['human'])
+        self.assertTrue(attr is col.get_attribute(['human']))
+        self.assertFalse(attr is col.get_attribute(['mouse']))
+
+        # interning stops once column has too many distinct values
+        for i in range(streamtsvloader.INTERN_MAX_VALUES + 1):
+            col.get_attribute([str(i)])
+        self.assertFalse(col.get_attribute(['human']) is
+                         col.get_attribute(['human']))
+        self.assertEqual(attr, col.get_attribute(['human']))
+
+        col = _CompiledAttributeColumn({'column_name': 'x', 'intern': True})
+        col.bind({'x': 0})
+        for i in range(streamtsvloader.INTERN_MAX_VALUES + 1):
+            col.get_attribute([str(i)])
+        self.assertTrue(col.get_attribute(['1']) is col.get_attribute(['1']))
+
+        col = _CompiledAttributeColumn({'column_name': 'x', 'intern': False})
+        col.bind({'x': 0})
+        self.assertFalse(col.get_attribute(['1']) is
+                         col.get_attribute(['1']))
+
+    def test_compiled_attribute_column_get_attributes(self):
+        col = _CompiledAttributeColumn({'column_name': 'score',
+                                        'data_type': 'double',
+                                        'intern': False})
+        col.bind({'score': 0})
+        rows = [['1.5'], [''], [None], ['2']]
+        self.assertEqual([col.get_attribute(row) for row in rows],
+                         col.get_attributes(rows))
+        self.assertEqual([{'n': 'score', 'v': 1.5, 'd': 'double'}, None,
+                          None, {'n': 'score', 'v': 2.0, 'd': 'double'}],
+                         col.get_attributes(rows))
+
+        # brackets are removed by falling back to get_attribute()
+        rows.append(['[3.5]'])
+        self.assertEqual({'n': 'score', 'v': 3.5, 'd': 'double'},
+                         col.get_attributes(rows)[4])
+        rows.append(['foo'])
+        try:
+            col.get_attributes(rows)
+            self.fail('Expected ValueError')
+        except ValueError as ve:
+            self.assertTrue('foo' in str(ve))
+
+        col = _CompiledAttributeColumn({'column_name': 'x',
+                                        'data_type': 'long',
+                                        'default_value': '3'})
+        col.bind({'x': 0})
+        self.assertEqual([{'n': 'x', 'v': 1, 'd': 'long'},
+                          {'n': 'x', 'v': 3, 'd': 'long'}],
+                         col.get_attributes([['1'], [None]]))
+
+    def test_write_cx_network_reports_first_bad_row(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = 'a\tb\tatype\tscore\n' \
+                  'x\ty\tgene\t1.0\n' \
+                  'x\tz\tgene\t2.0\n' \
+                  'w\tz\tgene\tfoo\n' \
+                  'x\tz\tdrug\t4.0\n'
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 2}]:
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    try:
+                        self._write_simple_network(temp_dir, tsv=tsv,
+                                                   **kwargs)
+                        self.fail('Expected ValueError')
+                    except ValueError as ve:
+                        self.assertTrue('foo' in str(ve))
+                self.assertTrue(out.getvalue().startswith('Error occurred '
+                                                          'in line 4.'))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx_network_shared_edge_attributes(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = 'a\tb\tatype\tscore\n' \
+                  'x\ty\tgene\t1.0\n' \
+                  'x\tz\tgene\t1.0\n' \
+                  'w\tz\tgene\t1.0\n'
+            res = self._write_simple_network(temp_dir, tsv=tsv)
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(res))
+            for edge_id in range(3):
+                self.assertEqual(1.0, net.get_edge_attribute_value(edge_id,
+                                                                   'score'))
+            edge_attrs = [a for a in json.loads(res) if 'edgeAttributes' in a]
+            self.assertEqual([0, 1, 2], [attr['po'] for attr in
+                                         edge_attrs[0]['edgeAttributes']])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_read_tsv_rows(self):
+        data = io.StringIO('a\tb\tc\n'
+                           '\n'
+                           'd\te\n'
+                           '"f\tg"\t"h\ni"\tj\n'
+                           'k\tl\tm')
+        res = list(_read_tsv_rows(data, 3))
+        self.assertEqual([['a', 'b', 'c'],
+                          ['d', 'e', None],
+                          ['f\tg', 'h\ni', 'j'],
+                          ['k', 'l', 'm']], res)
+
+    def test_compiled_attribute_column_invalid_data_type(self):
+        try:
+            _CompiledAttributeColumn('score::foo')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('Unsupported data_type foo for column score',
+                             str(ne))
+
+    def test_compiled_node_plan_rep_prefix_without_rep_column(self):
+        try:
+            _CompiledNodePlan({'node_name_column': 'a',
+                               'rep_prefix': 'foo'})
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('rep_column needs to be' in str(ne))
+
+        plan = _CompiledNodePlan({'node_name_column': 'a',
+                                  'rep_column': 'b',
+                                  'rep_prefix': 'foo'})
+        self.assertFalse(plan.use_name_as_id)
+        self.assertEqual('foo:', plan.rep_prefix)
+
+    def _write_plan(self, temp_dir, plan=SIMPLE_PLAN):
+        planfile = os.path.join(temp_dir, 'plan.json')
+        with open(planfile, 'w') as f:
+            json.dump(plan, f)
+        return planfile
+
+    def _write_simple_network(self, temp_dir, tsv=SIMPLE_TSV,
+                              plan=SIMPLE_PLAN, node_table=None, **kwargs):
+        planfile = self._write_plan(temp_dir, plan=plan)
+        loader = StreamTSVLoader(planfile, None, **kwargs)
+        out = io.StringIO()
+        loader.write_cx_network(io.StringIO(tsv), out,
+                                [{'n': 'name', 'v': 'simple'}],
+                                node_table=node_table)
+        return out.getvalue()
+
+    def test_invalid_node_check(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self._write_simple_network(temp_dir, node_check='foo')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('Unsupported node_check foo' in str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_node_check_modes_create_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            full = self._write_simple_network(temp_dir)
+            for mode in [streamtsvloader.NODE_CHECK_FINGERPRINT,
+                         streamtsvloader.NODE_CHECK_NONE]:
+                self.assertEqual(full,
+                                 self._write_simple_network(temp_dir,
+                                                            node_check=mode))
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(full))
+            self.assertEqual(3, len(net.nodes))
+            self.assertEqual(2, len(net.edges))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_node_check_modes_with_mismatched_node(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = SIMPLE_TSV + 'x\tq\tdrug\t3.0\n'
+            for mode in [streamtsvloader.NODE_CHECK_FULL,
+                         streamtsvloader.NODE_CHECK_FINGERPRINT]:
+                try:
+                    self._write_simple_network(temp_dir, tsv=tsv,
+                                               node_check=mode)
+                    self.fail('Expected RuntimeError')
+                except RuntimeError as re:
+                    self.assertTrue('Node value mismatch' in str(re))
+
+            # first occurrence wins
+            res = self._write_simple_network(temp_dir, tsv=tsv,
+                                             node_check=streamtsvloader.
+                                             NODE_CHECK_NONE)
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(res))
+            self.assertEqual(4, len(net.nodes))
+            self.assertEqual('gene',
+                             net.get_node_attribute(0, 'atype')['v'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_sqlite_node_table_creates_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            full = self._write_simple_network(temp_dir)
+            for mode in streamtsvloader.NODE_CHECK_MODES:
+                table = SQLiteNodeTable(os.path.join(temp_dir, 'db'),
+                                        cache_size=1, flush_size=1)
+                try:
+                    self.assertEqual(full,
+                                     self._write_simple_network(temp_dir,
+                                                                node_table=table,
+                                                                node_check=mode))
+                    self.assertEqual(3, len(table))
+                finally:
+                    table.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_read_tsv_chunks(self):
+        lines = ['a\tb\n', '"c\n', 'd"\te\n', 'f\tg\n', 'h\ti\n']
+        self.assertEqual([lines[0:1], lines[1:3], lines[3:4], lines[4:]],
+                         list(_read_tsv_chunks(lines, 1)))
+        self.assertEqual([lines[0:3], lines[3:]],
+                         list(_read_tsv_chunks(lines, 2)))
+        self.assertEqual([], list(_read_tsv_chunks([], 2)))
+
+    def test_read_tsv_chunks_quotes_within_values(self):
+        # quote characters not at the start of a value do not quote it
+        lines = ['x\t5" disk\n', 'a"b\t"c""\n', 'd"\te\n', '"f""g"\t"h"\n',
+                 'k;"l\n', 'm"\n']
+        self.assertEqual([lines[0:1], lines[1:3], lines[3:4], lines[4:5],
+                          lines[5:6]],
+                         list(_read_tsv_chunks(lines, 1)))
+        self.assertEqual([lines[0:1], lines[1:2], lines[2:3], lines[3:4],
+                          lines[4:6]],
+                         list(_read_tsv_chunks(lines, 1, delimiter=';')))
+        self.assertEqual([[line] for line in lines],
+                         list(_read_tsv_chunks(lines, 1, quotechar=None)))
+
+    def test_parallel_parsing_with_quote_within_value(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = SIMPLE_TSV + 'v\tw\t5" disk\t3.0\n' +\
+                ''.join('n' + str(i) + '\tm\tgene\t1.0\n' for i in range(20))
+            expected = self._write_simple_network(temp_dir, tsv=tsv)
+            self.assertTrue('5\\" disk' in expected)
+            lines = io.StringIO(tsv).readlines()[1:]
+            self.assertEqual(3, max(len(c) for c in _read_tsv_chunks(lines, 3)))
+            out = io.StringIO()
+            StreamTSVLoader(os.path.join(temp_dir, 'plan.json'), None, workers=2,
+                            worker_chunksize=3).write_cx_network(io.StringIO(tsv), out,
+                                                                 [{'n': 'name',
+                                                                   'v': 'simple'}])
+            self.assertEqual(expected, out.getvalue())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_serial_parsing_with_quote_within_value(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = 'a\tb\tatype\tscore\n' + 'x\ty\t5" disk\t1.0\n' +\
+                ''.join('n' + str(i) + '\tm\tgene\t1.0\n' for i in range(5001))
+            cx = self._write_simple_network(temp_dir, tsv=tsv)
+            self.assertEqual(5002, len(self._get_aspects(cx)['edges']))
+
+            loader = StreamTSVLoader(os.path.join(temp_dir, 'plan.json'), None)
+            chunks = list(loader._read_chunks(io.StringIO(tsv).readlines()[1:],
+                                              streamtsvloader.ROWS_PER_CHUNK))
+            self.assertEqual([1000, 1000, 1000, 1000, 1000, 2],
+                             [len(c) for c in chunks])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_invalid_worker_chunksize(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self._write_simple_network(temp_dir, worker_chunksize=0)
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('worker_chunksize must be 1 or larger', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_parallel_parsing_creates_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.dirname(__file__)
+            res = []
+            for workers in [1, 2]:
+                loader = StreamTSVLoader(os.path.join(here, 'ctd-gene-disease-'
+                                                            '2019-norm-plan-'
+                                                            'collapsed.json'),
+                                         None, workers=workers,
+                                         worker_chunksize=3)
+                out = io.StringIO()
+                with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                    loader.write_cx_network(f, out, batchsize=4)
+                res.append(out.getvalue())
+            self.assertEqual(res[0], res[1])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_parallel_parsing_with_error(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = SIMPLE_TSV + 'x\tq\tgene\t3.0\n' + \
+                  '\tq\tgene\t4.0\n'
+            self._write_simple_network(temp_dir, tsv=tsv, workers=2,
+                                       worker_chunksize=1)
+            self.fail('Expected RuntimeError')
+        except RuntimeError as re:
+            self.assertEqual('Id value is missing.', str(re))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_background_writer_creates_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.dirname(__file__)
+            res = []
+            for background_writer in [False, True]:
+                loader = StreamTSVLoader(os.path.join(here, 'ctd-gene-disease-'
+                                                            '2019-norm-plan-'
+                                                            'collapsed.json'),
+                                         None,
+                                         background_writer=background_writer)
+                out = io.StringIO()
+                with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                    loader.write_cx_network(f, out, batchsize=4)
+                res.append(out.getvalue())
+            self.assertEqual(res[0], res[1])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_background_writer_write_fails(self):
+        class FailingStream(io.StringIO):
+            def write(self, data):
+                if '"edges"' in data:
+                    raise IOError('disk full')
+                return super().write(data)
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            planfile = os.path.join(temp_dir, 'plan.json')
+            with open(planfile, 'w') as f:
+                json.dump(SIMPLE_PLAN, f)
+            loader = StreamTSVLoader(planfile, None, background_writer=True)
+            tsv = SIMPLE_TSV + 'x\tq\tgene\t3.0\n' * 5
+            loader.write_cx_network(io.StringIO(tsv), FailingStream(),
+                                    batchsize=1)
+            self.fail('Expected IOError')
+        except IOError as e:
+            self.assertEqual('disk full', str(e))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_compressed_input_and_output(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            here = os.path.dirname(__file__)
+            planfile = os.path.join(here, 'ctd-gene-disease-2019-norm-'
+                                          'plan-collapsed.json')
+            tsvfile = os.path.join(here, 'ctd_test.tsv')
+            loader = StreamTSVLoader(planfile, None)
+            expected = io.StringIO()
+            with open(tsvfile, 'r') as f:
+                loader.write_cx_network(f, expected, batchsize=4)
+
+            gztsv = os.path.join(temp_dir, 'ctd.tsv.gz')
+            with open(tsvfile, 'rb') as f:
+                with compression.open_output(gztsv,
+                                             compression=compression.GZIP) as out:
+                    shutil.copyfileobj(f, out)
+
+            cxfile = os.path.join(temp_dir, 'out.cx.gz')
+            with open(gztsv, 'rb') as f:
+                with compression.open_output(cxfile,
+                                             compression=compression.GZIP) as out:
+                    loader.write_cx_network(f, out, batchsize=4)
+                self.assertFalse(f.closed)
+            with compression.open_input(cxfile) as f:
+                self.assertEqual(expected.getvalue(), f.read())
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_creating_network(self):
         temp_dir = tempfile.mkdtemp()
         try:
@@ -158,6 +653,737 @@ class TeststreamTSVLoader(unittest.TestCase):
 
 
 
+    def _get_resume_tsv(self, bad_row=None):
+        lines = ['a\tb\tatype\tscore\n']
+        for i in range(40):
+            atype = 'gene' + str(i % 7)
+            if i == bad_row:
+                # conflicts with type of node in earlier row
+                atype = 'drug'
+            lines.append('n' + str(i % 7) + '\tm' + str(i) + '\t' + atype +
+                         '\t' + str(i) + '.5\n')
+        return ''.join(lines)
+
+    def _run_checkpointed_load(self, temp_dir, tsv, resume=False, **kwargs):
+        planfile = os.path.join(temp_dir, 'plan.json')
+        with open(planfile, 'w') as f:
+            json.dump(SIMPLE_PLAN, f)
+        tsvfile = os.path.join(temp_dir, 'input.tsv')
+        with open(tsvfile, 'w') as f:
+            f.write(tsv)
+        cxfile = os.path.join(temp_dir, 'out.cx')
+        loader = StreamTSVLoader(planfile, None, **kwargs)
+        with open(tsvfile, 'rb') as tsv_in:
+            with open(cxfile, 'r+b' if resume else 'wb') as out:
+                loader.write_cx_network(tsv_in, out,
+                                        [{'n': 'name', 'v': 'resume'}],
+                                        batchsize=3,
+                                        checkpoint_file=os.path.join(temp_dir,
+                                                                     'cp.json'),
+                                        checkpoint_interval=2,
+                                        resume=resume)
+        with open(cxfile, 'rb') as f:
+            return f.read()
+
+    def test_resume_produces_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            good_tsv = self._get_resume_tsv()
+            bad_tsv = self._get_resume_tsv(bad_row=30)
+            for kwargs in [{},
+                           {'background_writer': True},
+                           {'workers': 2, 'worker_chunksize': 4},
+                           {'node_check': streamtsvloader.NODE_CHECK_FINGERPRINT}]:
+                uninterrupted = self._run_checkpointed_load(temp_dir,
+                                                            good_tsv,
+                                                            **kwargs)
+                net = ndex2.create_nice_cx_from_raw_cx(json.loads(uninterrupted))
+                self.assertEqual(40, len(net.edges))
+                self.assertEqual(47, len(net.nodes))
+                try:
+                    self._run_checkpointed_load(temp_dir, bad_tsv, **kwargs)
+                    self.fail('Expected RuntimeError')
+                except RuntimeError as re:
+                    self.assertTrue('Node value mismatch' in str(re))
+                with open(os.path.join(temp_dir, 'cp.json'), 'r') as f:
+                    state = json.load(f)
+                self.assertFalse(state['complete'])
+                self.assertTrue(0 < state['lines'] < 31)
+
+                resumed = self._run_checkpointed_load(temp_dir, good_tsv,
+                                                      resume=True, **kwargs)
+                self.assertEqual(uninterrupted, resumed)
+
+                # resuming a complete network writes nothing
+                resumed = self._run_checkpointed_load(temp_dir, good_tsv,
+                                                      resume=True, **kwargs)
+                self.assertEqual(uninterrupted, resumed)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_resume_without_checkpoint_starts_over(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = self._get_resume_tsv()
+            expected = self._run_checkpointed_load(temp_dir, tsv)
+            os.unlink(os.path.join(temp_dir, 'cp.json'))
+            with open(os.path.join(temp_dir, 'out.cx'), 'ab') as f:
+                f.write(b'garbage')
+            res = self._run_checkpointed_load(temp_dir, tsv, resume=True)
+            self.assertEqual(expected, res)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_resume_checkpoint_mismatch(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = self._get_resume_tsv(bad_row=30)
+            try:
+                self._run_checkpointed_load(temp_dir, tsv)
+                self.fail('Expected RuntimeError')
+            except RuntimeError:
+                pass
+            try:
+                self._run_checkpointed_load(temp_dir, tsv.replace('atype',
+                                                                  'atype2'),
+                                            resume=True)
+                self.fail('Expected NDExUtilError')
+            except Exception as e:
+                self.assertTrue('atype2' in str(e))
+            try:
+                self._run_checkpointed_load(temp_dir, tsv, resume=True,
+                                            node_check=streamtsvloader.
+                                            NODE_CHECK_NONE)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as e:
+                self.assertEqual('Checkpoint was saved with node_check '
+                                 'full not none', str(e))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_cx_stream_writer_resume(self):
+        out = io.StringIO()
+        writer = CXStreamWriter(out)
+        writer.resume()
+        writer.write_aspect_fragment({'nodes': [{'@id': 0}]})
+        self.assertEqual('{"nodes": [{"@id": 0}]},', out.getvalue())
+        try:
+            writer.resume()
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertTrue('can only be resumed before' in str(ne))
+
+    def test_write_cx_network_multiple_inputs(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = self._get_resume_tsv()
+            expected = self._write_simple_network(temp_dir, tsv=tsv)
+            lines = tsv.splitlines(keepends=True)
+            header = lines[0]
+            shard_one = os.path.join(temp_dir, 'one.tsv.gz')
+            with compression.open_output(shard_one,
+                                         compression=compression.GZIP) as f:
+                f.write((header + ''.join(lines[11:25])).encode('utf-8'))
+            empty_shard = os.path.join(temp_dir, 'empty.tsv')
+            open(empty_shard, 'w').close()
+            # last shard is missing newline at end
+            shard_two = io.BytesIO((header +
+                                    ''.join(lines[25:])).rstrip().encode('utf-8'))
+
+            planfile = os.path.join(temp_dir, 'plan.json')
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 3}]:
+                loader = StreamTSVLoader(planfile, None, **kwargs)
+                out = io.StringIO()
+                shard_two.seek(0)
+                loader.write_cx_network([io.StringIO(''.join(lines[:11])),
+                                         shard_one, empty_shard, shard_two],
+                                        out, [{'n': 'name', 'v': 'simple'}])
+                self.assertEqual(expected, out.getvalue())
+                self.assertFalse(shard_two.closed)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx_network_multiple_inputs_header_mismatch(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self._write_simple_network(temp_dir)
+            planfile = os.path.join(temp_dir, 'plan.json')
+            loader = StreamTSVLoader(planfile, None)
+            other = io.StringIO('a\tb\tatype\n')
+            other.name = 'other.tsv'
+            try:
+                loader.write_cx_network([io.StringIO(SIMPLE_TSV), other],
+                                        io.StringIO())
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertTrue('of other.tsv does not match header' in
+                                str(ne))
+            try:
+                loader.write_cx_network([], io.StringIO())
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual('No TSV input passed in', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_scan_tsv(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            planfile = os.path.join(temp_dir, 'plan.json')
+            with open(planfile, 'w') as f:
+                json.dump(SIMPLE_PLAN, f)
+            tsv = self._get_resume_tsv().split('\n')
+            tsv[3] = tsv[3].replace('2.5', 'bad')
+            tsv[8] = tsv[8].replace('7.5', 'bad')
+            tsv = '\n'.join(tsv)
+            loader = StreamTSVLoader(planfile, None)
+            report = loader.scan_tsv(io.StringIO(tsv), max_errors=1)
+            self.assertEqual(40, report['rows'])
+            self.assertTrue(report['complete'])
+            self.assertEqual(2, report['error_count'])
+            self.assertEqual(1, len(report['errors']))
+            self.assertEqual(4, report['errors'][0]['line'])
+            self.assertTrue('bad' in report['errors'][0]['message'])
+            self.assertEqual(38, report['edges'])
+            self.assertEqual(38, report['edge_attributes'])
+            self.assertEqual(45, report['nodes'])
+            self.assertEqual(22, report['node_attributes'])
+
+            report = loader.scan_tsv(io.StringIO(tsv), max_rows=2)
+            self.assertEqual(2, report['rows'])
+            self.assertFalse(report['complete'])
+            self.assertEqual(0, report['error_count'])
+
+            # estimated size should be close to size of CX written
+            out = io.StringIO()
+            loader.write_cx_network(io.StringIO(self._get_resume_tsv()), out)
+            report = loader.scan_tsv(io.StringIO(self._get_resume_tsv()))
+            self.assertTrue(abs(report['cx_size'] - len(out.getvalue())) <
+                            len(out.getvalue()) * 0.2)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx_network_collapse_edges(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            plan = {'source_plan': {'node_name_column': 'a',
+                                    'property_columns': ['atype']},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'predicate_id_column': 'i',
+                                  'collapse_edges': True,
+                                  'property_columns': [
+                                      'score::double',
+                                      {'column_name': 'pmid',
+                                       'delimiter': '|'}]}}
+            tsv = 'a\tb\tatype\ti\tscore\tpmid\n' \
+                  'x\ty\tgene\tbinds\t1.5\t1|2\n' \
+                  'x\tz\tgene\tbinds\t2.0\t3\n' \
+                  'x\ty\tgene\tinhibits\t1.0\t\n' \
+                  'x\ty\tgene\tbinds\t1.5\t2|4\n' \
+                  'w\tv\tdrug\tbinds\t3.0\t\n'
+            expected = None
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 1},
+                           {'background_writer': True}, {'edge_table': True}]:
+                planfile = os.path.join(temp_dir, 'plan.json')
+                with open(planfile, 'w') as f:
+                    json.dump(plan, f)
+                edge_table = None
+                if kwargs.pop('edge_table', None) is True:
+                    edge_table = SQLiteEdgeTable(os.path.join(temp_dir,
+                                                              'edges.db'),
+                                                 cache_size=1, flush_size=1)
+                loader = StreamTSVLoader(planfile, None, **kwargs)
+                out = io.StringIO()
+                loader.write_cx_network(io.StringIO(tsv), out, batchsize=1,
+                                        edge_table=edge_table)
+                if edge_table is not None:
+                    edge_table.close()
+                if expected is None:
+                    expected = out.getvalue()
+                    continue
+                self.assertEqual(expected, out.getvalue())
+
+            net = ndex2.create_nice_cx_from_raw_cx(json.loads(expected))
+            self.assertEqual(5, len(net.nodes))
+            self.assertEqual(4, len(net.edges))
+            self.assertEqual({'@id': 0, 's': 0, 't': 1, 'i': 'binds'},
+                             net.get_edge(0))
+            self.assertEqual([1.5], net.get_edge_attribute_value(0, 'score'))
+            self.assertEqual(['1', '2', '4'],
+                             net.get_edge_attribute_value(0, 'pmid'))
+            self.assertEqual('inhibits', net.get_edge(2)['i'])
+            self.assertEqual((None, None),
+                             net.get_edge_attribute(2, 'pmid'))
+            for md in json.loads(expected)[-2]['metaData']:
+                if md['name'] == 'edges':
+                    self.assertEqual(4, md['elementCount'])
+                if md['name'] == 'edgeAttributes':
+                    self.assertEqual(6, md['elementCount'])
+
+            # duplicate rows are collapsed in estimate from scan
+            report = loader.scan_tsv(io.StringIO(tsv))
+            self.assertEqual(5, report['rows'])
+            self.assertEqual(4, report['edges'])
+
+            try:
+                loader.write_cx_network(io.StringIO(tsv), io.StringIO(),
+                                        checkpoint_file=os.path.join(temp_dir,
+                                                                     'cp'))
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual('checkpoint_file is not supported when '
+                                 'collapse_edges is set in edge_plan',
+                                 str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_read_tsv_rows_delimiter_quotechar_and_columns(self):
+        data = io.StringIO('a,b,c,d\n'
+                           '"e,f",g,"h\ni",j,k\n'
+                           'l\n')
+        res = list(_read_tsv_rows(data, 4, delimiter=',', columns=[0, 2]))
+        self.assertEqual([['a', 'c'],
+                          ['e,f', 'h\ni'],
+                          ['l', None]], res)
+
+        data = io.StringIO('a|"b|c"\n')
+        res = list(_read_tsv_rows(data, 3, delimiter='|', quotechar=None))
+        self.assertEqual([['a', '"b', 'c"']], res)
+
+    def test_invalid_delimiter_and_quotechar(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for kwargs in [{'delimiter': None}, {'delimiter': ',,'},
+                           {'delimiter': '\n'}, {'quotechar': ''},
+                           {'delimiter': ',', 'quotechar': ','}]:
+                try:
+                    self._write_simple_network(temp_dir, **kwargs)
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError as ne:
+                    self.assertTrue('must be' in str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_delimiters_and_projection_create_same_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            expected = self._write_simple_network(temp_dir)
+            # extra columns not in load plan are skipped
+            csv_tsv = '"a",unused,b,atype,score,"more, unused"\n' \
+                      'x,"1,2",y,gene,1.0,"p\nq"\n' \
+                      'x,3,z,gene,2.0,r\n'
+            # quotes are kept as part of values when quotechar is None
+            pipe_tsv = 'a|unused|b|atype|score|"more\n' \
+                       'x|"1|y|gene|1.0|"p\n' \
+                       'x|3|z|gene|2.0|r\n'
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 1}]:
+                self.assertEqual(expected,
+                                 self._write_simple_network(temp_dir,
+                                                            tsv=csv_tsv,
+                                                            delimiter=',',
+                                                            **kwargs))
+                self.assertEqual(expected,
+                                 self._write_simple_network(temp_dir,
+                                                            tsv=pipe_tsv,
+                                                            delimiter='|',
+                                                            quotechar=None,
+                                                            **kwargs))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx_network_row_filter(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = self._get_resume_tsv()
+            lines = tsv.splitlines(keepends=True)
+            filtered_tsv = lines[0] + ''.join([line for line in lines[1:]
+                                               if float(line.split('\t')[3]) >= 20 and
+                                               line.split('\t')[2] != 'gene3'])
+            expected = self._write_simple_network(temp_dir, tsv=filtered_tsv)
+
+            plan = dict(SIMPLE_PLAN,
+                        row_filter=[{'column_name': 'score',
+                                     'operator': '>=', 'value': 20},
+                                    {'column_name': 'atype',
+                                     'operator': 'not_in',
+                                     'value': ['gene3']}])
+            # rows that do not pass filter are dropped before parsing
+            tsv += 'n1\tm99\tgene1\tbad\n'
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 3}]:
+                self.assertEqual(expected,
+                                 self._write_simple_network(temp_dir, tsv=tsv,
+                                                            plan=plan,
+                                                            **kwargs))
+
+            loader = StreamTSVLoader(os.path.join(temp_dir, 'plan.json'), None)
+            report = loader.scan_tsv(io.StringIO(tsv))
+            self.assertEqual(41, report['rows'])
+            self.assertEqual(41 - len(filtered_tsv.splitlines()) + 1,
+                             report['filtered_rows'])
+            self.assertEqual(0, report['error_count'])
+            self.assertEqual(len(filtered_tsv.splitlines()) - 1, report['edges'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx_network_row_filter_column_not_in_header(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            plan = dict(SIMPLE_PLAN,
+                        row_filter=[{'column_name': 'foo',
+                                     'operator': '==', 'value': 'x'}])
+            self._write_simple_network(temp_dir, plan=plan)
+            self.fail('Expected Exception')
+        except Exception as e:
+            self.assertTrue('column name foo in import plan is not '
+                            'in header' in str(e))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    @unittest.skipUnless(arrowinput.PYARROW_LOADED, 'pyarrow is not installed')
+    def test_parquet_and_arrow_inputs_create_same_network(self):
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+        temp_dir = tempfile.mkdtemp()
+        try:
+            tsv = self._get_resume_tsv() + 'n1\tm40\tgene1\t0\n'
+            plan = dict(SIMPLE_PLAN,
+                        row_filter=[{'column_name': 'atype', 'operator': '!=',
+                                     'value': 'gene3'}])
+            expected = self._write_simple_network(temp_dir, tsv=tsv, plan=plan)
+            rows = [line.split('\t') for line in tsv.splitlines()[1:]]
+            table = pyarrow.table({'a': [r[0] for r in rows],
+                                   'unused': list(range(len(rows))),
+                                   'b': [r[1] for r in rows],
+                                   'atype': [r[2] for r in rows],
+                                   'score': [float(r[3]) for r in rows]})
+            parquet_one = os.path.join(temp_dir, 'one.parquet')
+            pyarrow.parquet.write_table(table.slice(0, 20), parquet_one)
+            parquet_two = os.path.join(temp_dir, 'two.parquet')
+            pyarrow.parquet.write_table(table.slice(20), parquet_two)
+            feather_file = os.path.join(temp_dir, 'all.feather')
+            pyarrow.feather.write_feather(table, feather_file)
+
+            planfile = os.path.join(temp_dir, 'plan.json')
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 3}]:
+                for inputs in [[parquet_one, parquet_two], feather_file,
+                               arrowinput.ArrowInput(feather_file, batch_size=7)]:
+                    loader = StreamTSVLoader(planfile, None, **kwargs)
+                    out = io.StringIO()
+                    loader.write_cx_network(inputs, out,
+                                            [{'n': 'name', 'v': 'simple'}])
+                    self.assertEqual(expected, out.getvalue())
+            # score of 0 from typed input is a value, not missing
+            self.assertTrue('"v": 0.0' in expected)
+
+            report = StreamTSVLoader(planfile, None).scan_tsv(feather_file)
+            self.assertEqual(41, report['rows'])
+            self.assertEqual(6, report['filtered_rows'])
+            self.assertEqual(0, report['error_count'])
+
+            for inputs, message in [([feather_file, io.StringIO(tsv)],
+                                     'TSV inputs cannot be mixed'),
+                                    ([parquet_one, os.path.join(temp_dir,
+                                                                'bad.parquet')],
+                                     'does not match header')]:
+                pyarrow.parquet.write_table(table.drop_columns(['unused']),
+                                            os.path.join(temp_dir, 'bad.parquet'))
+                try:
+                    StreamTSVLoader(planfile, None).write_cx_network(inputs,
+                                                                     io.StringIO())
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError as ne:
+                    self.assertTrue(message in str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    @unittest.skipUnless(arrowinput.PYARROW_LOADED, 'pyarrow is not installed')
+    def test_parquet_list_columns_create_same_network(self):
+        import pyarrow
+        import pyarrow.parquet
+        temp_dir = tempfile.mkdtemp()
+        try:
+            plan = {'source_plan': {'node_name_column': 'a',
+                                    'property_columns': ['tags::list_of_string']},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'default_predicate': 'interacts',
+                                  'property_columns': ['scores::list_of_double']}}
+            # repeated lists are interned, null and empty lists are missing
+            rows = [('x', 'y', ['p', 'q'], [1.5, 2.0]),
+                    ('x', 'z', ['p', 'q'], [1.5, 2.0]),
+                    ('y', 'z', None, None),
+                    ('z', 'w', [], []),
+                    ('v', 'u', ['r'], [0.0])]
+            tsv = 'a\tb\ttags\tscores\n' +\
+                ''.join('\t'.join([a, b, ','.join(tags or []),
+                                   ','.join(str(s) for s in scores or [])]) + '\n'
+                        for a, b, tags, scores in rows)
+            expected = self._write_simple_network(temp_dir, tsv=tsv, plan=plan)
+            self.assertTrue('"v": [1.5, 2.0]' in expected)
+
+            table = pyarrow.table({'a': [r[0] for r in rows],
+                                   'b': [r[1] for r in rows],
+                                   'tags': pyarrow.array([r[2] for r in rows],
+                                                         pyarrow.list_(pyarrow.string())),
+                                   'scores': pyarrow.array([r[3] for r in rows],
+                                                           pyarrow.list_(pyarrow.float64()))})
+            parquet_file = os.path.join(temp_dir, 'x.parquet')
+            pyarrow.parquet.write_table(table, parquet_file)
+            planfile = os.path.join(temp_dir, 'plan.json')
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 2}]:
+                loader = StreamTSVLoader(planfile, None, **kwargs)
+                out = io.StringIO()
+                loader.write_cx_network(parquet_file, out,
+                                        [{'n': 'name', 'v': 'simple'}])
+                self.assertEqual(expected, out.getvalue())
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def _get_aspects(self, cx):
+        aspects = {}
+        for fragment in json.loads(cx):
+            for name, elements in fragment.items():
+                aspects.setdefault(name, []).extend(elements)
+        return aspects
+
+    def test_max_batch_bytes_creates_same_network(self):
+        here = os.path.dirname(__file__)
+        planfile = os.path.join(here, 'ctd-gene-disease-2019-norm-plan-'
+                                      'collapsed.json')
+        loader = StreamTSVLoader(planfile, None)
+        expected = io.StringIO()
+        with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+            loader.write_cx_network(f, expected, batchsize=1)
+        fixed_stats = loader.get_batch_statistics()
+        self.assertEqual(fixed_stats['bytes'] / fixed_stats['elements'],
+                         fixed_stats['bytes_per_element'])
+
+        for kwargs in [{}, {'background_writer': True}]:
+            loader = StreamTSVLoader(planfile, None, **kwargs)
+            out = io.StringIO()
+            with open(os.path.join(here, 'ctd_test.tsv'), 'r') as f:
+                loader.write_cx_network(f, out, batchsize=1,
+                                        max_batch_bytes=4096)
+            self.assertEqual(self._get_aspects(expected.getvalue()),
+                             self._get_aspects(out.getvalue()))
+            stats = loader.get_batch_statistics()
+            # batchsize is ignored so fewer, larger batches are written
+            self.assertTrue(stats['batches'] < fixed_stats['batches'])
+            self.assertTrue(stats['max_batch_elements'] >
+                            fixed_stats['max_batch_elements'])
+            self.assertEqual(fixed_stats['elements'], stats['elements'])
+            self.assertEqual(stats['bytes'] / stats['batches'],
+                             stats['mean_batch_bytes'])
+
+    def test_max_batch_bytes_bounds_batches(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            planfile = os.path.join(temp_dir, 'plan.json')
+            with open(planfile, 'w') as f:
+                json.dump(SIMPLE_PLAN, f)
+            tsv = 'a\tb\tatype\tscore\n' +\
+                  ''.join('x' + str(i) + '\ty\tgene\t' + str(i) + '.0\n'
+                          for i in range(200))
+            loader = StreamTSVLoader(planfile, None)
+            stats = loader.get_batch_statistics()
+            self.assertEqual(0, stats['batches'])
+            self.assertEqual(0.0, stats['mean_batch_bytes'])
+            self.assertEqual(streamtsvloader.INITIAL_BYTES_PER_ELEMENT,
+                             stats['bytes_per_element'])
+            out = io.StringIO()
+            loader.write_cx_network(io.StringIO(tsv), out, max_batch_bytes=2000)
+            stats = loader.get_batch_statistics()
+            self.assertTrue(stats['batches'] > 1)
+            # first batch is sized with the initial estimate and later
+            # batches with the observed size of an element
+            self.assertTrue(stats['max_batch_bytes'] < 2 * 2000)
+            self.assertEqual(200,
+                             len(self._get_aspects(out.getvalue())['edges']))
+
+            try:
+                loader.write_cx_network(io.StringIO(SIMPLE_TSV), io.StringIO(),
+                                        max_batch_bytes=0)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual('max_batch_bytes must be 1 or larger', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_cx2_stream_writer(self):
+        for stream in [io.StringIO(), io.BytesIO()]:
+            writer = CX2StreamWriter(stream)
+            writer.write_pre_metadata([{'name': 'nodes'}])
+            writer.write_aspect_fragment({'nodes': [{'id': 0,
+                                                     'v': {'name': 'ü'}}]})
+            writer.write_aspect_fragment({'nodes': [{'id': 1}]})
+            writer.write_post_metadata([{'name': 'nodes', 'elementCount': 2}])
+            data = stream.getvalue()
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
+            self.assertEqual([{'CXVersion': '2.0', 'hasFragments': True},
+                              {'metaData': [{'name': 'nodes'}]},
+                              {'nodes': [{'id': 0, 'v': {'name': 'ü'}}]},
+                              {'nodes': [{'id': 1}]},
+                              {'status': [{'error': '', 'success': True}]}],
+                             json.loads(data))
+            try:
+                writer.write_aspect_fragment({'nodes': []})
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertTrue('can only be written between' in str(ne))
+
+    def test_write_cx2_network(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            plan = {'source_plan': {'rep_column': 'a', 'rep_prefix': 'p',
+                                    'node_name_column': 'a',
+                                    'property_columns': ['atype']},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'default_predicate': 'interacts',
+                                  'property_columns': [
+                                      'score::float',
+                                      {'column_name': 'pmid',
+                                       'delimiter': '|'}]}}
+            tsv = 'a\tb\tatype\tscore\tpmid\n' \
+                  'x\ty\tgene\t1.5\t1|2\n' \
+                  'x\tz\tgene\t2.0\t\n' \
+                  'x\ty\tgene\t0.5\t3\n'
+            planfile = os.path.join(temp_dir, 'plan.json')
+            with open(planfile, 'w') as f:
+                json.dump(plan, f)
+            for kwargs in [{}, {'workers': 2, 'worker_chunksize': 1},
+                           {'encoder': 'auto', 'background_writer': True}]:
+                loader = StreamTSVLoader(planfile, None,
+                                         output_format=streamtsvloader.CX2_FORMAT,
+                                         **kwargs)
+                out = io.BytesIO()
+                loader.write_cx_network(io.StringIO(tsv), out,
+                                        [{'n': 'name', 'v': 'simple'},
+                                         {'n': 'ids', 'v': '1,2',
+                                          'd': 'list_of_long'}],
+                                        batchsize=1)
+                cx2 = json.loads(out.getvalue().decode('utf-8'))
+                self.assertEqual({'CXVersion': '2.0', 'hasFragments': True},
+                                 cx2[0])
+                self.assertEqual({'networkAttributes': {'name': {'d': 'string'},
+                                                        'ids': {'d': 'list_of_long'}},
+                                  'nodes': {'name': {'d': 'string'},
+                                            'represents': {'d': 'string'},
+                                            'atype': {'d': 'string'}},
+                                  'edges': {'interaction': {'d': 'string'},
+                                            'score': {'d': 'double'},
+                                            'pmid': {'d': 'list_of_string'}}},
+                                 cx2[2]['attributeDeclarations'][0])
+                self.assertEqual([{'name': 'simple', 'ids': [1, 2]}],
+                                 cx2[3]['networkAttributes'])
+                self.assertEqual({'status': [{'error': '', 'success': True}]},
+                                 cx2[-1])
+
+                net = RawCX2NetworkFactory().get_cx2network(cx2)
+                self.assertEqual(3, len(net.get_nodes()))
+                self.assertEqual({'name': 'x', 'represents': 'p:x',
+                                  'atype': 'gene'},
+                                 net.get_node(0)['v'])
+                self.assertEqual({'name': 'y'}, net.get_node(1)['v'])
+                self.assertEqual(3, len(net.get_edges()))
+                self.assertEqual({'id': 0, 's': 0, 't': 1,
+                                  'v': {'interaction': 'interacts',
+                                        'score': 1.5, 'pmid': ['1', '2']}},
+                                 net.get_edge(0))
+                self.assertEqual({'interaction': 'interacts', 'score': 2.0},
+                                 net.get_edge(1)['v'])
+
+            # CX2 is smaller then CX
+            cx = io.StringIO()
+            StreamTSVLoader(planfile, None).write_cx_network(io.StringIO(tsv), cx)
+            cx2 = io.StringIO()
+            StreamTSVLoader(planfile, None,
+                            output_format=streamtsvloader.CX2_FORMAT)\
+                .write_cx_network(io.StringIO(tsv), cx2)
+            self.assertTrue(len(cx2.getvalue()) < len(cx.getvalue()))
+            report = StreamTSVLoader(planfile, None,
+                                     output_format=streamtsvloader.CX2_FORMAT)\
+                .scan_tsv(io.StringIO(tsv))
+            self.assertTrue(report['cx_size'] <
+                            StreamTSVLoader(planfile, None).scan_tsv(
+                                io.StringIO(tsv))['cx_size'])
+
+            # attributes of collapsed edges are lists
+            plan['edge_plan']['collapse_edges'] = True
+            with open(planfile, 'w') as f:
+                json.dump(plan, f)
+            loader = StreamTSVLoader(planfile, None,
+                                     output_format=streamtsvloader.CX2_FORMAT)
+            out = io.StringIO()
+            loader.write_cx_network(io.StringIO(tsv), out)
+            net = RawCX2NetworkFactory().get_cx2network(json.loads(out.getvalue()))
+            self.assertEqual({'d': 'list_of_double'},
+                             net.get_attribute_declarations()['edges']['score'])
+            self.assertEqual({'interaction': 'interacts', 'score': [1.5, 0.5],
+                              'pmid': ['1', '2', '3']},
+                             net.get_edge(0)['v'])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_write_cx2_network_style(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            style = CX2Network()
+            style.set_visual_properties({'default': {'network': {}}})
+            style.add_opaque_aspect({'visualEditorProperties': [{'properties': {}}]})
+            self._write_plan(temp_dir)
+            loader = StreamTSVLoader(os.path.join(temp_dir, 'plan.json'), style,
+                                     output_format=streamtsvloader.CX2_FORMAT)
+            out = io.StringIO()
+            loader.write_cx_network(io.StringIO(SIMPLE_TSV), out)
+            cx2 = json.loads(out.getvalue())
+            self.assertEqual([{'name': 'attributeDeclarations', 'elementCount': 1},
+                              {'name': 'nodes'}, {'name': 'edges'},
+                              {'name': 'visualProperties', 'elementCount': 1},
+                              {'name': 'visualEditorProperties', 'elementCount': 1}],
+                             cx2[1]['metaData'])
+            self.assertEqual({'visualProperties': [{'default': {'network': {}}}]},
+                             cx2[3])
+            self.assertEqual({'visualEditorProperties': [{'properties': {}}]},
+                             cx2[4])
+
+            # CX style cannot be used for CX2
+            try:
+                StreamTSVLoader(os.path.join(temp_dir, 'plan.json'),
+                                ndex2.nice_cx_network.NiceCXNetwork(),
+                                output_format=streamtsvloader.CX2_FORMAT)
+                self.fail('Expected NDExUtilError')
+            except NDExUtilError as ne:
+                self.assertEqual('Style template for CX2 output must be a '
+                                 'CX2Network with visualProperties', str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_invalid_output_format_and_cx2_attributes(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for plan, output_format, message in [
+                (SIMPLE_PLAN, 'foo', 'Unsupported output_format foo'),
+                (dict(SIMPLE_PLAN,
+                      target_plan={'node_name_column': 'b',
+                                   'property_columns': ['name']}),
+                 streamtsvloader.CX2_FORMAT,
+                 'Attribute name of nodes is reserved in CX2'),
+                (dict(SIMPLE_PLAN,
+                      target_plan={'node_name_column': 'b',
+                                   'property_columns': ['atype::long']}),
+                 streamtsvloader.CX2_FORMAT,
+                 'Attribute atype of nodes has data types string and long')]:
+                self._write_plan(temp_dir, plan=plan)
+                try:
+                    StreamTSVLoader(os.path.join(temp_dir, 'plan.json'), None,
+                                    output_format=output_format)
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError as ne:
+                    self.assertTrue(message in str(ne))
+        finally:
+            shutil.rmtree(temp_dir)
+
  #   def test_parse_arguments(self):
  #           here = os.path.dirname(__file__)
  #           tsvfile = os.path.join("/Users/chenjing/git/ndexctdloader/ndexctdloader", 'collapsed_Homo_sapiens.tsv')
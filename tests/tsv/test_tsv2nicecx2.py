@@ -10,7 +10,9 @@ import io
 import unittest
 import pandas as pd
 import json
+from mock import MagicMock, patch
 from ndexutil.tsv import tsv2nicecx2
+from ndexutil.tsv.streamtsvloader import CXStreamWriter
 from ndexutil.exceptions import NDExUtilError
 import ndex2
 
@@ -72,3 +74,334 @@ class Testtsv2nicecx2(unittest.TestCase):
 
         finally:
             shutil.rmtree(temp_dir)
+
+    def test_row_filter(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, 'ctd-gene-disease-2019-norm-'
+                                     'plan-collapsed.json'), 'r') as f:
+            loadplan = json.load(f)
+        loadplan['row_filter'] = [{'column_name': 'InferenceScore',
+                                   'operator': '>=', 'value': 5},
+                                  {'column_name': 'DirectEvidence',
+                                   'operator': '==', 'value': ''}]
+        df = pd.read_csv(os.path.join(here, 'ctd_test.tsv'), sep='\t')
+        net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, loadplan)
+        self.assertEqual(23, len(net.edges))
+        for edge_id in net.edges.keys():
+            score = net.get_edge_attribute(edge_id, 'InferenceScore')
+            self.assertTrue(score['v'] >= 5)
+
+    def test_row_filter_column_not_in_dataframe(self):
+        loadplan = {'source_plan': {'node_name_column': 'a'},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'default_predicate': 'rel'}}
+        df = pd.DataFrame({'a': ['A', 'C'], 'b': ['B', 'D'], 'score': ['1', '2']})
+        for condition in [{'operator': '>', 'value': 0},
+                          {'operator': '==', 'value': 'x'}]:
+            loadplan['row_filter'] = [dict(condition, column_name='scor')]
+            for data in [df, df.iloc[:0]]:
+                try:
+                    tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(data, loadplan)
+                    self.fail('Expected NDExUtilError')
+                except NDExUtilError as ne:
+                    self.assertEqual("Error in import plan: column name scor of "
+                                     "row_filter is not in DataFrame columns "
+                                     "['a', 'b', 'score']", str(ne))
+
+    def _get_network_by_rows(self, df, loadplan):
+        builder = ndex2.NiceCXBuilder()
+        for index, row in df.iterrows():
+            tsv2nicecx2.process_row(builder, loadplan, row, {})
+        return builder.get_nice_cx()
+
+    def test_same_network_as_process_row(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, 'BRCA-2012-loadplan.json'), 'r') as f:
+            loadplan = json.load(f)
+        del loadplan['context']
+        for dtype in [None, str]:
+            df = pd.read_csv(os.path.join(here, 'BRCA-2012-TP53-pathway.'
+                                                'txt_with_a_b.csv'),
+                             sep='\t', dtype=dtype)
+            net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, json.loads(json.dumps(loadplan)))
+            expected = self._get_network_by_rows(df, json.loads(json.dumps(loadplan)))
+            self.assertEqual(expected.to_cx(), net.to_cx())
+
+    def test_property_columns_normalized_once_per_plan(self):
+        plan = {'property_columns': ['x', {'column_name': 'y',
+                                           'data_type': 'integer'}]}
+        columns = tsv2nicecx2._get_property_columns(plan)
+        self.assertEqual(['x', 'y'], [c.attribute_name for c in columns])
+        self.assertTrue(columns is tsv2nicecx2._get_property_columns(plan))
+
+        # a plan with other property_columns gets its own columns
+        other = {'property_columns': ['z']}
+        self.assertEqual(['z'], [c.attribute_name for c in
+                                 tsv2nicecx2._get_property_columns(other)])
+        plan['property_columns'] = ['w']
+        self.assertEqual(['w'], [c.attribute_name for c in
+                                 tsv2nicecx2._get_property_columns(plan)])
+        self.assertEqual([], tsv2nicecx2._get_property_columns({}))
+
+    def test_max_rows_and_missing_values(self):
+        loadplan = {'source_plan': {'node_name_column': 'a',
+                                    'property_columns': ['x::integer', 'y']},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'default_predicate': 'rel',
+                                  'property_columns': ['score::double']}}
+        df = pd.DataFrame({'a': ['A', '', 'C', 'A', 'D', 'E'],
+                           'b': ['B', 'B', 'D', 'C', 'E', 'F'],
+                           'x': ['1', '2', 'foo', '3', 'bar', '4'],
+                           'y': ['p', 'q', 'r', 's', 't', 'u'],
+                           'score': ['0.5', None, '2', '0.5', None, '1']})
+        net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, json.loads(json.dumps(loadplan)),
+                                                                   max_rows=1)
+
+        # max_rows + 3 rows are loaded and row without source is skipped
+        self.assertEqual(3, len(net.edges))
+        expected = self._get_network_by_rows(df.iloc[:4], loadplan)
+        self.assertEqual(expected.to_cx(), net.to_cx())
+        names = {n['n']: n['@id'] for n in net.nodes.values()}
+        # x of C is not an integer so y is not set either
+        self.assertEqual(None, net.get_node_attributes(names['C']))
+        # first value of attribute is kept
+        self.assertEqual({'x': 1, 'y': 'p'},
+                         {a['n']: a['v'] for a in net.get_node_attributes(names['A'])})
+
+    def test_missing_predicate(self):
+        loadplan = {'source_plan': {'node_name_column': 'a'},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'predicate_id_column': 'p'}}
+        df = pd.DataFrame({'a': ['A', 'C'], 'b': ['B', 'D'], 'p': ['rel', '']})
+        try:
+            tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, loadplan)
+            self.fail('Expected RuntimeError')
+        except RuntimeError as re:
+            self.assertEqual('Value for predicate string is not found in this row.', str(re))
+
+        # no rows means no error
+        net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df.iloc[:0], loadplan)
+        self.assertEqual(0, len(net.edges))
+
+    def test_citations(self):
+        edge_plan = {'citation_id_column': 'c', 'citation_id_prefix': 'pubmed'}
+        self.assertEqual([['pubmed:1', 'pubmed:2', 'pubmed:3', 'pubmed:4'],
+                          ['pubmed:5']],
+                         tsv2nicecx2._get_citations(edge_plan, ['1, 2;3 |4', 5]))
+        self.assertEqual([['1', '2']],
+                         tsv2nicecx2._get_citations({}, ['1|2']))
+
+        loadplan = {'source_plan': {'node_name_column': 'a'},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': dict(edge_plan, default_predicate='rel')}
+        builder = ndex2.NiceCXBuilder()
+        tsv2nicecx2.process_row(builder, loadplan, {'a': 'A', 'b': 'B', 'c': '1 ;2'},
+                                {})
+        net = builder.get_nice_cx()
+        self.assertEqual(['pubmed:1', 'pubmed:2'],
+                         net.get_edge_attribute(0, 'citation')['v'])
+
+    def test_invalid_data_type(self):
+        loadplan = {'source_plan': {'node_name_column': 'a'},
+                    'target_plan': {'node_name_column': 'b'},
+                    'edge_plan': {'default_predicate': 'rel',
+                                  'property_columns': ['s::foo']}}
+        df = pd.DataFrame({'a': ['A', 'C'], 'b': ['B', 'D'], 's': ['x', None]})
+
+        # invalid data type is only reported once a value is converted
+        net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df.iloc[1:], loadplan)
+        self.assertEqual(1, len(net.edges))
+        try:
+            tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, loadplan)
+            self.fail('Expected Exception')
+        except Exception as e:
+            self.assertEqual('data_type: foo is not valid', str(e))
+
+    def _get_aspects(self, cx):
+        aspects = {}
+        for aspect in cx:
+            for name, elements in aspect.items():
+                if name not in ('numberVerification', 'metaData', 'status'):
+                    aspects.setdefault(name, []).extend(elements)
+        return aspects
+
+    def _assert_same_elements(self, expected_cx, cx):
+        expected = self._get_aspects(json.loads(json.dumps(expected_cx)))
+        cx_aspects = self._get_aspects(json.loads(json.dumps(cx)))
+        self.assertEqual(sorted(expected.keys()), sorted(cx_aspects.keys()))
+        for aspect_name, elements in expected.items():
+            self.assertEqual(sorted(json.dumps(e, sort_keys=True) for e in elements),
+                             sorted(json.dumps(e, sort_keys=True) for e in cx_aspects[aspect_name]))
+
+    def test_cx_chunk_writer(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, 'BRCA-2012-loadplan.json'), 'r') as f:
+            loadplan = json.load(f)
+        tsvfile = os.path.join(here, 'BRCA-2012-TP53-pathway.txt_with_a_b.csv')
+        df = pd.read_csv(tsvfile, sep='\t', dtype=str, na_filter=False)
+        net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, json.loads(json.dumps(loadplan)),
+                                                                   name='mynetwork')
+
+        out = io.StringIO()
+        writer = tsv2nicecx2.CXChunkWriter(loadplan, CXStreamWriter(out))
+        writer.write_pre_metadata(style_aspects=[{'cyVisualProperties': [{'properties_of': 'network'}]}])
+        for chunk in pd.read_csv(tsvfile, sep='\t', dtype=str, na_filter=False, chunksize=3):
+            self.assertEqual(len(chunk), writer.write_dataframe(chunk))
+        writer.write_post_metadata(name='mynetwork')
+        cx = json.loads(out.getvalue())
+
+        # each chunk is written as it is added
+        self.assertTrue(sum(1 for a in cx if 'edges' in a) > 1)
+        streamed = ndex2.create_nice_cx_from_raw_cx(cx)
+        self.assertEqual(net.nodes, streamed.nodes)
+        self.assertEqual(net.edges, streamed.edges)
+        self.assertEqual(net.nodeAttributes, streamed.nodeAttributes)
+        self.assertEqual(net.edgeAttributes, streamed.edgeAttributes)
+        self.assertEqual(net.networkAttributes, streamed.networkAttributes)
+        self.assertEqual([{'properties_of': 'network'}],
+                         self._get_aspects(cx)['cyVisualProperties'])
+        post_metadata = {m['name']: m for m in cx[-2]['metaData']}
+        self.assertEqual(len(net.nodes), post_metadata['nodes']['elementCount'])
+        self.assertEqual(len(net.edges), post_metadata['edges']['idCounter'])
+
+    def _get_content_importer(self, summaries):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        with patch('ndexutil.tsv.tsv2nicecx2.Ndex2') as mock_ndex2:
+            client = MagicMock()
+            client.get_user_network_summaries = MagicMock(side_effect=lambda username, offset=0,
+                                                          limit=1000: summaries[offset:offset + limit])
+            client.get_network_summary = MagicMock(return_value=None)
+            mock_ndex2.return_value = client
+            importer = tsv2nicecx2.ContentImporter('server', 'user', 'pass',
+                                                   network_cache_file=os.path.join(temp_dir,
+                                                                                   'cache.json'))
+            # networks are only requested once needed
+            self.assertEqual(0, client.get_user_network_summaries.call_count)
+            return importer
+
+    def test_content_importer_update_mapping(self):
+        summaries = [{'name': 'One', 'externalId': 'uuid1', 'modificationTime': 2},
+                     {'name': 'two', 'externalId': 'uuid2', 'modificationTime': 1}]
+        importer = self._get_content_importer(summaries)
+        self.assertEqual({'ONE': 'uuid1', 'TWO': 'uuid2'}, importer.update_mapping)
+
+        # deleted and renamed networks are dropped
+        del summaries[0]
+        summaries[0] = dict(summaries[0], name='three', modificationTime=3)
+        self.assertEqual({'THREE': 'uuid2'}, importer.update_mapping)
+        self.assertEqual(['cache.json'],
+                         os.listdir(os.path.dirname(importer.network_cache.get_cache_file())))
+
+    def test_content_importer_process_file_chunked(self):
+        here = os.path.dirname(__file__)
+        tsvfile = os.path.join(here, 'ctd_test.tsv')
+        loadplanfile = os.path.join(here, 'ctd-gene-disease-2019-norm-plan-collapsed.json')
+        importer = self._get_content_importer([])
+        importer.process_file(tsvfile, loadplanfile, 'mynetwork')
+        net = importer.network
+
+        uploaded = []
+        importer.ndex.save_cx_stream_as_new_network = MagicMock(side_effect=lambda s:
+                                                                uploaded.append(json.load(s)))
+        importer.process_file(tsvfile, loadplanfile, 'mynetwork', chunk_size=10)
+        self.assertEqual(None, importer.network)
+        importer.upload_network()
+
+        streamed = ndex2.create_nice_cx_from_raw_cx(uploaded[0])
+        self.assertEqual(49, len(streamed.edges))
+        self.assertEqual(net.nodes, streamed.nodes)
+        self.assertEqual(net.edges, streamed.edges)
+        self.assertEqual(net.nodeAttributes, streamed.nodeAttributes)
+        self.assertEqual(net.edgeAttributes, streamed.edgeAttributes)
+        self.assertEqual('mynetwork', streamed.get_name())
+
+    def test_content_importer_chunked_update(self):
+        here = os.path.dirname(__file__)
+        importer = self._get_content_importer([{'name': 'MyNetwork',
+                                                'externalId': 'uuid1'}])
+        aspects = {'cyVisualProperties': [{'properties_of': 'network'}],
+                   'networkAttributes': [{'n': 'description', 'v': 'old'}]}
+
+        def get_aspect(uuid, aspect_name):
+            response = MagicMock()
+            response.json = MagicMock(return_value=aspects[aspect_name])
+            return response
+        importer.ndex.get_network_aspect_as_cx_stream = MagicMock(side_effect=get_aspect)
+        uploaded = []
+        importer.ndex.update_cx_network = MagicMock(side_effect=lambda s, uuid:
+                                                    uploaded.append((uuid, json.load(s))))
+
+        importer.process_file(os.path.join(here, 'ctd_test.tsv'),
+                              os.path.join(here, 'ctd-gene-disease-2019-norm-plan-collapsed.json'),
+                              'mynetwork', style_template='styleuuid', chunk_size=1000)
+        importer.upload_network()
+        self.assertEqual('uuid1', uploaded[0][0])
+        cx_aspects = self._get_aspects(uploaded[0][1])
+        self.assertEqual(aspects['cyVisualProperties'], cx_aspects['cyVisualProperties'])
+        network_attributes = {a['n']: a['v'] for a in cx_aspects['networkAttributes']}
+        self.assertEqual('mynetwork', network_attributes['name'])
+        self.assertEqual('old', network_attributes['description'])
+        self.assertTrue('@context' in network_attributes)
+
+    def test_write_cx_with_load_plan(self):
+        here = os.path.dirname(__file__)
+        with open(os.path.join(here, 'ctd-gene-disease-2019-norm-plan-collapsed.json'), 'r') as f:
+            loadplan = json.load(f)
+        # values are numbers or NaN where types are inferred
+        df = pd.read_csv(os.path.join(here, 'ctd_test.tsv'), sep='\t')
+        for kwargs in [{}, {'max_rows': 3, 'name': 'mynetwork', 'description': 'mydesc',
+                            'network_attributes': [{'n': 'hi', 'v': 'data'}]}]:
+            net = tsv2nicecx2.convert_pandas_to_nice_cx_with_load_plan(df, json.loads(json.dumps(loadplan)),
+                                                                       **json.loads(json.dumps(kwargs)))
+            for batch_size in [4, tsv2nicecx2.ROWS_PER_BATCH]:
+                out = io.BytesIO()
+                with patch.object(tsv2nicecx2, 'ROWS_PER_BATCH', batch_size):
+                    tsv2nicecx2.write_cx_with_load_plan(df, json.loads(json.dumps(loadplan)), out,
+                                                        **json.loads(json.dumps(kwargs)))
+                self._assert_same_elements(net.to_cx(), json.loads(out.getvalue()))
+
+    def test_cx_element_emitter_same_as_nice_cx_builder(self):
+        emitter = tsv2nicecx2._CXElementEmitter()
+        builder = ndex2.NiceCXBuilder()
+        values = [('a', None), (1.5, None), (float('nan'), None), (float('inf'), None),
+                  (True, None), (3, None), ([], None), ([1.0], None), ([True], None),
+                  ([2], None), (['x'], None), ('2', 'double'), (2, 'float'),
+                  ([1, 2], 'list_of_float'), ('x', 'string'), (float('nan'), 'double')]
+        for index, (value, data_type) in enumerate(values):
+            for b in [emitter, builder]:
+                node_id = b.add_node(name='n' + str(index % 3), represents='r')
+                b.add_node_attribute(node_id, 'a' + str(index % 5), value, type=data_type)
+                edge_id = b.add_edge(source=node_id, target=node_id)
+                b.add_edge_attribute(property_of=edge_id, name='x', values=value, type=data_type)
+                b.add_edge_attribute(property_of=edge_id, name='x', values='ignored')
+        for b in [emitter, builder]:
+            for values, data_type in [('x', 'double'), (['x'], 'list_of_double')]:
+                try:
+                    b.add_edge_attribute(property_of=edge_id, name='y', values=values, type=data_type)
+                    self.fail('Expected ValueError')
+                except ValueError as ve:
+                    self.assertEqual('Value was not of type ' + data_type, str(ve))
+            try:
+                b.add_node_attribute(0, 'z', None)
+                self.fail('Expected TypeError')
+            except TypeError as te:
+                self.assertEqual('Attribute value is None', str(te))
+
+        self._assert_same_elements(builder.get_nice_cx().to_cx(), emitter.get_fragments())
+
+    def test_cx_element_emitter_edge_attribute_not_on_last_edge(self):
+        emitter = tsv2nicecx2._CXElementEmitter()
+        try:
+            emitter.add_edge_attribute(property_of=0, name='x', values='y')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('Attributes can only be added to last edge, None, not 0', str(ne))
+        node_id = emitter.add_node(name='a')
+        emitter.add_edge(source=node_id, target=node_id)
+        emitter.add_edge(source=node_id, target=node_id)
+        try:
+            emitter.add_edge_attribute(property_of=0, name='x', values='y')
+            self.fail('Expected NDExUtilError')
+        except NDExUtilError as ne:
+            self.assertEqual('Attributes can only be added to last edge, 1, not 0', str(ne))